@@ -0,0 +1,231 @@
+import numpy as np
+from pulp import LpProblem, LpMinimize, LpVariable, LpBinary, lpSum
+
+import model as model_module
+from model import (
+    load_matchup_matrix, load_all_distances, precompute_game_emissions,
+    precompute_average_paired_savings, chosen_keys, week_grid, grid_schedule
+)
+
+
+def create_aggregated_schedule_model(matchup_matrix=None):
+    """
+    Create the slot-aggregated NFL schedule model.
+
+    Each directed matchup gets one binary per week, g[(i, j, w)], instead of one per
+    (week, slot). The Thursday and Monday slots are chosen by per-team indicators
+    thu[(i, w)] / mon[(i, w)]; every other game is on Sunday. Sunday-away and
+    Thursday-away indicators are continuous but exactly pinned by their linking rows.
+
+    Each week's Thursday game is one continuous tg[(i, j, w)] over the pairs meeting that
+    week, and each team's thu is the sum of its pairs' tg, so the two Thursday teams play
+    each other without a row per pair of teams. Monday works the same way through mg.
+    Since a week's meetings form a matching, tg and mg are integral whenever thu and mon are.
+    """
+    print("Loading data...")
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    print("Creating slot-aggregated optimization model...")
+    model = LpProblem("NFL_Schedule_Optimization_Aggregated", LpMinimize)
+
+    g = {}
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(model_module.NUM_TEAMS):
+            if i != j and matchup_matrix.get((i, j), 0) > 0:
+                for w in range(model_module.NUM_WEEKS):
+                    g[(i, j, w)] = LpVariable(f"g_{i}_{j}_{w}", cat=LpBinary)
+
+    h, a, bye, thu, mon, sa, ta = {}, {}, {}, {}, {}, {}, {}
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            h[(i, w)] = LpVariable(f"h_{i}_{w}", cat=LpBinary)
+            a[(i, w)] = LpVariable(f"a_{i}_{w}", cat=LpBinary)
+            bye[(i, w)] = LpVariable(f"bye_{i}_{w}", cat=LpBinary)
+            thu[(i, w)] = LpVariable(f"thu_{i}_{w}", cat=LpBinary)
+            mon[(i, w)] = LpVariable(f"mon_{i}_{w}", cat=LpBinary)
+            sa[(i, w)] = LpVariable(f"sa_{i}_{w}", lowBound=0, upBound=1)
+            ta[(i, w)] = LpVariable(f"ta_{i}_{w}", lowBound=0, upBound=1)
+
+    # Thursday and Monday games, one pair of continuous indicators per meeting and week
+    tg, mg = {}, {}
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            if matchup_matrix.get((i, j), 0) > 0:
+                for w in range(model_module.NUM_WEEKS):
+                    tg[(i, j, w)] = LpVariable(f"tg_{i}_{j}_{w}", lowBound=0, upBound=1)
+                    mg[(i, j, w)] = LpVariable(f"mg_{i}_{j}_{w}", lowBound=0, upBound=1)
+
+    y = {}
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS - 1):
+            y[(i, w)] = LpVariable(f"y_{i}_{w}", cat=LpBinary)
+
+    v = {}
+    for w in range(1, model_module.NUM_WEEKS):
+        v[w] = LpVariable(f"v_{w}", cat=LpBinary)
+
+    home, away, pair, week = {}, {}, {}, {}
+    for key in g:
+        i, j, w = key
+        home.setdefault((j, w), []).append(key)
+        away.setdefault((i, w), []).append(key)
+        pair.setdefault((i, j), []).append(key)
+        week.setdefault(w, []).append(key)
+
+    def meeting(i, j, w):
+        return [g[k] for k in ((i, j, w), (j, i, w)) if k in g]
+
+    print("Setting up objective function...")
+    emission_terms = []
+    for (i, j, w), var in g.items():
+        cost = game_emissions.get((i, j, False), 0) + game_emissions.get((j, i, True), 0)
+        emission_terms.append(cost * var)
+    savings_terms = [avg_paired_savings.get(i, 0) * var for (i, w), var in y.items()]
+    model += lpSum(emission_terms) - lpSum(savings_terms), "Total_CO2_Emissions"
+
+    print("Adding constraints...")
+
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            if matchup_value == 2:
+                model += lpSum(g[k] for k in pair.get((i, j), [])) == 1, f"Divisional_i_away_{i}_{j}"
+                model += lpSum(g[k] for k in pair.get((j, i), [])) == 1, f"Divisional_j_away_{i}_{j}"
+            elif matchup_value == 1:
+                games = pair.get((i, j), []) + pair.get((j, i), [])
+                model += lpSum(g[k] for k in games) == 1, f"NonDiv_matchup_{i}_{j}"
+
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            model += h[(i, w)] + a[(i, w)] + bye[(i, w)] == 1, f"One_activity_{i}_{w}"
+            model += lpSum(g[k] for k in home.get((i, w), [])) == h[(i, w)], f"Link_home_{i}_{w}"
+            model += lpSum(g[k] for k in away.get((i, w), [])) == a[(i, w)], f"Link_away_{i}_{w}"
+
+            model += ta[(i, w)] <= a[(i, w)], f"Thursday_away_a_{i}_{w}"
+            model += ta[(i, w)] <= thu[(i, w)], f"Thursday_away_thu_{i}_{w}"
+            model += ta[(i, w)] >= a[(i, w)] + thu[(i, w)] - 1, f"Thursday_away_both_{i}_{w}"
+            model += sa[(i, w)] <= a[(i, w)], f"Sunday_away_a_{i}_{w}"
+            model += sa[(i, w)] <= 1 - thu[(i, w)] - mon[(i, w)], f"Sunday_away_slot_{i}_{w}"
+            model += sa[(i, w)] >= a[(i, w)] - thu[(i, w)] - mon[(i, w)], f"Sunday_away_both_{i}_{w}"
+
+    for i in range(model_module.NUM_TEAMS):
+        model += (
+            lpSum(h[(i, w)] + a[(i, w)] for w in range(model_module.NUM_WEEKS))
+            == model_module.NUM_WEEKS - 1,
+            f"Total_games_{i}"
+        )
+        total_home = lpSum(h[(i, w)] for w in range(model_module.NUM_WEEKS))
+        model += total_home >= (model_module.NUM_WEEKS - 1) // 2, f"Min_home_{i}"
+        model += total_home <= model_module.NUM_WEEKS // 2, f"Max_home_{i}"
+
+        model += lpSum(bye[(i, w)] for w in range(model_module.NUM_WEEKS)) == 1, f"One_bye_{i}"
+        for w in range(model_module.NUM_WEEKS):
+            if w < model_module.BYE_WEEK_START - 1 or w > model_module.BYE_WEEK_END - 1:
+                model += bye[(i, w)] == 0, f"No_bye_week_{i}_{w}"
+
+        for w in range(model_module.NUM_WEEKS - 3):
+            model += lpSum(h[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_home_{i}_{w}"
+            model += lpSum(a[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_away_{i}_{w}"
+
+    for _, div_teams in model_module.DIVISIONS.items():
+        for idx, i in enumerate(div_teams):
+            for j in div_teams[idx + 1:]:
+                for w in range(model_module.NUM_WEEKS - 1):
+                    games = meeting(i, j, w) + meeting(i, j, w + 1)
+                    if games:
+                        model += lpSum(games) <= 1, f"No_consec_div_{i}_{j}_{w}"
+
+    # Both teams can host in the same week only if one of them uses the Thursday or Monday slot
+    for team_a, team_b in model_module.STADIUM_SHARING_PAIRS:
+        idx_a = model_module.TEAM_IDX[team_a]
+        idx_b = model_module.TEAM_IDX[team_b]
+        for w in range(model_module.NUM_WEEKS):
+            model += (
+                h[(idx_a, w)] + h[(idx_b, w)] - lpSum(meeting(idx_a, idx_b, w))
+                <= 1 + thu[(idx_a, w)] + thu[(idx_b, w)] + mon[(idx_a, w)] + mon[(idx_b, w)],
+                f"Stadium_share_{idx_a}_{idx_b}_{w}"
+            )
+
+    # One Thursday and one Monday game per week, each on a pair that meets that week;
+    # a team plays on Thursday or Monday exactly when its pair's game is that one
+    for (i, j, w) in tg:
+        model += (
+            tg[(i, j, w)] + mg[(i, j, w)] <= lpSum(meeting(i, j, w)),
+            f"Primetime_requires_game_{i}_{j}_{w}"
+        )
+    team_pairs = {}
+    for (i, j, w) in tg:
+        team_pairs.setdefault((i, w), []).append((i, j, w))
+        team_pairs.setdefault((j, w), []).append((i, j, w))
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            pairs = team_pairs.get((i, w), [])
+            model += thu[(i, w)] == lpSum(tg[k] for k in pairs), f"Thursday_team_{i}_{w}"
+            model += mon[(i, w)] == lpSum(mg[k] for k in pairs), f"Monday_team_{i}_{w}"
+    for w in range(model_module.NUM_WEEKS):
+        week_pairs = [k for k in tg if k[2] == w]
+        model += lpSum(tg[k] for k in week_pairs) == 1, f"Thursday_game_{w}"
+        model += lpSum(mg[k] for k in week_pairs) == 1, f"Monday_game_{w}"
+
+    for w in range(model_module.NUM_WEEKS):
+        total_byes = lpSum(bye[(i, w)] for i in range(model_module.NUM_TEAMS))
+        model += (
+            2 * lpSum(g[k] for k in week.get(w, [])) + total_byes == model_module.NUM_TEAMS,
+            f"Games_per_week_{w}"
+        )
+
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(1, model_module.NUM_WEEKS):
+            model += (
+                ta[(i, w)] <= sa[(i, w - 1)] + v[w],
+                f"Thursday_requires_Sunday_away_{i}_{w}"
+            )
+
+    model += lpSum(v[w] for w in range(1, model_module.NUM_WEEKS)) <= 1, "Max_Thursday_exceptions"
+
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS - 1):
+            model += y[(i, w)] <= sa[(i, w)], f"Y_link_sunday_{i}_{w}"
+            model += y[(i, w)] <= ta[(i, w + 1)], f"Y_link_thursday_{i}_{w}"
+            model += y[(i, w)] >= sa[(i, w)] + ta[(i, w + 1)] - 1, f"Y_link_both_{i}_{w}"
+
+    print(f"Model created with {len(model.constraints)} constraints")
+
+    variables = {
+        'g': g, 'h': h, 'a': a, 'bye': bye, 'y': y, 'v': v,
+        'thu': thu, 'mon': mon, 'sa': sa, 'ta': ta, 'tg': tg, 'mg': mg
+    }
+    return model, variables, matchup_matrix
+
+
+def extract_aggregated_schedule(variables):
+    """
+    Extract the schedule from a solved slot-aggregated model.
+
+    Reads the g, bye, thu and mon values as one array each, like extract_schedule.
+    """
+    away_team, home_team, week = chosen_keys(variables['g'], 3).T
+    byes = chosen_keys(variables['bye'], 2)
+    thursday = chosen_keys(variables['thu'], 2)
+    monday = chosen_keys(variables['mon'], 2)
+
+    slot_grid = np.ones((model_module.NUM_TEAMS, model_module.NUM_WEEKS), dtype=np.int64)
+    slot_grid[thursday[:, 0], thursday[:, 1]] = 0
+    slot_grid[monday[:, 0], monday[:, 1]] = 2
+
+    # Each game as seen by its away team, then by its home team, each in its own slot
+    # (the Thursday and Monday rows put both teams of a game in the same one)
+    team = np.concatenate([away_team, home_team])
+    weeks = np.concatenate([week, week])
+    opponents, homes, slots = week_grid(
+        team, np.concatenate([home_team, away_team]),
+        np.repeat([False, True], len(away_team)), weeks, slot_grid[team, weeks]
+    )
+    on_bye = np.zeros((model_module.NUM_TEAMS, model_module.NUM_WEEKS), dtype=bool)
+    on_bye[byes[:, 0], byes[:, 1]] = True
+
+    return grid_schedule(opponents, homes, slots, on_bye)
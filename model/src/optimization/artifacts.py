@@ -0,0 +1,152 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from pulp import PULP_CBC_CMD
+
+from model import create_nfl_schedule_model
+
+
+def get_artifact_dir():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "../../output/cache/models")
+
+
+def artifact_paths(key):
+    artifact_dir = get_artifact_dir()
+    return os.path.join(artifact_dir, f"{key}.mps.gz"), os.path.join(artifact_dir, f"{key}.json")
+
+
+def save_model_artifact(model, variables, key):
+    """
+    Write the model as a gzipped MPS file under key, with a sidecar JSON mapping each
+    MPS column name to its (family, key) in the variables dict.
+    """
+    mps_path, index_path = artifact_paths(key)
+    os.makedirs(os.path.dirname(mps_path), exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain_path = os.path.join(tmp_dir, "model.mps")
+        _, column_names, _, _ = model.writeMPS(plain_path, rename=1)
+        with open(plain_path, 'rb') as src, gzip.open(f"{mps_path}.tmp", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+    columns = {}
+    for family, family_vars in variables.items():
+        for var_key, var in family_vars.items():
+            columns[column_names[var.name]] = [family, var_key]
+    with open(f"{index_path}.tmp", 'w') as f:
+        json.dump({'objective_constant': model.objective.constant, 'columns': columns}, f)
+
+    # The index is moved into place last, so an artifact is only found once complete
+    os.replace(f"{mps_path}.tmp", mps_path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def model_artifact(matchup_matrix, lazy=False):
+    """
+    Path of the season's cached model and its column index, building and saving the
+    model first if no artifact exists for these matchups, data and model constants.
+    """
+    from cache import cache_key
+
+    key = cache_key(matchup_matrix, {'artifact': 'slot', 'lazy': lazy})
+    mps_path, index_path = artifact_paths(key)
+    if os.path.exists(index_path) and os.path.exists(mps_path):
+        print(f"Using cached model {key[:12]}")
+    else:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, variables, _ = create_nfl_schedule_model(matchup_matrix, lazy)
+        save_model_artifact(model, variables, key)
+        print(f"Built and cached model {key[:12]} ({time.perf_counter() - start:.1f} s)")
+
+    with open(index_path) as f:
+        index = json.load(f)
+    return mps_path, index
+
+
+def read_cbc_solution(solution_path, index):
+    """
+    Parse a CBC solution file into (status line, objective, {family: {key: value}}), the
+    layout extract_schedule takes in place of PuLP variables.
+    """
+    values = {}
+    with open(solution_path) as f:
+        status = f.readline().strip()
+        for line in f:
+            fields = line.replace('**', '').split()
+            if len(fields) < 3 or fields[1] not in index['columns']:
+                continue
+            family, key = index['columns'][fields[1]]
+            key = tuple(key) if isinstance(key, list) else key
+            values.setdefault(family, {})[key] = float(fields[2])
+
+    objective = None
+    if 'objective value' in status:
+        objective = float(status.split()[-1]) + index['objective_constant']
+    return status, objective, values
+
+
+def write_mip_start(path, index, start):
+    """Write start, {family: {key: value}}, as a CBC MIP start file for the cached model."""
+    with open(path, 'w') as f:
+        f.write("Stopped on time - objective value 0\n")
+        for k, (column, (family, key)) in enumerate(index['columns'].items()):
+            key = tuple(key) if isinstance(key, list) else key
+            f.write(f"{k:>7} {column} {start[family].get(key, 0):>15} {0:>23}\n")
+
+
+def warm_start_values(warm_start, matchup_matrix):
+    """
+    {family: {key: value}} of a warm start ('heuristic' or a schedule CSV, repaired if
+    needed), or None if no schedule could be made.
+    """
+    from warm_start import repaired_schedule_games, schedule_values
+
+    if warm_start == 'heuristic':
+        from heuristic import heuristic_games
+        games, _ = heuristic_games(matchup_matrix)
+    else:
+        games = repaired_schedule_games(warm_start, matchup_matrix)
+    if games is None:
+        return None
+    return schedule_values(games)
+
+
+def solve_artifact(mps_path, index, time_limit, mip_gap, start=None):
+    """
+    Solve a cached model by running CBC directly on its MPS file, skipping the PuLP model.
+    start (warm_start.schedule_values of a schedule) is given to CBC as its first
+    incumbent. Returns (objective, values) like solve_with_highs, or (None, None) without
+    a solution.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain_path = os.path.join(tmp_dir, "model.mps")
+        solution_path = os.path.join(tmp_dir, "model.sol")
+        with gzip.open(mps_path, 'rb') as src, open(plain_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        args = [PULP_CBC_CMD().path, plain_path]
+        if start is not None:
+            start_path = os.path.join(tmp_dir, "model.mst")
+            write_mip_start(start_path, index, start)
+            args += ['-mips', start_path]
+        subprocess.run(args + [
+            '-sec', str(time_limit), '-ratio', str(mip_gap), '-timeMode', 'elapsed', '-solve',
+            '-printingOptions', 'all', '-solution', solution_path
+        ], check=True)
+        if not os.path.exists(solution_path):
+            return None, None
+        status, objective, values = read_cbc_solution(solution_path, index)
+
+    print(f"\nSolution status: {status}")
+    if objective is None or status.startswith('Infeasible') or 'no integer' in status:
+        return None, None
+    return objective, values
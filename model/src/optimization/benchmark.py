@@ -0,0 +1,488 @@
+import contextlib
+import io
+import multiprocessing
+import resource
+import time
+
+from pulp import (
+    PULP_CBC_CMD, LpBinary, LpConstraintEQ, LpConstraintGE, LpConstraintLE, LpMinimize,
+    LpProblem, LpStatus, LpVariable
+)
+
+import model as model_module
+from model import (
+    build_objective, create_nfl_schedule_model, extract_schedule, load_matchup_matrix,
+    get_output_path, load_schedule_from_csv, matchup_matrix_from_schedule, load_all_distances,
+    precompute_game_emissions, precompute_average_paired_savings, pulp_constraint, row_terms,
+    schedule_keys, schedule_rows, variable_name
+)
+from aggregated_model import create_aggregated_schedule_model
+
+YEARS = list(range(2021, 2027))
+
+
+def best_time(fn, repeats=5):
+    """Return the fastest wall-clock time of fn over several runs, with its output silenced."""
+    times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def scan_rows(matchup_matrix):
+    """
+    The slot model's rows as create_nfl_schedule_model gathered them before build_index:
+    every row collects its x keys by scanning teams and slots with membership tests.
+    Rows are (name, terms, sense, rhs) as in schedule_rows.
+    """
+    teams = range(model_module.NUM_TEAMS)
+    weeks = range(model_module.NUM_WEEKS)
+    slots = range(model_module.NUM_SLOTS)
+    x = set(schedule_keys(matchup_matrix)['x'])
+
+    def scan(keys):
+        return [k for k in keys if k in x]
+
+    def season(i, j):
+        return scan((i, j, w, s) for w in weeks for s in slots)
+
+    def away_slot(i, w, s):
+        return scan((i, j, w, s) for j in teams)
+
+    for i in teams:
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            if matchup_matrix.get((i, j), 0) == 2:
+                yield (f"Divisional_i_away_{i}_{j}", row_terms(('x', season(i, j), 1)),
+                       LpConstraintEQ, 1)
+                yield (f"Divisional_j_away_{i}_{j}", row_terms(('x', season(j, i), 1)),
+                       LpConstraintEQ, 1)
+            elif matchup_matrix.get((i, j), 0) == 1:
+                games = season(i, j) + season(j, i)
+                yield f"NonDiv_matchup_{i}_{j}", row_terms(('x', games, 1)), LpConstraintEQ, 1
+
+    for i in teams:
+        for w in weeks:
+            activity = row_terms(('h', [(i, w)], 1), ('a', [(i, w)], 1), ('bye', [(i, w)], 1))
+            yield f"One_activity_{i}_{w}", activity, LpConstraintEQ, 1
+            home_games = scan((j, i, w, s) for j in teams for s in slots)
+            away_games = scan((i, j, w, s) for j in teams for s in slots)
+            if home_games:
+                terms = row_terms(('x', home_games, 1), ('h', [(i, w)], -1))
+                yield f"Link_home_{i}_{w}", terms, LpConstraintEQ, 0
+            else:
+                yield f"No_home_possible_{i}_{w}", row_terms(('h', [(i, w)], 1)), LpConstraintEQ, 0
+            if away_games:
+                terms = row_terms(('x', away_games, 1), ('a', [(i, w)], -1))
+                yield f"Link_away_{i}_{w}", terms, LpConstraintEQ, 0
+            else:
+                yield f"No_away_possible_{i}_{w}", row_terms(('a', [(i, w)], 1)), LpConstraintEQ, 0
+
+    for i in teams:
+        team_weeks = [(i, w) for w in weeks]
+        yield (f"Total_games_{i}", row_terms(('h', team_weeks, 1), ('a', team_weeks, 1)),
+               LpConstraintEQ, model_module.NUM_WEEKS - 1)
+        total_home = row_terms(('h', team_weeks, 1))
+        yield f"Min_home_{i}", total_home, LpConstraintGE, (model_module.NUM_WEEKS - 1) // 2
+        yield f"Max_home_{i}", total_home, LpConstraintLE, model_module.NUM_WEEKS // 2
+        yield f"One_bye_{i}", row_terms(('bye', team_weeks, 1)), LpConstraintEQ, 1
+        for w in weeks:
+            if w < model_module.BYE_WEEK_START - 1 or w > model_module.BYE_WEEK_END - 1:
+                yield f"No_bye_week_{i}_{w}", row_terms(('bye', [(i, w)], 1)), LpConstraintEQ, 0
+        for w in range(model_module.NUM_WEEKS - 3):
+            window = [(i, w + k) for k in range(4)]
+            yield f"Max_consec_home_{i}_{w}", row_terms(('h', window, 1)), LpConstraintLE, 3
+            yield f"Max_consec_away_{i}_{w}", row_terms(('a', window, 1)), LpConstraintLE, 3
+
+    for div_teams in model_module.DIVISIONS.values():
+        for idx, i in enumerate(div_teams):
+            for j in div_teams[idx + 1:]:
+                for w in range(model_module.NUM_WEEKS - 1):
+                    games_w = scan(k for s in slots for k in [(i, j, w, s), (j, i, w, s)])
+                    games_w1 = scan(k for s in slots for k in [(i, j, w + 1, s), (j, i, w + 1, s)])
+                    if games_w and games_w1:
+                        terms = row_terms(('x', games_w + games_w1, 1))
+                        yield f"No_consec_div_{i}_{j}_{w}", terms, LpConstraintLE, 1
+
+    for team_a, team_b in model_module.STADIUM_SHARING_PAIRS:
+        idx_a, idx_b = model_module.TEAM_IDX[team_a], model_module.TEAM_IDX[team_b]
+        for w in weeks:
+            for s in slots:
+                home_a = scan((j, idx_a, w, s) for j in teams)
+                home_b = scan((j, idx_b, w, s) for j in teams)
+                playing_each_other = scan([(idx_b, idx_a, w, s), (idx_a, idx_b, w, s)])
+                if home_a and home_b:
+                    terms = row_terms(('x', home_a + home_b, 1), ('x', playing_each_other, -1))
+                    yield f"Stadium_share_{idx_a}_{idx_b}_{w}_{s}", terms, LpConstraintLE, 1
+
+    for w in weeks:
+        for s, name in ((0, "Thursday"), (2, "Monday")):
+            slot_games = scan((i, j, w, s) for i in teams for j in teams)
+            if slot_games:
+                yield f"{name}_game_count_{w}", row_terms(('x', slot_games, 1)), LpConstraintEQ, 1
+    for w in weeks:
+        all_games = scan((i, j, w, s) for i in teams for j in teams for s in slots)
+        if all_games:
+            terms = row_terms(('x', all_games, 2), ('bye', [(i, w) for i in teams], 1))
+            yield f"Games_per_week_{w}", terms, LpConstraintEQ, model_module.NUM_TEAMS
+
+    for i in teams:
+        for w in range(1, model_module.NUM_WEEKS):
+            thursday_away = away_slot(i, w, 0)
+            sunday_away_prev = away_slot(i, w - 1, 1)
+            if thursday_away and sunday_away_prev:
+                terms = row_terms(
+                    ('x', thursday_away, 1), ('x', sunday_away_prev, -1), ('v', [w], -1)
+                )
+                yield f"Thursday_requires_Sunday_away_{i}_{w}", terms, LpConstraintLE, 0
+            elif thursday_away:
+                terms = row_terms(('x', thursday_away, 1), ('v', [w], -1))
+                yield f"No_Thursday_away_{i}_{w}", terms, LpConstraintLE, 0
+    yield (
+        "Max_Thursday_exceptions", row_terms(('v', range(1, model_module.NUM_WEEKS), 1)),
+        LpConstraintLE, 1
+    )
+
+    for i in teams:
+        for w in range(model_module.NUM_WEEKS - 1):
+            sunday_away = away_slot(i, w, 1)
+            thursday_away_next = away_slot(i, w + 1, 0)
+            paired = [(i, w)]
+            if sunday_away and thursday_away_next:
+                sunday = ('x', sunday_away, -1)
+                thursday = ('x', thursday_away_next, -1)
+                yield (f"Y_link_sunday_{i}_{w}", row_terms(('y', paired, 1), sunday),
+                       LpConstraintLE, 0)
+                yield (f"Y_link_thursday_{i}_{w}", row_terms(('y', paired, 1), thursday),
+                       LpConstraintLE, 0)
+                yield (f"Y_link_both_{i}_{w}", row_terms(('y', paired, 1), sunday, thursday),
+                       LpConstraintGE, -1)
+            else:
+                yield f"Y_zero_{i}_{w}", row_terms(('y', paired, 1)), LpConstraintEQ, 0
+
+
+def scan_model(matchup_matrix):
+    """The slot model built from scan_rows, as create_nfl_schedule_model is from schedule_rows."""
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+    model = LpProblem("NFL_Schedule_Optimization", LpMinimize)
+
+    variables = {
+        family: {key: LpVariable(variable_name(family, key), cat=LpBinary) for key in keys}
+        for family, keys in schedule_keys(matchup_matrix).items()
+    }
+    model += (
+        build_objective(variables, game_emissions, avg_paired_savings),
+        "Total_CO2_Emissions"
+    )
+    for name, terms, sense, rhs in scan_rows(matchup_matrix):
+        model += pulp_constraint(variables, terms, sense, rhs, name)
+    return model
+
+
+def benchmark_build(repeats=5):
+    """
+    Time gathering the slot model's rows by scanning against by the x index, then the full
+    model build (rows plus PuLP variables and constraints) each way.
+    """
+    matchup_matrix = load_matchup_matrix()
+
+    def by_name(rows):
+        return {name: (terms, sense, rhs) for name, terms, sense, rhs in rows}
+
+    rows = by_name(schedule_rows(matchup_matrix))
+    if by_name(scan_rows(matchup_matrix)) != rows:
+        raise RuntimeError("Scan-based rows differ from schedule_rows")
+
+    timings = {
+        'scan_rows': best_time(lambda: list(scan_rows(matchup_matrix)), repeats),
+        'index_rows': best_time(lambda: list(schedule_rows(matchup_matrix)), repeats),
+        'scan_build': best_time(lambda: scan_model(matchup_matrix), repeats),
+        'index_build': best_time(lambda: create_nfl_schedule_model(matchup_matrix), repeats)
+    }
+
+    def faster(scan, index):
+        return f"{(scan - index) / scan * 100:.1f}% faster"
+
+    print(f"Rows: {len(rows)}")
+    for label, step in (('Row generation', 'rows'), ('Full build', 'build')):
+        scan, index = timings[f'scan_{step}'], timings[f'index_{step}']
+        print(f"{label + ':':<16} scan {scan:.3f} s, indexed {index:.3f} s ({faster(scan, index)})")
+
+    return timings
+
+
+def instance_matchup_matrix(year):
+    """Matchup matrix for a season, taken from its saved optimized schedule."""
+    schedule = load_schedule_from_csv(get_output_path(year, f"{year}_schedule.csv"))
+    return matchup_matrix_from_schedule(schedule)
+
+
+def time_to_gap(model, time_limit, mip_gap):
+    start = time.perf_counter()
+    model.solve(PULP_CBC_CMD(timeLimit=time_limit, gapRel=mip_gap, msg=False))
+    return time.perf_counter() - start, LpStatus[model.status]
+
+
+def benchmark_formulations(years=None, time_limit=600, mip_gap=0.005, solve=True):
+    """Compare the per-slot and slot-aggregated formulations on each season's instance."""
+    if years is None:
+        years = YEARS
+
+    builders = {
+        'slot': create_nfl_schedule_model,
+        'week': create_aggregated_schedule_model
+    }
+
+    results = {}
+    for year in years:
+        matchup_matrix = instance_matchup_matrix(year)
+
+        for formulation, builder in builders.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                model, _, _ = builder(matchup_matrix)
+                build_time = time.perf_counter() - start
+
+            variables = model.variables()
+            row = {
+                'variables': len(variables),
+                'binaries': sum(1 for var in variables if var.cat != 'Continuous'),
+                'constraints': len(model.constraints),
+                'build_time': build_time,
+                'solve_time': None,
+                'status': None
+            }
+            if solve:
+                row['solve_time'], row['status'] = time_to_gap(model, time_limit, mip_gap)
+
+            results[(year, formulation)] = row
+
+    print(f"{'Year':<6} {'Form':<6} {'Vars':>7} {'Binary':>7} {'Rows':>7} "
+          f"{'Build (s)':>10} {'Solve (s)':>10} Status")
+    for (year, formulation), row in results.items():
+        solve_time = f"{row['solve_time']:.1f}" if row['solve_time'] is not None else '-'
+        print(f"{year:<6} {formulation:<6} {row['variables']:>7} {row['binaries']:>7} "
+              f"{row['constraints']:>7} {row['build_time']:>10.2f} {solve_time:>10} "
+              f"{row['status'] or '-'}")
+
+    return results
+
+
+def benchmark_lazy(years=None, time_limit=600, mip_gap=0.005):
+    """
+    Compare rows and time-to-gap of the full slot model against lazy window rows per season.
+    """
+    from lazy_constraints import lazy_row_count, solve_lazy
+
+    if years is None:
+        years = YEARS
+
+    results = {}
+    for year in years:
+        matchup_matrix = instance_matchup_matrix(year)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, _, _ = create_nfl_schedule_model(matchup_matrix)
+        solve_time, status = time_to_gap(model, time_limit, mip_gap)
+        results[(year, 'full')] = {
+            'rows': len(model.constraints), 'solve_time': solve_time, 'status': status
+        }
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, variables, _ = create_nfl_schedule_model(matchup_matrix, lazy=True)
+            initial_rows = len(model.constraints)
+            start = time.perf_counter()
+            objective, stats = solve_lazy(model, variables, time_limit, mip_gap, presolve=False)
+            solve_time = time.perf_counter() - start
+        results[(year, 'lazy')] = {
+            'rows': initial_rows,
+            'rows_added': stats['rows_added'],
+            'lazy_rows': lazy_row_count(variables),
+            'rounds': stats['rounds'],
+            'solve_time': solve_time,
+            'status': 'Optimal' if objective is not None else 'Not Solved'
+        }
+
+    print(f"{'Year':<6} {'Mode':<5} {'Rows':>7} {'Added':>7} {'Rounds':>7} "
+          f"{'Solve (s)':>10} Status")
+    for (year, mode), row in results.items():
+        added = f"{row['rows_added']}/{row['lazy_rows']}" if mode == 'lazy' else '-'
+        rounds = row['rounds'] if mode == 'lazy' else '-'
+        print(f"{year:<6} {mode:<5} {row['rows']:>7} {added:>7} {rounds:>7} "
+              f"{row['solve_time']:>10.1f} {row['status']}")
+
+    return results
+
+
+def benchmark_decomposition(years=None, time_limit=600, mip_gap=0.005):
+    """Compare emissions and solve time of the monolithic and decomposed solves per season."""
+    from model import solve_schedule
+
+    if years is None:
+        years = YEARS
+
+    results = {}
+    for year in years:
+        matchup_matrix = instance_matchup_matrix(year)
+        for mode in ('monolithic', 'decomposed'):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                _, total_emissions, _ = solve_schedule(
+                    time_limit=time_limit, mip_gap=mip_gap, matchup_matrix=matchup_matrix,
+                    decompose=(mode == 'decomposed')
+                )
+                solve_time = time.perf_counter() - start
+            results[(year, mode)] = {'emissions': total_emissions, 'solve_time': solve_time}
+
+    print(f"{'Year':<6} {'Mode':<11} {'Emissions (kg)':>15} {'Solve (s)':>10}")
+    for (year, mode), row in results.items():
+        emissions = f"{row['emissions']:.2f}" if row['emissions'] is not None else '-'
+        print(f"{year:<6} {mode:<11} {emissions:>15} {row['solve_time']:>10.1f}")
+
+    return results
+
+
+def scan_extract(variables):
+    """Extract a schedule the way extract_schedule did before it read solution arrays."""
+    x = variables['x']
+    slot_names = {0: 'Thursday', 1: 'Sunday', 2: 'Monday'}
+    schedule = {team: [] for team in model_module.TEAMS}
+
+    for w in range(model_module.NUM_WEEKS):
+        for i in range(model_module.NUM_TEAMS):
+            if variables['bye'][(i, w)].varValue > 0.5:
+                schedule[model_module.TEAMS[i]].append({
+                    'week': w + 1, 'opponent': 'BYE', 'home_away': '-', 'slot': '-'
+                })
+                continue
+
+            game = None
+            for j in range(model_module.NUM_TEAMS):
+                for s in range(model_module.NUM_SLOTS):
+                    if (i, j, w, s) in x and x[(i, j, w, s)].varValue > 0.5:
+                        game = (j, 'Away', s)
+                    elif (j, i, w, s) in x and x[(j, i, w, s)].varValue > 0.5:
+                        game = (j, 'Home', s)
+                    if game:
+                        break
+                if game:
+                    break
+
+            if game is None:
+                schedule[model_module.TEAMS[i]].append({
+                    'week': w + 1, 'opponent': 'ERROR', 'home_away': '-', 'slot': '-'
+                })
+            else:
+                schedule[model_module.TEAMS[i]].append({
+                    'week': w + 1, 'opponent': model_module.TEAMS[game[0]], 'home_away': game[1],
+                    'slot': slot_names[game[2]]
+                })
+
+    return schedule
+
+
+def benchmark_extraction(years=None, repeats=20):
+    """Compare per-key and array-based schedule extraction on each season's saved schedule."""
+    from warm_start import apply_warm_start, load_schedule_games
+
+    if years is None:
+        years = YEARS
+
+    results = {}
+    for year in years:
+        schedule_path = get_output_path(year, f"{year}_schedule.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, variables, _ = create_nfl_schedule_model(instance_matchup_matrix(year))
+        apply_warm_start(variables, load_schedule_games(schedule_path))
+
+        scan_time = best_time(lambda: scan_extract(variables), repeats)
+        array_time = best_time(lambda: extract_schedule(variables), repeats)
+        results[year] = {
+            'scan': scan_time, 'array': array_time,
+            'identical': scan_extract(variables) == extract_schedule(variables)
+        }
+
+    print(f"{'Year':<6} {'Scan (ms)':>10} {'Array (ms)':>11} {'Speedup':>8} Identical")
+    for year, row in results.items():
+        print(f"{year:<6} {row['scan'] * 1000:>10.1f} {row['array'] * 1000:>11.1f} "
+              f"{row['scan'] / row['array']:>7.1f}x {row['identical']}")
+
+    return results
+
+
+def run_backend(backend, matchup_matrix, time_limit, mip_gap, queue, num_workers=8):
+    """Build and solve one backend in a fresh process and report its timings and peak RSS."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if backend == 'pulp':
+            model, _, _ = create_nfl_schedule_model(matchup_matrix)
+            build_time = time.perf_counter() - start
+            solve_time, status = time_to_gap(model, time_limit, mip_gap)
+        elif backend == 'cpsat':
+            from cpsat_backend import create_cpsat_model, solve_cpsat_model
+            model, _, _ = create_cpsat_model(matchup_matrix)
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            solver, status = solve_cpsat_model(model, time_limit, mip_gap, num_workers, log=False)
+            status = solver.StatusName(status)
+            solve_time = time.perf_counter() - start
+        else:
+            from highs_backend import build_sparse_model, solve_sparse_model
+            sparse, _, _ = build_sparse_model(matchup_matrix)
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            highs = solve_sparse_model(sparse, time_limit, mip_gap, output=False)
+            solve_time = time.perf_counter() - start
+            status = highs.modelStatusToString(highs.getModelStatus())
+
+    queue.put({
+        'build_time': build_time,
+        'solve_time': solve_time,
+        'status': status,
+        'python_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'child_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    })
+
+
+def benchmark_backends(years=None, time_limit=600, mip_gap=0.005,
+                       backends=('pulp', 'highs', 'cpsat'), num_workers=8):
+    """Compare peak RSS, build time and time-to-gap of the solver backends per season."""
+    if years is None:
+        years = YEARS
+
+    results = {}
+    for year in years:
+        matchup_matrix = instance_matchup_matrix(year)
+        for backend in backends:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=run_backend,
+                args=(backend, matchup_matrix, time_limit, mip_gap, queue, num_workers)
+            )
+            process.start()
+            process.join()
+            if process.exitcode != 0 or queue.empty():
+                print(f"{year} {backend}: benchmark process failed (exit code {process.exitcode})")
+                continue
+            results[(year, backend)] = queue.get()
+
+    print(f"{'Year':<6} {'Backend':<8} {'Python RSS':>11} {'Solver RSS':>11} "
+          f"{'Build (s)':>10} {'Solve (s)':>10} Status")
+    for (year, backend), row in results.items():
+        print(f"{year:<6} {backend:<8} {row['python_rss_mb']:>8.0f} MB {row['child_rss_mb']:>8.0f} MB "
+              f"{row['build_time']:>10.2f} {row['solve_time']:>10.1f} {row['status']}")
+
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_build()
+    benchmark_formulations()
+    benchmark_backends()
+    benchmark_lazy()
+    benchmark_decomposition()
+    benchmark_extraction()
@@ -0,0 +1,277 @@
+import contextlib
+import io
+import os
+import time
+
+from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+from model import (
+    build_objective, create_nfl_schedule_model, get_output_path, load_all_distances,
+    load_matchup_matrix, precompute_game_emissions
+)
+from heuristic import heuristic_games, pairing_savings
+
+# Subgradient iterations of the Lagrangian bound
+LAGRANGIAN_ITERATIONS = 20
+
+# Polyak step scale, halved after STALL_ITERATIONS iterations without a better bound
+STEP_SCALE = 0.1
+STALL_ITERATIONS = 3
+
+
+def variable_weeks(variables):
+    """Week of every model variable, by name."""
+    weeks = {}
+    for family, family_vars in variables.items():
+        for key, var in family_vars.items():
+            if family == 'v':
+                weeks[var.name] = key
+            else:
+                weeks[var.name] = key[{'x': 2, 'p': 3}.get(family, 1)]
+    return weeks
+
+
+def split_week_rows(model, variables):
+    """
+    Split the rows into those spanning several weeks, which the Lagrangian relaxes, and
+    blocks of the remaining rows that share variables (one per week). Returns the relaxed
+    rows and a list of (block variables, block rows).
+    """
+    weeks = variable_weeks(variables)
+    relaxed, kept = [], []
+    for name, row in model.constraints.items():
+        row_weeks = {weeks[var.name] for var in row}
+        (relaxed if len(row_weeks) > 1 else kept).append((name, row))
+
+    parent = {}
+
+    def find(name):
+        while parent.setdefault(name, name) != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for _, row in kept:
+        names = [var.name for var in row]
+        for name in names[1:]:
+            parent[find(name)] = find(names[0])
+
+    blocks = {}
+    for name, row in kept:
+        root = find(next(iter(row)).name)
+        block = blocks.setdefault(root, ({}, []))
+        block[0].update((var.name, var) for var in row)
+        block[1].append((name, row))
+    return relaxed, list(blocks.values())
+
+
+def price_trips_exactly(model, variables, matchup_matrix):
+    """
+    Replace the slot model's average paired savings with exact ones: y carries no cost and
+    is split among trip columns p, one per (team, Sunday opponent, Thursday opponent, week)
+    the x variables allow, each priced at its own saving and only on while both its games
+    are. A schedule's y switches on exactly its trips' p, so the model's objective is
+    calculate_total_emissions and its LP relaxation a bound on it.
+    """
+    distances = load_all_distances()
+    model.setObjective(build_objective(
+        variables, precompute_game_emissions(distances, matchup_matrix), {}
+    ))
+
+    sunday, thursday = {}, {}
+    for i, j, w, s in variables['x']:
+        if s == 1:
+            sunday.setdefault((i, w), []).append(j)
+        elif s == 0:
+            thursday.setdefault((i, w), []).append(j)
+
+    variables['p'], trips = {}, {}
+    for i, w in variables['y']:
+        for opp1 in sunday.get((i, w), []):
+            for opp2 in thursday.get((i, w + 1), []):
+                p = LpVariable(f"trip_{i}_{opp1}_{opp2}_{w}", lowBound=0, upBound=1)
+                variables['p'][(i, opp1, opp2, w)] = p
+                model.objective.addterm(p, -pairing_savings(distances, i, opp1, opp2))
+                trips.setdefault(('Trip_total', i, w), []).append(p)
+                trips.setdefault(('Trip_sunday', i, opp1, w), []).append(p)
+                trips.setdefault(('Trip_thursday', i, opp2, w), []).append(p)
+
+    for (i, w), y in variables['y'].items():
+        model += lpSum(trips.get(('Trip_total', i, w), [])) == y, f"Trip_total_{i}_{w}"
+    for key, columns in trips.items():
+        if key[0] == 'Trip_total':
+            continue
+        kind, i, opp, w = key
+        game = (i, opp, w, 1) if kind == 'Trip_sunday' else (i, opp, w + 1, 0)
+        model += lpSum(columns) <= variables['x'][game], f"{kind}_{i}_{opp}_{w}"
+
+
+def lp_bound(model):
+    """Objective of the LP relaxation; CBC leaves the row duals on model.constraints."""
+    model.solve(PULP_CBC_CMD(mip=False, msg=False))
+    if model.status != 1:
+        return None
+    return value(model.objective)
+
+
+def lagrangian_bound(model, variables, upper_bound, iterations=None):
+    """
+    Lagrangian bound with every week-coupling row dualized. What is left splits into one
+    small MIP per week, plus variables in no remaining row, which are set by the sign of
+    their reduced cost. Multipliers start from the LP duals, so the first bound is at
+    the LP bound (up to the duals' tolerance), and follow Polyak subgradient steps towards
+    upper_bound. If the week MIPs are integral in practice their bound cannot pass the
+    LP's; it gains when slot and stadium rows cut off fractional weeks. Requires
+    lp_bound(model) to have been solved. Returns the best bound found.
+    """
+    if iterations is None:
+        iterations = LAGRANGIAN_ITERATIONS
+
+    relaxed, blocks = split_week_rows(model, variables)
+    rows = [(name, list(row.items()), -row.constant, row.sense) for name, row in relaxed]
+    multipliers = {name: row.pi or 0 for name, row in relaxed}
+    costs = {var.name: coef for var, coef in model.objective.items()}
+    all_vars = {var.name: var for var in model.variables()}
+
+    block_vars = set()
+    block_models = []
+    for block_var_map, block_rows in blocks:
+        block_model = LpProblem("Lagrangian_week", LpMinimize)
+        for name, row in block_rows:
+            block_model += row, name
+        block_models.append((block_model, list(block_var_map.values())))
+        block_vars.update(block_var_map)
+    free_vars = [var for name, var in all_vars.items() if name not in block_vars]
+
+    best, scale, stall = None, STEP_SCALE, 0
+    for iteration in range(iterations):
+        reduced = dict(costs)
+        for name, terms, _, _ in rows:
+            if multipliers[name]:
+                for var, coef in terms:
+                    reduced[var.name] = reduced.get(var.name, 0) - multipliers[name] * coef
+
+        bound = model.objective.constant + sum(multipliers[name] * rhs for name, _, rhs, _ in rows)
+        values = {}
+        for block_model, block_var_list in block_models:
+            block_model.setObjective(lpSum(reduced.get(var.name, 0) * var for var in block_var_list))
+            block_model.solve(PULP_CBC_CMD(msg=False))
+            if block_model.status != 1:
+                raise RuntimeError(f"Week subproblem is {LpStatus[block_model.status]}")
+            bound += value(block_model.objective) or 0
+            values.update((var.name, var.varValue or 0) for var in block_var_list)
+        for var in free_vars:
+            values[var.name] = 1 if reduced.get(var.name, 0) < 0 else 0
+            bound += min(0, reduced.get(var.name, 0))
+
+        if best is None or bound > best + 1e-6 * abs(best):
+            best, stall = bound, 0
+        else:
+            stall += 1
+            if stall >= STALL_ITERATIONS:
+                scale, stall = scale / 2, 0
+        print(f"Lagrangian iteration {iteration + 1}: {bound:.2f} (best {best:.2f})")
+
+        subgradient = {
+            name: rhs - sum(coef * values[var.name] for var, coef in terms)
+            for name, terms, rhs, _ in rows
+        }
+        norm = sum(g * g for g in subgradient.values())
+        if norm == 0 or upper_bound <= best:
+            break
+        step = scale * (upper_bound - bound) / norm
+        for name, _, _, sense in rows:
+            multiplier = multipliers[name] + step * subgradient[name]
+            # Duals of >= rows stay nonnegative and of <= rows nonpositive
+            if sense > 0:
+                multiplier = max(multiplier, 0)
+            elif sense < 0:
+                multiplier = min(multiplier, 0)
+            multipliers[name] = multiplier
+
+    return best
+
+
+def season_bound(matchup_matrix=None, lagrangian=False, iterations=None):
+    """
+    Lower bound on one season's emissions as calculate_total_emissions counts them, without
+    solving the MIP. The slot model prices each road trip by the team's average paired
+    saving, which some schedules beat, so the bound prices each trip exactly.
+    Returns a dict with the LP bound, the Lagrangian bound (if asked for) and their times.
+    """
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+        price_trips_exactly(model, variables, matchup_matrix)
+
+    start = time.perf_counter()
+    result = {'lp_bound': lp_bound(model), 'lagrangian_bound': None}
+    result['lp_time'] = time.perf_counter() - start
+    if result['lp_bound'] is None:
+        print(f"LP relaxation: {LpStatus[model.status]}")
+        return result
+    print(f"LP bound: {result['lp_bound']:.2f} ({result['lp_time']:.1f} s)")
+
+    if lagrangian:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, heuristic_emissions = heuristic_games(matchup_matrix)
+        # Without a heuristic schedule, aim the steps a little above the LP bound
+        upper_bound = heuristic_emissions or 1.05 * result['lp_bound']
+
+        start = time.perf_counter()
+        result['lagrangian_bound'] = lagrangian_bound(model, variables, upper_bound, iterations)
+        result['lagrangian_time'] = time.perf_counter() - start
+        print(f"Lagrangian bound: {result['lagrangian_bound']:.2f} "
+              f"({result['lagrangian_time']:.1f} s)")
+
+    return result
+
+
+def read_emissions(path):
+    """Total kg CO2 from the first line of an emissions text file, or None if missing."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return float(f.readline().split()[0])
+
+
+def bound_report(years=None, lagrangian=False, iterations=None):
+    """
+    Print each season's lower bound next to the actual NFL schedule's emissions
+    (actual/emissions/) and the optimized schedule's (output/<year>/), with the gap of
+    each to the bound.
+    """
+    from matchups import generate_matchups
+
+    if years is None:
+        years = list(range(2021, 2027))
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    results = {}
+    for year in years:
+        print(f"\n{year}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_matchups(year=year)
+        result = season_bound(load_matchup_matrix(), lagrangian, iterations)
+        result['actual'] = read_emissions(
+            os.path.join(script_dir, f"../../../actual/emissions/{year}_emissions.txt")
+        )
+        result['optimized'] = read_emissions(get_output_path(year, f"{year}_emissions.txt"))
+        results[year] = result
+
+    def gap(emissions, bound):
+        return f"{(emissions - bound) / emissions * 100:.2f}%" if emissions and bound else '-'
+
+    print(f"\n{'Year':<6} {'Bound (kg)':>15} {'Actual (kg)':>15} {'Gap':>8} "
+          f"{'Optimized (kg)':>15} {'Gap':>8}")
+    for year, result in results.items():
+        found = [b for b in (result['lp_bound'], result['lagrangian_bound']) if b is not None]
+        bound = max(found) if found else None
+        bound_text = f"{bound:.2f}" if bound is not None else '-'
+        actual = f"{result['actual']:.2f}" if result['actual'] else '-'
+        optimized = f"{result['optimized']:.2f}" if result['optimized'] else '-'
+        print(f"{year:<6} {bound_text:>15} {actual:>15} {gap(result['actual'], bound):>8} "
+              f"{optimized:>15} {gap(result['optimized'], bound):>8}")
+
+    return results
@@ -0,0 +1,110 @@
+import glob
+import hashlib
+import json
+import os
+
+import model as model_module
+from model import DISTANCE_FILES, get_data_path, load_schedule_from_csv, save_schedule_to_csv
+
+# Solved schedules kept before the least recently used are evicted
+CACHE_SIZE = 64
+
+# Module constants of model.py that change the model or how emissions are scored
+MODEL_PARAMETERS = (
+    'BUS_EMISSION_RATE', 'PLANE_EMISSION_RATE', 'BUS_ONLY_THRESHOLD', 'NUM_TEAMS', 'NUM_WEEKS',
+    'NUM_SLOTS', 'GAMES_PER_WEEK', 'BYE_WEEK_START', 'BYE_WEEK_END', 'TEAMS',
+    'STADIUM_SHARING_PAIRS', 'DIVISIONS'
+)
+
+# Package whose modules make up the solve path (formulations, presolve, heuristics, backends);
+# editing any of them invalidates cached solutions and models
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_cache_dir():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "../../output/cache")
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def cache_key(matchup_matrix, settings):
+    """
+    Hash of everything that determines a solve: the matchup matrix, the contents of the
+    distance CSVs, the model constants (read at call time, so scenario overrides count),
+    the source of every module in the package and the solver settings. A warm start
+    schedule is hashed by its contents.
+    """
+    settings = dict(settings)
+    warm_start = settings.get('warm_start')
+    if warm_start is not None and warm_start != 'heuristic' and os.path.exists(warm_start):
+        settings['warm_start'] = file_digest(warm_start)
+
+    contents = {
+        'matchups': sorted((i, j, n) for (i, j), n in matchup_matrix.items() if n),
+        'distances': {
+            key: file_digest(get_data_path(f"distances/{filename}"))
+            for key, filename in DISTANCE_FILES.items()
+        },
+        'parameters': {name: getattr(model_module, name) for name in MODEL_PARAMETERS},
+        'source': {
+            os.path.basename(path): file_digest(path)
+            for path in sorted(glob.glob(os.path.join(SOURCE_DIR, '*.py')))
+        },
+        'settings': settings
+    }
+    encoded = json.dumps(contents, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def cache_paths(key):
+    cache_dir = get_cache_dir()
+    return os.path.join(cache_dir, f"{key}.csv"), os.path.join(cache_dir, f"{key}.json")
+
+
+def cached_solution(key):
+    """
+    (schedule, total_emissions, paired_trips) stored under key, or None on a miss.
+    A hit marks the entry as recently used.
+    """
+    schedule_path, result_path = cache_paths(key)
+    if not os.path.exists(result_path) or not os.path.exists(schedule_path):
+        return None
+
+    with open(result_path) as f:
+        result = json.load(f)
+    os.utime(result_path)
+    return load_schedule_from_csv(schedule_path), result['total_emissions'], result['paired_trips']
+
+
+def store_solution(key, schedule, total_emissions, paired_trips):
+    """Store a solved schedule under key, then evict down to CACHE_SIZE entries."""
+    schedule_path, result_path = cache_paths(key)
+    os.makedirs(os.path.dirname(schedule_path), exist_ok=True)
+    save_schedule_to_csv(schedule, schedule_path)
+    with open(f"{result_path}.tmp", 'w') as f:
+        json.dump({'total_emissions': total_emissions, 'paired_trips': paired_trips}, f)
+    # The result file is written last, so an entry is only visible once it is complete
+    os.replace(f"{result_path}.tmp", result_path)
+    evict()
+
+
+def evict(size=None):
+    """Remove the least recently used entries beyond size (default CACHE_SIZE)."""
+    if size is None:
+        size = CACHE_SIZE
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+
+    results = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+               if name.endswith('.json')]
+    results.sort(key=os.path.getmtime, reverse=True)
+    for result_path in results[size:]:
+        os.remove(result_path)
+        schedule_path = result_path[:-len('.json')] + '.csv'
+        if os.path.exists(schedule_path):
+            os.remove(schedule_path)
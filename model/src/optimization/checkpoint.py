@@ -0,0 +1,154 @@
+import json
+import os
+import time
+
+from pulp import PULP_CBC_CMD, LpSolutionOptimal, LpStatus, value
+
+from model import (
+    calculate_total_emissions, extract_schedule, load_all_distances, load_schedule_from_csv,
+    matchup_matrix_from_schedule, save_schedule_to_csv
+)
+
+# Seconds CBC runs before the first checkpoint; each round restarts CBC from the last
+# incumbent and runs CHECKPOINT_GROWTH times longer than the one before
+CHECKPOINT_INTERVAL = 300
+CHECKPOINT_GROWTH = 2
+
+
+def checkpoint_paths(checkpoint):
+    """Schedule CSV and variable values JSON written for a checkpoint path prefix."""
+    return f"{checkpoint}.csv", f"{checkpoint}.json"
+
+
+def write_checkpoint(checkpoint, model, variables, mip_gap, complete, elapsed):
+    """
+    Save the incumbent as a schedule CSV plus every variable value. Both files are
+    written to a temporary name first, so a run killed mid-write keeps the last checkpoint.
+    """
+    schedule_path, values_path = checkpoint_paths(checkpoint)
+    os.makedirs(os.path.dirname(os.path.abspath(schedule_path)), exist_ok=True)
+
+    save_schedule_to_csv(extract_schedule(variables), f"{schedule_path}.tmp")
+    with open(f"{values_path}.tmp", 'w') as f:
+        json.dump({
+            'objective': value(model.objective),
+            'mip_gap': mip_gap,
+            'complete': complete,
+            'elapsed': elapsed,
+            'values': {var.name: var.varValue for var in model.variables()}
+        }, f)
+
+    os.replace(f"{schedule_path}.tmp", schedule_path)
+    os.replace(f"{values_path}.tmp", values_path)
+
+
+def load_checkpoint(checkpoint):
+    """The checkpoint's JSON contents, or None if there is no checkpoint."""
+    _, values_path = checkpoint_paths(checkpoint)
+    if not os.path.exists(values_path):
+        return None
+    with open(values_path) as f:
+        return json.load(f)
+
+
+def resume_from_checkpoint(model, checkpoint):
+    """
+    Set the model's starting values from a checkpoint. Returns True if they were set;
+    a checkpoint of a different model (other matchups) is ignored.
+    """
+    saved = load_checkpoint(checkpoint)
+    if saved is None:
+        return False
+
+    model_vars = model.variablesDict()
+    if set(saved['values']) != set(model_vars):
+        print(f"Checkpoint {checkpoint} does not match this model; ignoring it")
+        return False
+
+    for name, val in saved['values'].items():
+        model_vars[name].setInitialValue(val)
+    print(f"Resuming from checkpoint: {saved['objective']:.2f} "
+          f"after {saved['elapsed']:.1f} s")
+    return True
+
+
+def completed_checkpoint(checkpoint, mip_gap, matchup_matrix):
+    """
+    The checkpoint's schedule and emissions if it already met mip_gap for these matchups,
+    else None. Returns (schedule, total_emissions, paired_trips) like solve_schedule.
+    """
+    saved = load_checkpoint(checkpoint)
+    if saved is None or not saved['complete'] or saved['mip_gap'] > mip_gap:
+        return None
+
+    schedule = load_schedule_from_csv(checkpoint_paths(checkpoint)[0])
+    if matchup_matrix_from_schedule(schedule) != matchup_matrix:
+        return None
+
+    total_emissions, paired_trips = calculate_total_emissions(schedule, load_all_distances())
+    return schedule, total_emissions, paired_trips
+
+
+def solve_with_checkpoints(model, solve_model, variables, time_limit, mip_gap, checkpoint,
+                           warm_start=False, restore=None, telemetry=None, stagnation=None):
+    """
+    Solve in rounds warm-started from the previous incumbent, and write a checkpoint
+    after every round that has one.
+
+    model is the full model and solve_model the one given to CBC (model itself, or its
+    presolved copy, whose fixings restore() writes back). CBC writes its solution only
+    when it stops, and its log carries objectives but no variable values, so every round
+    restarts CBC and rebuilds the search tree and bound. Rounds start at
+    CHECKPOINT_INTERVAL seconds and grow by CHECKPOINT_GROWTH: the restarts cost a bounded
+    share of the time, and a season that needs longer than one interval to prove mip_gap
+    still gets a round long enough to do it and be checkpointed as complete. Stops when
+    CBC proves mip_gap, time_limit is spent or the stagnation rule stops a round (see
+    telemetry.py, whose records span all rounds). Returns the objective or None.
+    """
+    from telemetry import solve_with_telemetry
+
+    start = time.perf_counter()
+    found = False
+    interval = CHECKPOINT_INTERVAL
+    while True:
+        remaining = time_limit - (time.perf_counter() - start)
+        if remaining <= 0:
+            break
+
+        round_limit = min(interval, remaining)
+        interval *= CHECKPOINT_GROWTH
+        if telemetry is not None or stagnation is not None:
+            stopped = solve_with_telemetry(
+                solve_model, telemetry, stagnation, time.perf_counter() - start,
+                timeLimit=round_limit, gapRel=mip_gap, warmStart=warm_start
+            )
+        else:
+            stopped = False
+            solve_model.solve(PULP_CBC_CMD(
+                timeLimit=round_limit, gapRel=mip_gap, msg=True, warmStart=warm_start
+            ))
+        elapsed = time.perf_counter() - start
+        if solve_model.status != 1:
+            print(f"Round ended without an incumbent: {LpStatus[solve_model.status]}")
+            if not found:
+                return None
+            model_vars = model.variablesDict()
+            for name, val in load_checkpoint(checkpoint)['values'].items():
+                model_vars[name].varValue = val
+            break
+
+        if restore is not None:
+            restore()
+        complete = solve_model.sol_status == LpSolutionOptimal
+        write_checkpoint(checkpoint, model, variables, mip_gap, complete, elapsed)
+        print(f"Checkpoint at {elapsed:.1f} s: {value(model.objective):.2f}"
+              f"{' (gap reached)' if complete else ''}")
+        found = True
+        if complete or stopped:
+            break
+
+        for var in model.variables():
+            var.setInitialValue(var.varValue)
+        warm_start = True
+
+    return value(model.objective)
@@ -0,0 +1,96 @@
+from ortools.sat.python import cp_model
+from pulp import LpConstraintEQ, LpConstraintLE
+
+from model import (
+    load_matchup_matrix, load_all_distances, objective_coefficients,
+    precompute_game_emissions, precompute_average_paired_savings, schedule_keys, schedule_rows,
+    variable_name
+)
+
+# CP-SAT needs integer objective coefficients; emissions are kept to 0.01 kg
+EMISSION_SCALE = 100
+
+
+def create_cpsat_model(matchup_matrix=None):
+    """
+    Create the NFL schedule model as a CP-SAT model with the same variables and rows,
+    taken from schedule_rows like the PuLP model.
+    """
+    print("Loading data...")
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    print("Creating CP-SAT model...")
+    model = cp_model.CpModel()
+
+    keys = schedule_keys(matchup_matrix)
+    variables = {
+        family: {key: model.NewBoolVar(variable_name(family, key)) for key in family_keys}
+        for family, family_keys in keys.items()
+    }
+
+    def linear(terms):
+        pairs = [(variables[family][key], coef) for (family, key), coef in terms.items()]
+        return cp_model.LinearExpr.WeightedSum(
+            [var for var, _ in pairs], [coef for _, coef in pairs]
+        )
+
+    print("Setting up objective function...")
+    costs = objective_coefficients(keys, game_emissions, avg_paired_savings)
+    model.Minimize(linear({term: round(cost * EMISSION_SCALE) for term, cost in costs.items()}))
+
+    print("Adding constraints...")
+    for _, terms, sense, rhs in schedule_rows(matchup_matrix):
+        if sense == LpConstraintEQ:
+            model.Add(linear(terms) == rhs)
+        elif sense == LpConstraintLE:
+            model.Add(linear(terms) <= rhs)
+        else:
+            model.Add(linear(terms) >= rhs)
+
+    return model, variables, matchup_matrix
+
+
+def solve_with_cpsat(time_limit=3600, mip_gap=0.005, matchup_matrix=None, num_workers=8):
+    """
+    Solve the schedule model with CP-SAT using num_workers parallel search workers.
+
+    Returns the objective value in kg and a variables dict of solution values for
+    extract_schedule, or (None, None) if no feasible schedule was found.
+    """
+    model, variables, _ = create_cpsat_model(matchup_matrix)
+
+    print("\nSolving model...")
+    print(f"Time limit: {time_limit} seconds")
+    print(f"MIP gap: {mip_gap * 100}%")
+    print(f"Workers: {num_workers}")
+
+    solver, status = solve_cpsat_model(model, time_limit, mip_gap, num_workers)
+
+    print(f"\nSolution status: {solver.StatusName(status)}")
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, None
+
+    return solver.ObjectiveValue() / EMISSION_SCALE, solution_variables(solver, variables)
+
+
+def solve_cpsat_model(model, time_limit, mip_gap, num_workers=8, log=True):
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.relative_gap_limit = mip_gap
+    solver.parameters.num_workers = num_workers
+    solver.parameters.log_search_progress = log
+    status = solver.Solve(model)
+    return solver, status
+
+
+def solution_variables(solver, variables):
+    """Read the CP-SAT solution into the {family: {key: value}} layout."""
+    return {
+        family: {key: solver.Value(var) for key, var in family_vars.items()}
+        for family, family_vars in variables.items()
+    }
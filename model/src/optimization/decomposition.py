@@ -0,0 +1,344 @@
+import time
+
+from pulp import PULP_CBC_CMD, LpBinary, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+import model as model_module
+from model import load_all_distances, precompute_game_emissions, precompute_average_paired_savings
+
+# Patterns tried before giving up; each failed pattern is cut off from phase one
+DECOMPOSITION_ROUNDS = 20
+
+# Fraction of the time limit one phase-two solve may use before its pattern is cut off
+PHASE_TWO_SHARE = 0.25
+
+
+def create_pattern_model(matchup_matrix, game_emissions, avg_paired_savings):
+    """
+    Phase one: a home/away/bye pattern per team and the venue of every single game.
+
+    Keeps the team-week rows of create_nfl_schedule_model (one activity, a game every week
+    but one, half the games at home, one bye inside the bye window, no four home or away weeks in a row),
+    balances home and away teams every week, needs an opponent away whenever a team is at
+    home (and vice versa), and needs a team away on Sunday and the following week in all
+    but one week, so a Thursday game can follow a road game. Continuous f[(away, home, w)]
+    spread every game over the weeks in line with the pattern, the LP relaxation of
+    assigning games to weeks, which rules out most patterns phase two cannot complete.
+    z[(i, j)] = 1 when j hosts the single game against i (i < j); home counts must match
+    the venues. The objective prices the venues and credits each team's average paired
+    savings for at most one back-to-back road week per week, as phase two can pair at most
+    one Thursday game.
+    """
+    model = LpProblem("NFL_Pattern_Selection", LpMinimize)
+
+    h = {}
+    a = {}
+    bye = {}
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            h[(i, w)] = LpVariable(f"h_{i}_{w}", cat=LpBinary)
+            a[(i, w)] = LpVariable(f"a_{i}_{w}", cat=LpBinary)
+            bye[(i, w)] = LpVariable(f"bye_{i}_{w}", cat=LpBinary)
+
+    y = {}
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS - 1):
+            y[(i, w)] = LpVariable(f"y_{i}_{w}", cat=LpBinary)
+
+    z = {}
+    home_games = {i: [] for i in range(model_module.NUM_TEAMS)}
+    venue_terms = []
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            if matchup_value == 2:
+                home_games[i].append(1)
+                home_games[j].append(1)
+            elif matchup_value == 1:
+                z[(i, j)] = LpVariable(f"z_{i}_{j}", cat=LpBinary)
+                home_games[i].append(1 - z[(i, j)])
+                home_games[j].append(z[(i, j)])
+                j_hosts = game_emissions.get((i, j, False), 0) + game_emissions.get((j, i, True), 0)
+                i_hosts = game_emissions.get((j, i, False), 0) + game_emissions.get((i, j, True), 0)
+                venue_terms.append(i_hosts + (j_hosts - i_hosts) * z[(i, j)])
+
+    savings_terms = [avg_paired_savings.get(i, 0) * var for (i, w), var in y.items()]
+    model += lpSum(venue_terms) - lpSum(savings_terms), "Pattern_CO2_Estimate"
+
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            model += h[(i, w)] + a[(i, w)] + bye[(i, w)] == 1, f"One_activity_{i}_{w}"
+
+        total_home = lpSum(h[(i, w)] for w in range(model_module.NUM_WEEKS))
+        model += (
+            lpSum(h[(i, w)] + a[(i, w)] for w in range(model_module.NUM_WEEKS))
+            == model_module.NUM_WEEKS - 1,
+            f"Total_games_{i}"
+        )
+        model += total_home == lpSum(home_games[i]), f"Home_venues_{i}"
+        model += total_home >= (model_module.NUM_WEEKS - 1) // 2, f"Min_home_{i}"
+        model += total_home <= model_module.NUM_WEEKS // 2, f"Max_home_{i}"
+
+        model += lpSum(bye[(i, w)] for w in range(model_module.NUM_WEEKS)) == 1, f"One_bye_{i}"
+        for w in range(model_module.NUM_WEEKS):
+            if w < model_module.BYE_WEEK_START - 1 or w > model_module.BYE_WEEK_END - 1:
+                model += bye[(i, w)] == 0, f"No_bye_week_{i}_{w}"
+
+        for w in range(model_module.NUM_WEEKS - 3):
+            model += lpSum(h[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_home_{i}_{w}"
+            model += lpSum(a[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_away_{i}_{w}"
+
+        for w in range(model_module.NUM_WEEKS - 1):
+            model += y[(i, w)] <= a[(i, w)], f"Road_trip_sunday_{i}_{w}"
+            model += y[(i, w)] <= a[(i, w + 1)], f"Road_trip_thursday_{i}_{w}"
+
+    f = {}
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(model_module.NUM_TEAMS):
+            if i != j and matchup_matrix.get((i, j), 0) > 0:
+                for w in range(model_module.NUM_WEEKS):
+                    f[(i, j, w)] = LpVariable(f"f_{i}_{j}_{w}", lowBound=0, upBound=1)
+
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            if matchup_value == 0:
+                continue
+            i_away = lpSum(f[(i, j, w)] for w in range(model_module.NUM_WEEKS))
+            j_away = lpSum(f[(j, i, w)] for w in range(model_module.NUM_WEEKS))
+            if matchup_value == 2:
+                model += i_away == 1, f"Divisional_i_away_{i}_{j}"
+                model += j_away == 1, f"Divisional_j_away_{i}_{j}"
+                for w in range(model_module.NUM_WEEKS - 1):
+                    model += (
+                        lpSum(f[(p, q, week)] for p, q in ((i, j), (j, i)) for week in (w, w + 1)) <= 1,
+                        f"No_consec_div_{i}_{j}_{w}"
+                    )
+            else:
+                model += i_away == z[(i, j)], f"Venue_i_away_{i}_{j}"
+                model += j_away == 1 - z[(i, j)], f"Venue_j_away_{i}_{j}"
+
+    for i in range(model_module.NUM_TEAMS):
+        opponents = [j for j in range(model_module.NUM_TEAMS) if (i, j, 0) in f]
+        for w in range(model_module.NUM_WEEKS):
+            model += lpSum(f[(j, i, w)] for j in opponents) == h[(i, w)], f"Link_home_{i}_{w}"
+            model += lpSum(f[(i, j, w)] for j in opponents) == a[(i, w)], f"Link_away_{i}_{w}"
+
+    teams = range(model_module.NUM_TEAMS)
+    for w in range(model_module.NUM_WEEKS):
+        model += (
+            lpSum(h[(i, w)] for i in teams) == lpSum(a[(i, w)] for i in teams),
+            f"Home_away_balance_{w}"
+        )
+
+    v = {}
+    for w in range(1, model_module.NUM_WEEKS):
+        v[w] = LpVariable(f"v_{w}", cat=LpBinary)
+        trips = lpSum(y[(i, w - 1)] for i in range(model_module.NUM_TEAMS))
+        model += trips <= 1, f"One_paired_trip_{w}"
+        model += trips + v[w] >= 1, f"Thursday_road_trip_{w}"
+    model += lpSum(v.values()) <= 1, "Max_Thursday_exceptions"
+
+    variables = {'h': h, 'a': a, 'bye': bye, 'y': y, 'z': z, 'f': f, 'v': v}
+    return model, variables
+
+
+def seed_pattern(pattern_variables, games):
+    """Set the pattern, venues and week spread of a complete schedule as phase one's start."""
+    from warm_start import schedule_values
+
+    values = schedule_values(games)
+    played = {(game['away'], game['home']): game['week'] for game in games}
+    values['z'] = {(i, j): int((i, j) in played) for i, j in pattern_variables['z']}
+    values['f'] = {(i, j, w): int(played.get((i, j)) == w) for i, j, w in pattern_variables['f']}
+
+    for family, family_vars in pattern_variables.items():
+        for key, var in family_vars.items():
+            var.setInitialValue(values[family].get(key, 0))
+
+
+def pattern_values(pattern_variables):
+    """The chosen pattern: rounded h, bye and z values keyed by family and index."""
+    return {
+        family: {key: round(value(var) or 0) for key, var in pattern_variables[family].items()}
+        for family in ('h', 'bye', 'z')
+    }
+
+
+def venue_games(matchup_matrix, pattern):
+    """(away, home) games implied by the pattern's venue choices."""
+    games = []
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            if matchup_value == 2:
+                games += [(i, j), (j, i)]
+            elif matchup_value == 1:
+                games.append((i, j) if pattern['z'][(i, j)] else (j, i))
+    return games
+
+
+def unmatched_week(matchup_matrix, pattern):
+    """
+    First week whose home teams cannot all be paired with a distinct away opponent they
+    host during the season (augmenting paths), or None if every week can be matched.
+    """
+    guests = {}
+    for away, home in venue_games(matchup_matrix, pattern):
+        guests.setdefault(home, []).append(away)
+
+    for w in range(model_module.NUM_WEEKS):
+        hosts = [i for i in range(model_module.NUM_TEAMS) if pattern['h'][(i, w)]]
+        away_teams = {
+            i for i in range(model_module.NUM_TEAMS)
+            if not pattern['h'][(i, w)] and not pattern['bye'][(i, w)]
+        }
+        matched = {}
+
+        def augment(host, seen):
+            for guest in guests.get(host, []):
+                if guest in away_teams and guest not in seen:
+                    seen.add(guest)
+                    if guest not in matched or augment(matched[guest], seen):
+                        matched[guest] = host
+                        return True
+            return False
+
+        if not all(augment(host, set()) for host in hosts):
+            return w
+    return None
+
+
+def add_pattern_cut(pattern_model, pattern_variables, pattern, cut_num, week=None):
+    """
+    No-good cut removing one pattern (and venue choice) from phase one. With week set, only
+    that week's home/bye choices and the venues are cut, which removes every pattern sharing
+    the unmatched week.
+    """
+    terms = []
+    for family, values in pattern.items():
+        for key, val in values.items():
+            if week is not None and family != 'z' and key[1] != week:
+                continue
+            var = pattern_variables[family][key]
+            terms.append(1 - var if val else var)
+    pattern_model += lpSum(terms) >= 1, f"Pattern_cut_{cut_num}"
+
+
+def fix_pattern(model, variables, pattern):
+    """
+    Copy of the full model with h, bye and the single-game venues fixed to a pattern.
+    The Link_home/Link_away rows then let presolve drop every x outside the pattern.
+    """
+    from presolve import fix_variables
+
+    fixed = fix_variables(model, {
+        variables[family][key]: val for family in ('h', 'bye') for key, val in pattern[family].items()
+    }, "Pattern")
+
+    by_pair = {}
+    for key in variables['x']:
+        by_pair.setdefault((key[0], key[1]), []).append(key)
+    for (i, j), j_hosts in pattern['z'].items():
+        away, home = (j, i) if j_hosts else (i, j)
+        fixed += (
+            lpSum(variables['x'][k] for k in by_pair.get((away, home), [])) == 0,
+            f"Pattern_venue_{i}_{j}"
+        )
+    return fixed
+
+
+def solve_pattern(model, variables, pattern, time_limit, mip_gap, games=None):
+    """
+    Phase two: solve the full model with a pattern fixed, starting from games if given.
+    Returns the objective, or None if the pattern is infeasible or no schedule was found.
+    """
+    from presolve import presolve_model, restore_fixed_values
+
+    try:
+        phase_two, fixed, _ = presolve_model(fix_pattern(model, variables, pattern))
+    except ValueError as error:
+        print(f"Phase two infeasible: {error}")
+        return None
+
+    if games is not None:
+        from warm_start import apply_warm_start
+        apply_warm_start(variables, games)
+
+    phase_two.solve(PULP_CBC_CMD(
+        timeLimit=time_limit, gapRel=mip_gap, msg=True, warmStart=games is not None
+    ))
+    print(f"Phase two: {LpStatus[phase_two.status]}")
+    if phase_two.status != 1:
+        return None
+
+    restore_fixed_values(fixed)
+    return value(model.objective)
+
+
+def solve_decomposed(model, variables, matchup_matrix, time_limit, mip_gap):
+    """
+    First-break-then-schedule: pick a pattern with the phase-one model, then solve the full
+    slot model with that pattern fixed to assign opponents and slots. When phase two is
+    infeasible, or finds no schedule in PHASE_TWO_SHARE of the time, the pattern is cut off
+    and phase one is re-solved. Phase one starts from the pattern of the constructive
+    heuristic; that pattern is kept as a last resort and solved from the heuristic schedule,
+    so a schedule is always found when the heuristic succeeds. Returns the objective, or
+    None if no pattern led to a schedule.
+    """
+    from heuristic import heuristic_games
+
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+    pattern_model, pattern_variables = create_pattern_model(
+        matchup_matrix, game_emissions, avg_paired_savings
+    )
+
+    games, _ = heuristic_games(matchup_matrix)
+    seed = None
+    if games is not None:
+        seed_pattern(pattern_variables, games)
+        seed = pattern_values(pattern_variables)
+
+    deadline = time.perf_counter() + time_limit
+    phase_two_time = PHASE_TWO_SHARE * time_limit
+    reserve = phase_two_time if seed is not None else 0
+
+    for round_num in range(DECOMPOSITION_ROUNDS):
+        remaining = deadline - time.perf_counter() - reserve
+        if remaining < 1:
+            break
+
+        pattern_model.solve(PULP_CBC_CMD(
+            timeLimit=max(1, remaining / 4), gapRel=mip_gap, msg=False, warmStart=seed is not None
+        ))
+        if pattern_model.status != 1:
+            print(f"Phase one: {LpStatus[pattern_model.status]}")
+            break
+        pattern = pattern_values(pattern_variables)
+        print(f"Round {round_num + 1}: pattern estimate {value(pattern_model.objective):.2f}")
+
+        if pattern == seed:
+            break
+
+        week = unmatched_week(matchup_matrix, pattern)
+        if week is not None:
+            print(f"Week {week + 1} of the pattern cannot be matched")
+            add_pattern_cut(pattern_model, pattern_variables, pattern, round_num, week)
+            continue
+
+        remaining = deadline - time.perf_counter() - reserve
+        objective = solve_pattern(
+            model, variables, pattern, max(1, min(phase_two_time, remaining)), mip_gap
+        )
+        if objective is not None:
+            return objective
+        add_pattern_cut(pattern_model, pattern_variables, pattern, round_num)
+
+    if seed is None:
+        print("No pattern led to a feasible schedule")
+        return None
+
+    print("Solving the heuristic's pattern")
+    remaining = max(1, deadline - time.perf_counter())
+    return solve_pattern(model, variables, seed, remaining, mip_gap, games)
@@ -0,0 +1,221 @@
+import time
+
+from pulp import PULP_CBC_CMD, LpContinuous, LpStatus, LpVariable, value
+
+import model as model_module
+from model import load_all_distances, precompute_average_paired_savings
+from heuristic import pairing_savings
+
+# Pair columns added per pricing round, most negative reduced cost first
+PAIR_COLUMNS_PER_ROUND = 2000
+PRICING_ROUNDS = 5
+
+# Re-solves allowed for adding the road trips an incumbent uses but the model lacks
+LAZY_PAIR_ROUNDS = 5
+
+
+def candidate_pairs(x):
+    """Every (team, Sunday opponent, Thursday opponent, week) road trip the x variables allow."""
+    sunday = {}
+    thursday = {}
+    for i, j, w, s in x:
+        if s == 1:
+            sunday.setdefault((i, w), []).append(j)
+        elif s == 0:
+            thursday.setdefault((i, w), []).append(j)
+
+    return [
+        (i, opp1, opp2, w)
+        for (i, w), opp1_list in sunday.items()
+        for opp1 in opp1_list
+        for opp2 in thursday.get((i, w + 1), [])
+        if opp1 != opp2
+    ]
+
+
+def add_pair_column(model, variables, rows, key, cost):
+    """
+    Add the road-trip variable p for key, linked to y and to its Sunday and Thursday games.
+
+    p is continuous: with binary x and y the linking rows make it 0 or 1.
+    """
+    i, opp1, opp2, w = key
+    p = LpVariable(f"p_{i}_{opp1}_{opp2}_{w}", lowBound=0, upBound=1)
+    variables['p'][key] = p
+    model.objective.addterm(p, cost)
+
+    links = (
+        (f"Pair_total_{i}_{w}", variables['y'][(i, w)]),
+        (f"Pair_sunday_{i}_{opp1}_{w}", variables['x'][(i, opp1, w, 1)]),
+        (f"Pair_thursday_{i}_{opp2}_{w}", variables['x'][(i, opp2, w + 1, 0)])
+    )
+    for name, linked in links:
+        if name in rows:
+            rows[name].expr.addterm(p, 1)
+        else:
+            rows[name] = p - linked <= 0
+            model += rows[name], name
+
+    return p
+
+
+def price_pairs(model, variables, rows, candidates, costs):
+    """
+    Solve the LP relaxation and return the missing pair columns with negative reduced
+    cost, most negative first. Rows not yet in the model price at a dual of zero.
+    """
+    families = [var for family in variables.values() for var in family.values()]
+    saved = [(var, var.cat, var.varValue) for var in families]
+    for var in families:
+        var.cat = LpContinuous
+
+    model.solve(PULP_CBC_CMD(msg=False))
+    status = LpStatus[model.status]
+
+    for var, cat, initial in saved:
+        var.cat = cat
+        var.varValue = initial
+
+    if status != 'Optimal':
+        return []
+
+    def dual(name):
+        row = rows.get(name)
+        return (row.pi or 0) if row is not None else 0
+
+    priced = []
+    for key in candidates:
+        if key in variables['p']:
+            continue
+        i, opp1, opp2, w = key
+        reduced_cost = (
+            costs[key] - dual(f"Pair_total_{i}_{w}")
+            - dual(f"Pair_sunday_{i}_{opp1}_{w}") - dual(f"Pair_thursday_{i}_{opp2}_{w}")
+        )
+        if reduced_cost < -1e-6:
+            priced.append((reduced_cost, key))
+
+    priced.sort()
+    return [key for _, key in priced]
+
+
+def realized_pairs(variables):
+    """Road trips taken by the current solution: away on Sunday, then away on Thursday."""
+    sunday = {}
+    thursday = {}
+    for (i, j, w, s), var in variables['x'].items():
+        if s in (0, 1) and (value(var) or 0) > 0.5:
+            (sunday if s == 1 else thursday)[(i, w)] = j
+
+    return [
+        (i, opp1, thursday[(i, w + 1)], w)
+        for (i, w), opp1 in sunday.items() if (i, w + 1) in thursday
+    ]
+
+
+def solve_exact_pairing(model, variables, matchup_matrix, time_limit, mip_gap,
+                        presolve=True, warm_start=False):
+    """
+    Solve the slot model with every road trip priced by calculate_paired_away_emissions.
+
+    y keeps its average saving, and a pair column p for (team, Sunday opponent, Thursday
+    opponent, week) corrects it to that trip's exact saving. Columns are generated by
+    pricing on the LP relaxation, then each incumbent is checked for road trips the model
+    lacks; these are added (forced on when they save less than the average) and the model
+    is re-solved from the incumbent until the objective equals calculate_total_emissions.
+    time_limit bounds the MIP solves together. If a re-solve fails, the variables are put
+    back to the last incumbent. Returns that incumbent's objective, or None if no feasible
+    schedule was found.
+    """
+    distances = load_all_distances()
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    candidates = candidate_pairs(variables['x'])
+    costs = {
+        key: avg_paired_savings.get(key[0], 0) - pairing_savings(distances, *key[:3])
+        for key in candidates
+    }
+    print(f"Road-trip candidates: {len(candidates)}")
+
+    variables['p'] = {}
+    rows = {}
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS - 1):
+            name = f"Pair_total_{i}_{w}"
+            rows[name] = -variables['y'][(i, w)] <= 0
+            model += rows[name], name
+
+    for round_num in range(PRICING_ROUNDS):
+        priced = price_pairs(model, variables, rows, candidates, costs)
+        for key in priced[:PAIR_COLUMNS_PER_ROUND]:
+            add_pair_column(model, variables, rows, key, costs[key])
+        print(f"Pricing round {round_num + 1}: {min(len(priced), PAIR_COLUMNS_PER_ROUND)} "
+              f"pair columns added ({len(variables['p'])} total)")
+        if len(priced) <= PAIR_COLUMNS_PER_ROUND:
+            break
+
+    forced = set()
+    deadline = time.perf_counter() + time_limit
+    objective, incumbent = None, []
+    converged = False
+    for round_num in range(LAZY_PAIR_ROUNDS):
+        for var in variables['p'].values():
+            var.setInitialValue(0)
+        if warm_start:
+            for key in realized_pairs(variables):
+                if key in variables['p']:
+                    variables['p'][key].setInitialValue(1)
+
+        solve_model, fixed = model, {}
+        if presolve:
+            from presolve import presolve_model
+            solve_model, fixed, _ = presolve_model(model)
+
+        remaining = max(1, deadline - time.perf_counter())
+        solve_model.solve(PULP_CBC_CMD(
+            timeLimit=remaining, gapRel=mip_gap, msg=True, warmStart=warm_start
+        ))
+        print(f"\nSolution status: {LpStatus[solve_model.status]}")
+        if solve_model.status != 1:
+            for var, incumbent_value in incumbent:
+                var.varValue = incumbent_value
+            break
+
+        if fixed:
+            from presolve import restore_fixed_values
+            restore_fixed_values(fixed)
+        objective = value(model.objective)
+
+        missing = []
+        for key in realized_pairs(variables):
+            if key not in variables['p']:
+                add_pair_column(model, variables, rows, key, costs[key])
+                missing.append(key)
+            if costs[key] > 0 and key not in forced:
+                i, opp1, opp2, w = key
+                model += (
+                    variables['p'][key] >= variables['x'][(i, opp1, w, 1)]
+                    + variables['x'][(i, opp2, w + 1, 0)] - 1,
+                    f"Pair_force_{i}_{opp1}_{opp2}_{w}"
+                )
+                forced.add(key)
+                missing.append(key)
+
+        if not missing:
+            converged = True
+            break
+        for key in realized_pairs(variables):
+            variables['p'][key].varValue = 1
+        objective = value(model.objective)
+        incumbent = [(var, var.varValue) for family in variables.values() for var in family.values()]
+
+        print(f"Added {len(missing)} road trips used by the incumbent; re-solving")
+        # Re-solve from the incumbent, which stays feasible with its road trips switched on
+        warm_start = True
+        if time.perf_counter() >= deadline:
+            break
+
+    if objective is not None and not converged:
+        print(f"Warning: the road trips did not converge within {LAZY_PAIR_ROUNDS} rounds and "
+              f"time_limit; the objective may differ from calculate_total_emissions")
+    return objective
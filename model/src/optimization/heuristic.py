@@ -0,0 +1,280 @@
+import os
+import random
+import time
+
+import model as model_module
+from model import (
+    load_matchup_matrix, load_all_distances, precompute_game_emissions,
+    calculate_paired_away_emissions, calculate_separate_away_emissions, calculate_total_emissions,
+    save_schedule_to_csv
+)
+from warm_start import repair_weeks
+
+# Relative noise on game costs in orient_games, so restarts explore other venue choices
+COST_NOISE = 0.02
+
+
+def game_cost(game_emissions, away, home):
+    return game_emissions.get((away, home, False), 0) + game_emissions.get((home, away, True), 0)
+
+
+def cheapest_flip_path(games, home_count, costs, source, forward, is_target):
+    """
+    Cheapest chain of venue flips that moves one home game away from (forward) or to
+    (not forward) source, ending at a team accepted by is_target. Bellman-Ford over the
+    single games, where flipping a game moves a home game from its host to its visitor.
+    """
+    dist = {source: 0.0}
+    via = {}
+    for _ in range(model_module.NUM_TEAMS):
+        updated = False
+        for g, game in enumerate(games):
+            if costs[g] is None:
+                continue
+            a, b = (game['home'], game['away']) if forward else (game['away'], game['home'])
+            if a not in dist:
+                continue
+            delta = costs[g][1 - game['flipped']] - costs[g][game['flipped']]
+            if dist[a] + delta < dist.get(b, float('inf')) - 1e-9:
+                dist[b] = dist[a] + delta
+                via[b] = g
+                updated = True
+        if not updated:
+            break
+
+    targets = [t for t in dist if t != source and is_target(home_count[t])]
+    if not targets:
+        return None
+
+    path = []
+    team = min(targets, key=lambda t: dist[t])
+    while team != source and len(path) <= model_module.NUM_TEAMS:
+        g = via[team]
+        path.append(g)
+        team = games[g]['home'] if forward else games[g]['away']
+    return path
+
+
+def orient_games(matchup_matrix, game_emissions, rng):
+    """
+    Pick the venue of every matchup.
+
+    Repeat division games are played once at each stadium. Single games start at their
+    cheaper venue (costs perturbed by COST_NOISE), then teams outside the slot model's
+    Min_home-Max_home home games are fixed by the cheapest chain of venue flips.
+    """
+    # Home games per team, as in the Min_home/Max_home rows of the slot model
+    min_home = (model_module.NUM_WEEKS - 1) // 2
+    max_home = model_module.NUM_WEEKS // 2
+
+    games = []
+    costs = []
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            if matchup_value == 2:
+                for away, home in ((i, j), (j, i)):
+                    games.append({'home': home, 'away': away, 'week': None, 'slot': None, 'flipped': 0})
+                    costs.append(None)
+            elif matchup_value == 1:
+                venue_costs = [
+                    game_cost(game_emissions, i, j) * (1 + COST_NOISE * rng.random()),
+                    game_cost(game_emissions, j, i) * (1 + COST_NOISE * rng.random())
+                ]
+                away, home = (i, j) if venue_costs[0] <= venue_costs[1] else (j, i)
+                games.append({'home': home, 'away': away, 'week': None, 'slot': None, 'flipped': 0})
+                costs.append(sorted(venue_costs))
+
+    home_count = [0] * model_module.NUM_TEAMS
+    for game in games:
+        home_count[game['home']] += 1
+
+    for _ in range(len(games)):
+        over = [t for t in range(model_module.NUM_TEAMS) if home_count[t] > max_home]
+        under = [t for t in range(model_module.NUM_TEAMS) if home_count[t] < min_home]
+        if over:
+            path = cheapest_flip_path(
+                games, home_count, costs, over[0], True, lambda count: count < max_home
+            )
+        elif under:
+            path = cheapest_flip_path(
+                games, home_count, costs, under[0], False, lambda count: count > min_home
+            )
+        else:
+            break
+
+        if path is None:
+            raise ValueError(
+                f"No venue assignment gives every team {min_home}-{max_home} home games"
+            )
+        for g in path:
+            game = games[g]
+            home_count[game['home']] -= 1
+            home_count[game['away']] += 1
+            game['home'], game['away'] = game['away'], game['home']
+            game['flipped'] = 1 - game['flipped']
+
+    for game in games:
+        del game['flipped']
+    return games
+
+
+def pairing_savings(distances, team, opp1, opp2):
+    """Emissions saved by flying from a Sunday game at opp1 straight on to a Thursday game at opp2."""
+    separate = calculate_separate_away_emissions(distances, team, opp1, opp2)
+    return separate - calculate_paired_away_emissions(distances, team, opp1, opp2)
+
+
+def assign_slots(games, distances, weeks=None):
+    """
+    Choose the Thursday and Monday game of every week to maximize road-trip savings.
+
+    Week by week, Thursday goes to the game whose away team saves the most by pairing it
+    with its Sunday road game the week before. Monday goes to a game whose away team is
+    not on the road the next week, so Thursday candidates stay on Sunday, and splits
+    stadium-sharing teams hosting the same week. Returns the number of Thursday games
+    played without a Sunday road game the week before (at most one is allowed).
+
+    weeks, if given, are the only weeks whose games changed since the games were last
+    slotted. A week's slots depend only on its games, the week before's slots and who is
+    away the week after, so slotting starts the week before the first of them and stops
+    past the last once a week comes out as it was; the result equals a full pass.
+    """
+    by_week = [[] for _ in range(model_module.NUM_WEEKS)]
+    away_game = {}
+    for game in games:
+        by_week[game['week']].append(game)
+        away_game[(game['away'], game['week'])] = game
+
+    pairs = [
+        (model_module.TEAM_IDX[team_a], model_module.TEAM_IDX[team_b])
+        for team_a, team_b in model_module.STADIUM_SHARING_PAIRS
+    ]
+
+    first, last = 0, model_module.NUM_WEEKS - 1
+    if weeks is not None:
+        first, last = max(0, min(weeks) - 1), max(weeks)
+
+    for w in range(first, model_module.NUM_WEEKS):
+        previous_slots = [game['slot'] for game in by_week[w]]
+        for game in by_week[w]:
+            game['slot'] = 1
+
+        candidates = []
+        for game in by_week[w]:
+            previous = away_game.get((game['away'], w - 1))
+            if previous is not None and previous['slot'] == 1:
+                savings = pairing_savings(distances, game['away'], previous['home'], game['home'])
+                candidates.append((savings, game))
+
+        if candidates:
+            max(candidates, key=lambda candidate: candidate[0])[1]['slot'] = 0
+        else:
+            by_week[w][0]['slot'] = 0
+
+        sunday_games = [game for game in by_week[w] if game['slot'] == 1]
+        sunday_hosts = {game['home']: game for game in sunday_games}
+        shared = [
+            sunday_hosts[team] for pair in pairs
+            if all(team in sunday_hosts for team in pair) for team in pair
+        ]
+
+        options = shared or sunday_games
+        monday = min(options, key=lambda game: (game['away'], w + 1) in away_game)
+        monday['slot'] = 2
+
+        if w > last and [game['slot'] for game in by_week[w]] == previous_slots:
+            break
+
+    exceptions = 0
+    for w in range(1, model_module.NUM_WEEKS):
+        for game in by_week[w]:
+            previous = away_game.get((game['away'], w - 1))
+            if game['slot'] == 0 and (previous is None or previous['slot'] != 1):
+                exceptions += 1
+    return exceptions
+
+
+def schedule_from_games(games):
+    """Convert a list of scheduled games into the per-team layout of extract_schedule."""
+    slot_names = {0: 'Thursday', 1: 'Sunday', 2: 'Monday'}
+    by_team_week = {}
+    for game in games:
+        entry = {'slot': slot_names[game['slot']], 'week': game['week'] + 1}
+        by_team_week[(game['home'], game['week'])] = dict(
+            entry, opponent=model_module.TEAMS[game['away']], home_away='Home'
+        )
+        by_team_week[(game['away'], game['week'])] = dict(
+            entry, opponent=model_module.TEAMS[game['home']], home_away='Away'
+        )
+
+    schedule = {team: [] for team in model_module.TEAMS}
+    for i, team in enumerate(model_module.TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            schedule[team].append(by_team_week.get(
+                (i, w), {'week': w + 1, 'opponent': 'BYE', 'home_away': '-', 'slot': '-'}
+            ))
+
+    return schedule
+
+
+def heuristic_games(matchup_matrix=None, time_limit=60, restarts=5, seed=0):
+    """
+    Build feasible schedules greedily with randomized restarts and keep the cheapest.
+
+    Each restart orients the matchups, assigns weeks with the repair search from
+    warm_start.py and picks Thursday and Monday games for road-trip savings. Stops after
+    restarts rounds or time_limit seconds, whichever comes first, and returns the games of
+    the best schedule with its emissions, or (None, None) if no restart was feasible.
+    """
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    best_games, best_emissions = None, None
+
+    for restart in range(restarts):
+        if restart > 0 and time.perf_counter() - start > time_limit:
+            break
+
+        games = orient_games(matchup_matrix, game_emissions, rng)
+        _, penalty = repair_weeks(games, seed=rng.randrange(2 ** 32))
+        if penalty > 0 or assign_slots(games, distances) > 1:
+            print(f"Restart {restart + 1}: no feasible schedule")
+            continue
+
+        emissions, _ = calculate_total_emissions(schedule_from_games(games), distances)
+        print(f"Restart {restart + 1}: {emissions:.2f} kg CO2 "
+              f"({time.perf_counter() - start:.1f} s)")
+        if best_emissions is None or emissions < best_emissions:
+            best_games, best_emissions = [dict(game) for game in games], emissions
+
+    return best_games, best_emissions
+
+
+def heuristic_schedule(matchup_matrix=None, time_limit=60, restarts=5, seed=0):
+    """
+    Produce a feasible low-emission schedule without a MIP solver.
+
+    Returns (schedule, total_emissions, paired_trips) like solve_schedule.
+    """
+    print("\nRunning constructive heuristic...")
+    games, _ = heuristic_games(matchup_matrix, time_limit, restarts, seed)
+    if games is None:
+        print("No feasible schedule found.")
+        return None, None, None
+
+    schedule = schedule_from_games(games)
+    total_emissions, paired_trips = calculate_total_emissions(schedule, load_all_distances())
+    print(f"\nTotal emissions: {total_emissions:.2f} kg CO2")
+    return schedule, total_emissions, paired_trips
+
+
+if __name__ == "__main__":
+    schedule, total_emissions, paired_trips = heuristic_schedule()
+    if schedule is not None:
+        output_dir = os.path.join(os.path.dirname(__file__), "../../output")
+        save_schedule_to_csv(schedule, os.path.join(output_dir, "heuristic_schedule.csv"))
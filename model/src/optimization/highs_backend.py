@@ -0,0 +1,135 @@
+import highspy
+import numpy as np
+from pulp import LpConstraintGE, LpConstraintLE
+
+from model import (
+    load_matchup_matrix, load_all_distances, objective_coefficients,
+    precompute_game_emissions, precompute_average_paired_savings, schedule_keys, schedule_rows
+)
+
+INF = highspy.kHighsInf
+
+
+def build_sparse_model(matchup_matrix=None):
+    """
+    Assemble the create_nfl_schedule_model BIP as a cost vector and CSR constraint matrix,
+    from the same schedule_rows, without building PuLP expressions.
+
+    Rows carry the same names as the PuLP model. Returns the sparse model, a
+    {family: {key: column}} mapping mirroring the PuLP variables dict, and the
+    matchup matrix.
+    """
+    print("Loading data...")
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    print("Assembling sparse model...")
+    keys = schedule_keys(matchup_matrix)
+    columns = {}
+    num_cols = 0
+    for family, family_keys in keys.items():
+        columns[family] = {key: num_cols + k for k, key in enumerate(family_keys)}
+        num_cols += len(family_keys)
+
+    cost = np.zeros(num_cols)
+    costs = objective_coefficients(keys, game_emissions, avg_paired_savings)
+    for (family, key), coef in costs.items():
+        cost[columns[family][key]] = coef
+
+    start = [0]
+    index = []
+    coefs = []
+    row_lower = []
+    row_upper = []
+    row_names = []
+
+    for name, terms, sense, rhs in schedule_rows(matchup_matrix):
+        for (family, key), coef in terms.items():
+            index.append(columns[family][key])
+            coefs.append(coef)
+        start.append(len(index))
+        row_lower.append(-INF if sense == LpConstraintLE else rhs)
+        row_upper.append(INF if sense == LpConstraintGE else rhs)
+        row_names.append(name)
+
+    print(f"Model created with {len(row_names)} constraints")
+
+    sparse = {
+        'cost': cost,
+        'col_lower': np.zeros(num_cols),
+        'col_upper': np.ones(num_cols),
+        'row_lower': np.array(row_lower, dtype=float),
+        'row_upper': np.array(row_upper, dtype=float),
+        'start': np.array(start, dtype=np.int32),
+        'index': np.array(index, dtype=np.int32),
+        'value': np.array(coefs, dtype=float),
+        'row_names': row_names
+    }
+    return sparse, columns, matchup_matrix
+
+
+def to_highs_lp(sparse):
+    lp = highspy.HighsLp()
+    lp.num_col_ = len(sparse['cost'])
+    lp.num_row_ = len(sparse['row_lower'])
+    lp.col_cost_ = sparse['cost']
+    lp.col_lower_ = sparse['col_lower']
+    lp.col_upper_ = sparse['col_upper']
+    lp.row_lower_ = sparse['row_lower']
+    lp.row_upper_ = sparse['row_upper']
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_ = lp.num_col_
+    lp.a_matrix_.num_row_ = lp.num_row_
+    lp.a_matrix_.start_ = sparse['start']
+    lp.a_matrix_.index_ = sparse['index']
+    lp.a_matrix_.value_ = sparse['value']
+    lp.integrality_ = [highspy.HighsVarType.kInteger] * lp.num_col_
+    return lp
+
+
+def solve_sparse_model(sparse, time_limit=3600, mip_gap=0.005, output=True):
+    """Solve an assembled sparse model with HiGHS and return the Highs instance."""
+    highs = highspy.Highs()
+    highs.setOptionValue('output_flag', output)
+    highs.setOptionValue('time_limit', float(time_limit))
+    highs.setOptionValue('mip_rel_gap', mip_gap)
+    highs.passModel(to_highs_lp(sparse))
+    highs.run()
+    return highs
+
+
+def solve_with_highs(time_limit=3600, mip_gap=0.005, matchup_matrix=None):
+    """
+    Build the sparse model and solve it in-process with HiGHS.
+
+    Returns the objective value and a variables dict holding solution values in
+    place of PuLP variables, ready for extract_schedule. Both are None if HiGHS
+    found no feasible schedule.
+    """
+    sparse, columns, _ = build_sparse_model(matchup_matrix)
+
+    print("\nSolving model...")
+    print(f"Time limit: {time_limit} seconds")
+    print(f"MIP gap: {mip_gap * 100}%")
+
+    highs = solve_sparse_model(sparse, time_limit, mip_gap)
+
+    print(f"\nSolution status: {highs.modelStatusToString(highs.getModelStatus())}")
+
+    info = highs.getInfo()
+    if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+        return None, None
+
+    return info.objective_function_value, solution_variables(highs, columns)
+
+
+def solution_variables(highs, columns):
+    """Map the HiGHS column values back onto the {family: {key: value}} layout."""
+    col_value = np.asarray(highs.getSolution().col_value)
+    return {
+        family: {key: col_value[col] for key, col in cols.items()}
+        for family, cols in columns.items()
+    }
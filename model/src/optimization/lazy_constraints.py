@@ -0,0 +1,120 @@
+import time
+
+from pulp import PULP_CBC_CMD, LpStatus, value
+
+import model as model_module
+from model import pulp_constraint, window_rows
+
+# Re-solves allowed for adding back the windows an incumbent violates
+LAZY_ROUNDS = 20
+
+
+def division_pairs():
+    return [
+        (i, j)
+        for div_teams in model_module.DIVISIONS.values()
+        for idx, i in enumerate(div_teams)
+        for j in div_teams[idx + 1:]
+    ]
+
+
+def violated_windows(variables):
+    """
+    Rows of the lazy families broken by the current solution values, as
+    ('home' | 'away', team, week) and ('div', team, team, week) keys.
+    """
+    violated = []
+    for i in range(model_module.NUM_TEAMS):
+        for kind in ('home', 'away'):
+            played = [(value(variables[kind[0]][(i, w)]) or 0) > 0.5 for w in range(model_module.NUM_WEEKS)]
+            for w in range(model_module.NUM_WEEKS - 3):
+                if all(played[w:w + 4]):
+                    violated.append((kind, i, w))
+
+    meeting_weeks = set()
+    for (i, j, w, _), var in variables['x'].items():
+        if (value(var) or 0) > 0.5:
+            meeting_weeks.add((min(i, j), max(i, j), w))
+
+    for i, j in division_pairs():
+        i, j = min(i, j), max(i, j)
+        for w in range(model_module.NUM_WEEKS - 1):
+            if (i, j, w) in meeting_weeks and (i, j, w + 1) in meeting_weeks:
+                violated.append(('div', i, j, w))
+
+    return violated
+
+
+def window_name(key):
+    """Name of the lazy-family row of a violated_windows key, as window_rows gives it."""
+    if key[0] in ('home', 'away'):
+        kind, i, w = key
+        return f"Max_consec_{kind}_{i}_{w}"
+    _, i, j, w = key
+    return f"No_consec_div_{i}_{j}_{w}"
+
+
+def lazy_row_count(variables):
+    """Number of rows the lazy families contribute to the full model."""
+    return sum(1 for _ in window_rows(list(variables['x'])))
+
+
+def solve_lazy(model, variables, time_limit, mip_gap, presolve=True, warm_start=False):
+    """
+    Solve a model built with lazy=True, adding back only the Max_consec_home/away and
+    No_consec_div rows the incumbent violates and re-solving until it violates none.
+
+    CBC through PuLP has no lazy-constraint callback, so every round is a full solve.
+    A warm start (which satisfies every row) is re-offered in each round. time_limit
+    bounds the solves together. Returns the objective, or None if no schedule satisfying
+    the full model was found, and the round statistics.
+    """
+    start_values = None
+    if warm_start:
+        start_values = [
+            (var, var.varValue) for family in variables.values() for var in family.values()
+        ]
+
+    windows = {name: row for name, *row in window_rows(list(variables['x']))}
+    stats = {'rounds': 0, 'rows_added': 0}
+    deadline = time.perf_counter() + time_limit
+
+    for round_num in range(LAZY_ROUNDS):
+        if start_values:
+            for var, initial in start_values:
+                var.setInitialValue(initial)
+
+        solve_model, fixed = model, {}
+        if presolve:
+            from presolve import presolve_model
+            solve_model, fixed, _ = presolve_model(model)
+
+        remaining = max(1, deadline - time.perf_counter())
+        solve_model.solve(PULP_CBC_CMD(
+            timeLimit=remaining, gapRel=mip_gap, msg=True, warmStart=warm_start
+        ))
+        stats['rounds'] = round_num + 1
+        print(f"\nSolution status: {LpStatus[solve_model.status]}")
+        if solve_model.status != 1:
+            return None, stats
+
+        if fixed:
+            from presolve import restore_fixed_values
+            restore_fixed_values(fixed)
+
+        violated = violated_windows(variables)
+        if not violated:
+            return value(model.objective), stats
+
+        for key in violated:
+            name = window_name(key)
+            model += pulp_constraint(variables, *windows[name], name)
+        stats['rows_added'] += len(violated)
+        print(f"Lazy round {round_num + 1}: added {len(violated)} violated rows "
+              f"({stats['rows_added']} total)")
+
+        if time.perf_counter() >= deadline:
+            break
+
+    print("Lazy rounds exhausted with violated rows left")
+    return None, stats
@@ -0,0 +1,201 @@
+import multiprocessing
+import random
+import time
+
+import model as model_module
+from model import load_all_distances, calculate_travel_emissions, calculate_paired_away_emissions
+from heuristic import assign_slots, schedule_from_games
+from warm_start import games_from_schedule, repair_weeks, slots_valid
+
+# Length of one LNS round; workers restart from the best schedule found after each round
+LNS_ROUND_TIME = 10
+
+# Week-repair iterations allowed to re-insert a destroyed neighbourhood
+LNS_REPAIR_ITERATIONS = 2000
+
+# Consecutive weeks freed by the 'weeks' neighbourhood
+LNS_WEEK_BLOCK = 3
+
+NEIGHBOURHOODS = ('team', 'weeks', 'division')
+
+
+def trip_costs(distances):
+    """Home and single away trip emissions per team, plus a cache for paired trips."""
+    return {
+        'distances': distances,
+        'home': {
+            i: calculate_travel_emissions(distances, i, i, True) for i in range(model_module.NUM_TEAMS)
+        },
+        'away': {
+            (i, j): calculate_travel_emissions(distances, i, j, False)
+            for i in range(model_module.NUM_TEAMS) for j in range(model_module.NUM_TEAMS) if i != j
+        },
+        'paired': {}
+    }
+
+
+def paired_cost(costs, team, opp1, opp2):
+    key = (team, opp1, opp2)
+    if key not in costs['paired']:
+        costs['paired'][key] = calculate_paired_away_emissions(costs['distances'], team, opp1, opp2)
+    return costs['paired'][key]
+
+
+def team_emissions(team, by_team_week, costs):
+    """
+    Travel emissions of one team's season, scored as calculate_total_emissions does: a
+    Sunday road game followed by a Thursday road game the next week is one paired trip.
+    """
+    total = 0.0
+    paired_week = None
+    for w in range(model_module.NUM_WEEKS):
+        game = by_team_week.get((team, w))
+        if game is None or w == paired_week:
+            continue
+
+        if game['home'] == team:
+            total += costs['home'][team]
+            continue
+
+        next_game = by_team_week.get((team, w + 1))
+        if (game['slot'] == 1 and next_game is not None
+                and next_game['away'] == team and next_game['slot'] == 0):
+            total += paired_cost(costs, team, game['home'], next_game['home'])
+            paired_week = w + 1
+        else:
+            total += costs['away'][(team, game['home'])]
+
+    return total
+
+
+def index_games(games):
+    by_team_week = {}
+    for game in games:
+        by_team_week[(game['home'], game['week'])] = game
+        by_team_week[(game['away'], game['week'])] = game
+    return by_team_week
+
+
+def neighbourhood(games, rng):
+    """Pick the games to destroy: one team's season, a block of weeks or a division's games."""
+    kind = rng.choice(NEIGHBOURHOODS)
+    if kind == 'team':
+        teams = {rng.randrange(model_module.NUM_TEAMS)}
+        return [g for g, game in enumerate(games) if game['home'] in teams or game['away'] in teams]
+    if kind == 'weeks':
+        first = rng.randrange(model_module.NUM_WEEKS - LNS_WEEK_BLOCK + 1)
+        return [g for g, game in enumerate(games) if first <= game['week'] < first + LNS_WEEK_BLOCK]
+
+    teams = set(rng.choice(list(model_module.DIVISIONS.values())))
+    return [g for g, game in enumerate(games) if game['home'] in teams or game['away'] in teams]
+
+
+def run_lns(games, distances, time_limit, seed=0):
+    """
+    Improve a feasible schedule by large neighbourhood search until time_limit seconds pass.
+
+    Each step frees a neighbourhood, re-inserts its games with the week repair search,
+    re-picks Thursday and Monday games around the weeks that changed, and keeps the result
+    if it is feasible and does not raise emissions. Only the teams whose games moved are
+    rescored. Venues are never changed. Returns the best games, their emissions and the
+    number of steps taken.
+    """
+    rng = random.Random(seed)
+    games = [dict(game) for game in games]
+    costs = trip_costs(distances)
+
+    by_team_week = index_games(games)
+    team_totals = [team_emissions(t, by_team_week, costs) for t in range(model_module.NUM_TEAMS)]
+    total = sum(team_totals)
+
+    deadline = time.perf_counter() + time_limit
+    steps = 0
+    while time.perf_counter() < deadline:
+        steps += 1
+        before = [(game['week'], game['slot']) for game in games]
+
+        freed = neighbourhood(games, rng)
+        for g in freed:
+            games[g]['week'] = None
+        _, penalty = repair_weeks(
+            games, iterations=LNS_REPAIR_ITERATIONS, seed=rng.randrange(2 ** 32), movable=freed
+        )
+        moved = [g for g, game in enumerate(games) if game['week'] != before[g][0]]
+        touched = {before[g][0] for g in moved} | {games[g]['week'] for g in moved}
+        feasible = (penalty == 0 and bool(touched)
+                    and assign_slots(games, distances, touched) <= 1 and slots_valid(games))
+
+        changed = [g for g, game in enumerate(games) if (game['week'], game['slot']) != before[g]]
+        if feasible and changed:
+            new_index = index_games(games)
+            teams = {team for g in changed for team in (games[g]['home'], games[g]['away'])}
+            new_totals = {t: team_emissions(t, new_index, costs) for t in teams}
+            delta = sum(new_totals[t] - team_totals[t] for t in teams)
+            if delta <= 1e-6:
+                by_team_week = new_index
+                for t in teams:
+                    team_totals[t] = new_totals[t]
+                total += delta
+                continue
+
+        for game, (w, s) in zip(games, before):
+            game['week'], game['slot'] = w, s
+
+    return games, total, steps
+
+
+def lns_worker(args):
+    return run_lns(*args)
+
+
+def improve_schedule(schedule, time_limit=300, num_workers=None, seed=0):
+    """
+    Improve a feasible schedule with large neighbourhood search on num_workers processes.
+
+    The time budget is split into rounds of LNS_ROUND_TIME seconds. In each round every
+    worker searches from the best schedule so far with its own seed, and the best result
+    is carried into the next round. Returns the improved schedule.
+    """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+
+    distances = load_all_distances()
+    best_games = games_from_schedule(schedule)
+    by_team_week = index_games(best_games)
+    costs = trip_costs(distances)
+    best_emissions = sum(team_emissions(t, by_team_week, costs) for t in range(model_module.NUM_TEAMS))
+
+    print("\nImproving schedule with large neighbourhood search...")
+    print(f"Time budget: {time_limit} seconds")
+    print(f"Workers: {num_workers}")
+    print(f"Starting emissions: {best_emissions:.2f} kg")
+
+    pool = multiprocessing.Pool(num_workers) if num_workers > 1 else None
+    start = time.perf_counter()
+    round_num = 0
+    try:
+        while True:
+            remaining = time_limit - (time.perf_counter() - start)
+            if remaining < 1:
+                break
+
+            round_time = min(LNS_ROUND_TIME, remaining)
+            tasks = [
+                (best_games, distances, round_time, seed + round_num * num_workers + k)
+                for k in range(num_workers)
+            ]
+            results = pool.map(lns_worker, tasks) if pool else [lns_worker(tasks[0])]
+            round_num += 1
+
+            games, emissions, _ = min(results, key=lambda result: result[1])
+            steps = sum(result[2] for result in results)
+            if emissions < best_emissions:
+                best_games, best_emissions = games, emissions
+            print(f"Round {round_num}: {best_emissions:.2f} kg after {steps} steps "
+                  f"({time.perf_counter() - start:.0f} s)")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return schedule_from_games(best_games)
@@ -0,0 +1,118 @@
+import time
+
+from pulp import PULP_CBC_CMD, LpStatus, value
+
+import model as model_module
+from model import (
+    calculate_total_emissions, create_nfl_schedule_model, extract_schedule, load_all_distances,
+    load_schedule_from_csv, matchup_matrix_from_schedule
+)
+
+
+def blocked_pairs(blocked, current_week):
+    """Normalize blocked (team, week) venue restrictions to 0-based (team index, week) pairs."""
+    pairs = set()
+    for team, week in blocked:
+        team = model_module.TEAM_IDX[team] if team in model_module.TEAM_IDX else int(team)
+        if not current_week < week <= model_module.NUM_WEEKS:
+            raise ValueError(
+                f"Blocked week {week} is not between week {current_week + 1} "
+                f"and {model_module.NUM_WEEKS}"
+            )
+        pairs.add((team, week - 1))
+    return pairs
+
+
+def frozen_values(variables, games, current_week):
+    """Values of every variable decided by the games of weeks 1..current_week."""
+    from warm_start import schedule_values
+
+    values = schedule_values([game for game in games if game['week'] < current_week])
+    frozen = {}
+    for family, family_vars in variables.items():
+        for key, var in family_vars.items():
+            week = key if family == 'v' else key[-2] if family == 'x' else key[1]
+            # y links week w to week w + 1, so it is settled only once both are played
+            last_week = week + 1 if family == 'y' else week
+            if last_week < current_week:
+                frozen[var] = values[family].get(key, 0)
+    return frozen
+
+
+def remaining_warm_start(games, current_week, blocked):
+    """
+    The published schedule for the remaining weeks, with games moved out of blocked weeks
+    and the remaining slots re-picked when needed. Returns None if it cannot be repaired.
+    """
+    from warm_start import repair_slots, repair_weeks, slots_valid
+
+    games = [dict(game) for game in games]
+    if not any((game['home'], game['week']) in blocked for game in games):
+        return games
+
+    movable = [g for g, game in enumerate(games) if game['week'] >= current_week]
+    _, penalty = repair_weeks(games, movable=movable, blocked=blocked)
+    if penalty > 0:
+        return None
+
+    played_slots = [(game, game['slot']) for game in games if game['week'] < current_week]
+    repair_slots(games)
+    for game, slot in played_slots:
+        game['slot'] = slot
+    return games if slots_valid(games) else None
+
+
+def reoptimize_season(schedule_path, current_week, blocked=(), time_limit=600, mip_gap=0.005):
+    """
+    Re-optimize the rest of a published season after week current_week (1-based).
+
+    schedule_path is a save_schedule_to_csv file. Every variable settled by weeks
+    1..current_week is fixed to the published schedule and presolved out of the model, so
+    only the remaining weeks are solved, under the same constraints. blocked lists
+    (team, week) pairs, team as name or index and week 1-based, in which the team
+    cannot host. The published schedule, repaired around the blocked weeks, is the warm
+    start. Returns (schedule, total_emissions, paired_trips) like solve_schedule.
+    """
+    from presolve import fix_variables, presolve_model, restore_fixed_values
+    from warm_start import apply_warm_start, load_schedule_games
+
+    if not 0 <= current_week < model_module.NUM_WEEKS:
+        raise ValueError(f"current_week must be between 0 and {model_module.NUM_WEEKS - 1}")
+
+    published = load_schedule_from_csv(schedule_path)
+    games = load_schedule_games(schedule_path)
+    matchup_matrix = matchup_matrix_from_schedule(published)
+    blocked = blocked_pairs(blocked, current_week)
+
+    model, variables, _ = create_nfl_schedule_model(matchup_matrix)
+    for team, w in sorted(blocked):
+        model += variables['h'][(team, w)] == 0, f"Blocked_venue_{team}_{w}"
+
+    start = time.perf_counter()
+    frozen = frozen_values(variables, games, current_week)
+    solve_model, fixed, _ = presolve_model(fix_variables(model, frozen, "Frozen"))
+    print(f"Froze weeks 1-{current_week}: {len(frozen)} variables fixed, "
+          f"{len(solve_model.constraints)} rows left")
+
+    warm_games = remaining_warm_start(games, current_week, blocked)
+    if warm_games is not None:
+        apply_warm_start(variables, warm_games)
+        print(f"Warm start objective: {value(model.objective):.2f}")
+    else:
+        print("Published schedule cannot be repaired around the blocked weeks; solving without it")
+
+    print(f"\nRe-optimizing weeks {current_week + 1}-{model_module.NUM_WEEKS}...")
+    solve_model.solve(PULP_CBC_CMD(
+        timeLimit=time_limit, gapRel=mip_gap, msg=True, warmStart=warm_games is not None
+    ))
+    print(f"\nSolution status: {LpStatus[solve_model.status]} "
+          f"({time.perf_counter() - start:.1f} s)")
+    if solve_model.status != 1:
+        print("No feasible schedule for the remaining weeks.")
+        return None, None, None
+
+    restore_fixed_values(fixed)
+    schedule = extract_schedule(variables)
+    total_emissions, paired_trips = calculate_total_emissions(schedule, load_all_distances())
+    print(f"Total emissions: {total_emissions:.2f} kg CO2")
+    return schedule, total_emissions, paired_trips
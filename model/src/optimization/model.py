@@ -1,8 +1,10 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 from pulp import (
-    LpProblem, LpMinimize, LpVariable, LpBinary, lpSum, LpStatus, value
+    LpProblem, LpMinimize, LpVariable, LpBinary, LpStatus, value, LpAffineExpression,
+    LpConstraint, LpConstraintEQ, LpConstraintGE, LpConstraintLE
 )
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'matchups'))
@@ -48,9 +50,68 @@ DIVISIONS = {
     "NFC_WEST": [28, 29, 30, 31]
 }
 
+# Input data directory; a synthetic league (see synthetic.py) points this elsewhere
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data")
+
+# Distance matrices of load_all_distances, by key, under data/distances/
+DISTANCE_FILES = {
+    'facility_to_stadium': 'HomeFacility_HomeStadium.csv',
+    'facility_to_airport': 'HomeFacility_HomeAirport.csv',
+    'stadium_to_airport': 'HomeStadium_HomeAirport.csv',
+    'facility_to_away_stadium': 'HomeFacility_AwayStadium.csv',
+    'airport_to_airport': 'HomeAirport_AwayAirport.csv'
+}
+
+# Per-feature options of solve_schedule and run_all_years, with their defaults
+SOLVE_OPTIONS = {
+    # Solver configurations raced by backend='portfolio' (see portfolio.py)
+    'portfolio': None,
+    # Schedule CSV, repaired if needed, or 'heuristic': CBC's first incumbent (see warm_start.py)
+    'warm_start': None,
+    # 'exact' prices each Sunday-Thursday road trip exactly (see exact_pairing.py)
+    'pairing': 'average',
+    # Add the Max_consec and No_consec_div rows only when violated (see lazy_constraints.py)
+    'lazy': False,
+    # Pick home/away/bye patterns, then opponents and slots (see decomposition.py)
+    'decompose': False,
+    # Path prefix for incumbent checkpoints, resumed from if present; CBC restarts at
+    # every one, in rounds that double from CHECKPOINT_INTERVAL (see checkpoint.py)
+    'checkpoint': None,
+    # JSON lines path for the incumbent, bound, gap and nodes of CBC's log (see telemetry.py)
+    'telemetry': None,
+    # (fraction, seconds): stop CBC once the incumbent stops improving (see telemetry.py)
+    'stagnation': None,
+    # Look up and store the result in the solution cache (see cache.py)
+    'cache': False,
+    # Solve the model from its compressed MPS cache, CBC presolving it (see artifacts.py)
+    'artifact': False
+}
+
+# Options each backend accepts besides cache, which applies to all of them
+BACKEND_OPTIONS = {
+    'pulp': ('warm_start', 'pairing', 'lazy', 'decompose', 'checkpoint', 'telemetry',
+             'stagnation', 'artifact'),
+    'highs': (),
+    'cpsat': (),
+    'portfolio': ('portfolio',)
+}
+
+# CBC solve methods, picked by the first of these options that is set, with the other
+# options each can be combined with
+CBC_METHODS = {
+    'artifact': ('warm_start',),
+    'pairing': ('warm_start',),
+    'lazy': ('warm_start',),
+    'decompose': (),
+    'checkpoint': ('warm_start', 'telemetry', 'stagnation'),
+    'telemetry': ('warm_start', 'stagnation'),
+    'stagnation': ('warm_start',),
+    'default': ('warm_start',)
+}
+
+
 def get_data_path(filename):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(script_dir, "../../data", filename)
+    return os.path.join(DATA_DIR, filename)
 
 
 def load_matchup_matrix():
@@ -90,13 +151,7 @@ def load_distance_matrix(filename):
 
 
 def load_all_distances():
-    return {
-        'facility_to_stadium': load_distance_matrix('HomeFacility_HomeStadium.csv'),
-        'facility_to_airport': load_distance_matrix('HomeFacility_HomeAirport.csv'),
-        'stadium_to_airport': load_distance_matrix('HomeStadium_HomeAirport.csv'),
-        'facility_to_away_stadium': load_distance_matrix('HomeFacility_AwayStadium.csv'),
-        'airport_to_airport': load_distance_matrix('HomeAirport_AwayAirport.csv')
-    }
+    return {key: load_distance_matrix(filename) for key, filename in DISTANCE_FILES.items()}
 
 def calculate_travel_emissions(distances, team_i, team_j, is_home_game):
     if is_home_game:
@@ -183,276 +238,379 @@ def precompute_average_paired_savings(distances, matchup_matrix):
 
     return avg_savings
 
-def create_nfl_schedule_model():
-    """Create the NFL schedule optimization model."""
-    print("Loading data...")
-    matchup_matrix = load_matchup_matrix()
-    distances = load_all_distances()
-    game_emissions = precompute_game_emissions(distances, matchup_matrix)
-    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
 
-    print("Creating optimization model...")
-    model = LpProblem("NFL_Schedule_Optimization",LpMinimize)
+def build_index(x):
+    """Group the x keys by team/week, week/slot and pair so constraints avoid full scans."""
+    index = {
+        'home': {},       # (team, week) -> games hosted by team
+        'away': {},       # (team, week) -> games played away by team
+        'home_slot': {},  # (team, week, slot) -> games hosted by team
+        'away_slot': {},  # (team, week, slot) -> games played away by team
+        'slot': {},       # (week, slot) -> all games
+        'week': {},       # week -> all games
+        'pair': {},       # (away, home) -> games over the whole season
+        'pair_week': {}   # (away, home, week) -> games
+    }
 
-    # Decision Variables
-    x = {}
-    for i in range(NUM_TEAMS):
-        for j in range(NUM_TEAMS):
-            if i != j and matchup_matrix.get((i, j), 0) > 0:
-                for w in range(NUM_WEEKS):
-                    for s in range(NUM_SLOTS):
-                        x[(i, j, w, s)] = LpVariable(f"x_{i}_{j}_{w}_{s}", cat=LpBinary)
+    for key in x:
+        i, j, w, s = key
+        index['home'].setdefault((j, w), []).append(key)
+        index['away'].setdefault((i, w), []).append(key)
+        index['home_slot'].setdefault((j, w, s), []).append(key)
+        index['away_slot'].setdefault((i, w, s), []).append(key)
+        index['slot'].setdefault((w, s), []).append(key)
+        index['week'].setdefault(w, []).append(key)
+        index['pair'].setdefault((i, j), []).append(key)
+        index['pair_week'].setdefault((i, j, w), []).append(key)
 
-    h = {}
-    for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS):
-            h[(i, w)] = LpVariable(f"h_{i}_{w}", cat=LpBinary)
+    return index
 
-    a = {}
-    for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS):
-            a[(i, w)] = LpVariable(f"a_{i}_{w}", cat=LpBinary)
 
-    bye = {}
-    for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS):
-            bye[(i, w)] = LpVariable(f"bye_{i}_{w}", cat=LpBinary)
+def schedule_keys(matchup_matrix):
+    """Keys of each variable family of the slot model, in column order."""
+    return {
+        'x': [
+            (i, j, w, s)
+            for i in range(NUM_TEAMS) for j in range(NUM_TEAMS)
+            if i != j and matchup_matrix.get((i, j), 0) > 0
+            for w in range(NUM_WEEKS) for s in range(NUM_SLOTS)
+        ],
+        'h': [(i, w) for i in range(NUM_TEAMS) for w in range(NUM_WEEKS)],
+        'a': [(i, w) for i in range(NUM_TEAMS) for w in range(NUM_WEEKS)],
+        'bye': [(i, w) for i in range(NUM_TEAMS) for w in range(NUM_WEEKS)],
+        'y': [(i, w) for i in range(NUM_TEAMS) for w in range(NUM_WEEKS - 1)],
+        'v': list(range(1, NUM_WEEKS))
+    }
 
-    y = {}
-    for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS - 1): 
-            y[(i, w)] = LpVariable(f"y_{i}_{w}", cat=LpBinary)
 
-    print("Setting up objective function...")
+def variable_name(family, key):
+    """Name of a slot model variable, e.g. x_0_1_4_1 or v_3."""
+    return f"{family}_{'_'.join(map(str, key if isinstance(key, tuple) else (key,)))}"
+
 
-    emission_terms = []
-    for (i, j, w, s), var in x.items():
+def objective_coefficients(keys, game_emissions, avg_paired_savings):
+    """Cost in kg CO2 of each x and y column, as {(family, key): coefficient}."""
+    costs = {}
+    for (i, j, w, s) in keys['x']:
         away_emissions = game_emissions.get((i, j, False), 0)
         home_emissions = game_emissions.get((j, i, True), 0)
-        emission_terms.append((away_emissions + home_emissions) * var)
+        costs[('x', (i, j, w, s))] = away_emissions + home_emissions
+    for (i, w) in keys['y']:
+        costs[('y', (i, w))] = -avg_paired_savings.get(i, 0)
+    return costs
+
+
+def build_objective(variables, game_emissions, avg_paired_savings):
+    """Total CO2 of the x and y variables under the given emissions and paired savings."""
+    keys = {'x': list(variables['x']), 'y': list(variables['y'])}
+    costs = objective_coefficients(keys, game_emissions, avg_paired_savings)
+    return LpAffineExpression(
+        (variables[family][key], cost) for (family, key), cost in costs.items()
+    )
 
-    savings_terms = []
-    for (i, w), var in y.items():
-        savings = avg_paired_savings.get(i, 0)
-        savings_terms.append(savings * var)
 
-    model += lpSum(emission_terms) - lpSum(savings_terms), "Total_CO2_Emissions"
+def row_terms(*parts):
+    """Merge (family, keys, coefficient) parts into one row's {(family, key): coefficient}."""
+    terms = {}
+    for family, keys, coef in parts:
+        for key in keys:
+            terms[(family, key)] = terms.get((family, key), 0) + coef
+    return {term: coef for term, coef in terms.items() if coef}
 
-    print("Adding constraints...")
+
+def window_rows(x_keys, index=None):
+    """
+    The Max_consec_home/away and No_consec_div rows of the slot model, which
+    lazy_constraints.py can leave out and add back on demand. Rows are
+    (name, terms, sense, rhs) as in schedule_rows.
+    """
+    if index is None:
+        index = build_index(x_keys)
+    pair_week = index['pair_week']
+
+    for i in range(NUM_TEAMS):
+        for w in range(NUM_WEEKS - 3):
+            window = [(i, w + k) for k in range(4)]
+            yield f"Max_consec_home_{i}_{w}", row_terms(('h', window, 1)), LpConstraintLE, 3
+            yield f"Max_consec_away_{i}_{w}", row_terms(('a', window, 1)), LpConstraintLE, 3
+
+    for _, div_teams in DIVISIONS.items():
+        for idx, i in enumerate(div_teams):
+            for j in div_teams[idx + 1:]:
+                for w in range(NUM_WEEKS - 1):
+                    games_w = pair_week.get((i, j, w), []) + pair_week.get((j, i, w), [])
+                    games_w1 = pair_week.get((i, j, w + 1), []) + pair_week.get((j, i, w + 1), [])
+
+                    if games_w and games_w1:
+                        terms = row_terms(('x', games_w + games_w1, 1))
+                        yield f"No_consec_div_{i}_{j}_{w}", terms, LpConstraintLE, 1
+
+
+def schedule_rows(matchup_matrix, lazy=False):
+    """
+    Every row of the slot model as (name, terms, sense, rhs), terms being
+    {(family, key): coefficient} over the keys of schedule_keys and sense a PuLP
+    constraint sense. The PuLP, HiGHS and CP-SAT models are all built from these rows.
+    With lazy=True the rows of window_rows are left out.
+    """
+    x_keys = schedule_keys(matchup_matrix)['x']
+    index = build_index(x_keys)
+    home = index['home']
+    away = index['away']
+    home_slot = index['home_slot']
+    away_slot = index['away_slot']
+    pair = index['pair']
+    weeks = range(NUM_WEEKS)
 
     for i in range(NUM_TEAMS):
         for j in range(i + 1, NUM_TEAMS):
             matchup_value = matchup_matrix.get((i, j), 0)
 
             if matchup_value == 2:
-                model += (
-                    lpSum(x[(i, j, w, s)] for w in range(NUM_WEEKS)
-                          for s in range(NUM_SLOTS) if (i, j, w, s) in x) == 1,
-                    f"Divisional_i_away_{i}_{j}"
-                )
-                model += (
-                    lpSum(x[(j, i, w, s)] for w in range(NUM_WEEKS)
-                          for s in range(NUM_SLOTS) if (j, i, w, s) in x) == 1,
-                    f"Divisional_j_away_{i}_{j}"
-                )
+                yield (f"Divisional_i_away_{i}_{j}", row_terms(('x', pair.get((i, j), []), 1)),
+                       LpConstraintEQ, 1)
+                yield (f"Divisional_j_away_{i}_{j}", row_terms(('x', pair.get((j, i), []), 1)),
+                       LpConstraintEQ, 1)
             elif matchup_value == 1:
-                games_ij = [x[(i, j, w, s)] for w in range(NUM_WEEKS)
-                           for s in range(NUM_SLOTS) if (i, j, w, s) in x]
-                games_ji = [x[(j, i, w, s)] for w in range(NUM_WEEKS)
-                           for s in range(NUM_SLOTS) if (j, i, w, s) in x]
-                model += lpSum(games_ij + games_ji) == 1, f"NonDiv_matchup_{i}_{j}"
+                games = pair.get((i, j), []) + pair.get((j, i), [])
+                yield f"NonDiv_matchup_{i}_{j}", row_terms(('x', games, 1)), LpConstraintEQ, 1
 
     for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS):
-            model += h[(i, w)] + a[(i, w)] + bye[(i, w)] == 1, f"One_activity_{i}_{w}"
+        for w in weeks:
+            activity = row_terms(('h', [(i, w)], 1), ('a', [(i, w)], 1), ('bye', [(i, w)], 1))
+            yield f"One_activity_{i}_{w}", activity, LpConstraintEQ, 1
 
     for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS):
-            home_games = [x[(j, i, w, s)] for j in range(NUM_TEAMS)
-                         for s in range(NUM_SLOTS) if (j, i, w, s) in x]
-            away_games = [x[(i, j, w, s)] for j in range(NUM_TEAMS)
-                         for s in range(NUM_SLOTS) if (i, j, w, s) in x]
+        for w in weeks:
+            home_games = home.get((i, w), [])
+            away_games = away.get((i, w), [])
 
             if home_games:
-                model += lpSum(home_games) == h[(i, w)], f"Link_home_{i}_{w}"
+                yield (f"Link_home_{i}_{w}", row_terms(('x', home_games, 1), ('h', [(i, w)], -1)),
+                       LpConstraintEQ, 0)
             else:
-                model += h[(i, w)] == 0, f"No_home_possible_{i}_{w}"
+                yield f"No_home_possible_{i}_{w}", row_terms(('h', [(i, w)], 1)), LpConstraintEQ, 0
 
             if away_games:
-                model += lpSum(away_games) == a[(i, w)], f"Link_away_{i}_{w}"
+                yield (f"Link_away_{i}_{w}", row_terms(('x', away_games, 1), ('a', [(i, w)], -1)),
+                       LpConstraintEQ, 0)
             else:
-                model += a[(i, w)] == 0, f"No_away_possible_{i}_{w}"
+                yield f"No_away_possible_{i}_{w}", row_terms(('a', [(i, w)], 1)), LpConstraintEQ, 0
 
     for i in range(NUM_TEAMS):
-        model += (
-            lpSum(h[(i, w)] + a[(i, w)] for w in range(NUM_WEEKS)) == 17,
-            f"Total_games_{i}"
-        )
+        team_weeks = [(i, w) for w in weeks]
+        yield (f"Total_games_{i}", row_terms(('h', team_weeks, 1), ('a', team_weeks, 1)),
+               LpConstraintEQ, NUM_WEEKS - 1)
 
     for i in range(NUM_TEAMS):
-        total_home = lpSum(h[(i, w)] for w in range(NUM_WEEKS))
-        model += total_home >= 8, f"Min_home_{i}"
-        model += total_home <= 9, f"Max_home_{i}"
+        total_home = row_terms(('h', [(i, w) for w in weeks], 1))
+        yield f"Min_home_{i}", total_home, LpConstraintGE, (NUM_WEEKS - 1) // 2
+        yield f"Max_home_{i}", total_home, LpConstraintLE, NUM_WEEKS // 2
 
     for i in range(NUM_TEAMS):
-        model += lpSum(bye[(i, w)] for w in range(NUM_WEEKS)) == 1, f"One_bye_{i}"
-        for w in range(NUM_WEEKS):
+        yield f"One_bye_{i}", row_terms(('bye', [(i, w) for w in weeks], 1)), LpConstraintEQ, 1
+        for w in weeks:
             if w < BYE_WEEK_START - 1 or w > BYE_WEEK_END - 1:
-                model += bye[(i, w)] == 0, f"No_bye_week_{i}_{w}"
+                yield f"No_bye_week_{i}_{w}", row_terms(('bye', [(i, w)], 1)), LpConstraintEQ, 0
 
-    for i in range(NUM_TEAMS):
-        for w in range(NUM_WEEKS - 3):
-            model += lpSum(h[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_home_{i}_{w}"
-            model += lpSum(a[(i, w + k)] for k in range(4)) <= 3, f"Max_consec_away_{i}_{w}"
-
-    for _, div_teams in DIVISIONS.items():
-        for idx, i in enumerate(div_teams):
-            for j in div_teams[idx + 1:]:
-                for w in range(NUM_WEEKS - 1):
-                    games_w = []
-                    games_w1 = []
-                    for s in range(NUM_SLOTS):
-                        if (i, j, w, s) in x:
-                            games_w.append(x[(i, j, w, s)])
-                        if (j, i, w, s) in x:
-                            games_w.append(x[(j, i, w, s)])
-                        if (i, j, w + 1, s) in x:
-                            games_w1.append(x[(i, j, w + 1, s)])
-                        if (j, i, w + 1, s) in x:
-                            games_w1.append(x[(j, i, w + 1, s)])
-
-                    if games_w and games_w1:
-                        model += lpSum(games_w) + lpSum(games_w1) <= 1, f"No_consec_div_{i}_{j}_{w}"
+    if not lazy:
+        yield from window_rows(x_keys, index)
 
     for team_a, team_b in STADIUM_SHARING_PAIRS:
         idx_a = TEAM_IDX[team_a]
         idx_b = TEAM_IDX[team_b]
 
-        for w in range(NUM_WEEKS):
+        for w in weeks:
             for s in range(NUM_SLOTS):
-                home_a = [x[(j, idx_a, w, s)] for j in range(NUM_TEAMS) if (j, idx_a, w, s) in x]
-                home_b = [x[(j, idx_b, w, s)] for j in range(NUM_TEAMS) if (j, idx_b, w, s) in x]
-
-                playing_each_other = []
-                if (idx_b, idx_a, w, s) in x:
-                    playing_each_other.append(x[(idx_b, idx_a, w, s)])
-                if (idx_a, idx_b, w, s) in x:
-                    playing_each_other.append(x[(idx_a, idx_b, w, s)])
+                home_a = home_slot.get((idx_a, w, s), [])
+                home_b = home_slot.get((idx_b, w, s), [])
 
                 if home_a and home_b:
-                    if playing_each_other:
-                        model += (
-                            lpSum(home_a) + lpSum(home_b) <= 1 + lpSum(playing_each_other),
-                            f"Stadium_share_{idx_a}_{idx_b}_{w}_{s}"
-                        )
-                    else:
-                        model += lpSum(home_a) + lpSum(home_b) <= 1, f"Stadium_share_{idx_a}_{idx_b}_{w}_{s}"
-
-    for w in range(NUM_WEEKS):
-        thursday_games = [x[(i, j, w, 0)] for i in range(NUM_TEAMS)
-                         for j in range(NUM_TEAMS) if (i, j, w, 0) in x]
+                    # A game between the two sharers uses the stadium once, so it is
+                    # taken back out of the count
+                    playing_each_other = [k for k in home_a + home_b if k[0] in (idx_a, idx_b)]
+                    yield (f"Stadium_share_{idx_a}_{idx_b}_{w}_{s}",
+                           row_terms(('x', home_a + home_b, 1), ('x', playing_each_other, -1)),
+                           LpConstraintLE, 1)
+
+    for w in weeks:
+        thursday_games = index['slot'].get((w, 0), [])
         if thursday_games:
-            model += lpSum(thursday_games) == 1, f"Thursday_game_count_{w}"
+            yield f"Thursday_game_count_{w}", row_terms(('x', thursday_games, 1)), LpConstraintEQ, 1
 
-        monday_games = [x[(i, j, w, 2)] for i in range(NUM_TEAMS)
-                       for j in range(NUM_TEAMS) if (i, j, w, 2) in x]
+        monday_games = index['slot'].get((w, 2), [])
         if monday_games:
-            model += lpSum(monday_games) == 1, f"Monday_game_count_{w}"
-
-    for w in range(NUM_WEEKS):
-        all_games = [x[(i, j, w, s)] for i in range(NUM_TEAMS)
-                    for j in range(NUM_TEAMS) for s in range(NUM_SLOTS)
-                    if (i, j, w, s) in x]
-        total_byes = lpSum(bye[(i, w)] for i in range(NUM_TEAMS))
+            yield f"Monday_game_count_{w}", row_terms(('x', monday_games, 1)), LpConstraintEQ, 1
 
+    for w in weeks:
+        all_games = index['week'].get(w, [])
         if all_games:
-            model += 2 * lpSum(all_games) + total_byes == 32, f"Games_per_week_{w}"
-
-    v = {}
-    for w in range(1, NUM_WEEKS): 
-        v[w] = LpVariable(f"v_{w}", cat=LpBinary)
+            yield (f"Games_per_week_{w}",
+                   row_terms(('x', all_games, 2), ('bye', [(i, w) for i in range(NUM_TEAMS)], 1)),
+                   LpConstraintEQ, NUM_TEAMS)
 
     for i in range(NUM_TEAMS):
-        for w in range(1, NUM_WEEKS): 
-            thursday_away = [x[(i, j, w, 0)] for j in range(NUM_TEAMS) if (i, j, w, 0) in x]
-            sunday_away_prev = [x[(i, j, w - 1, 1)] for j in range(NUM_TEAMS) if (i, j, w - 1, 1) in x]
+        for w in range(1, NUM_WEEKS):
+            thursday_away = away_slot.get((i, w, 0), [])
+            sunday_away_prev = away_slot.get((i, w - 1, 1), [])
 
             if thursday_away and sunday_away_prev:
-                model += (
-                    lpSum(thursday_away) <= lpSum(sunday_away_prev) + v[w],
-                    f"Thursday_requires_Sunday_away_{i}_{w}"
+                terms = row_terms(
+                    ('x', thursday_away, 1), ('x', sunday_away_prev, -1), ('v', [w], -1)
                 )
+                yield f"Thursday_requires_Sunday_away_{i}_{w}", terms, LpConstraintLE, 0
             elif thursday_away:
-                model += lpSum(thursday_away) <= v[w], f"No_Thursday_away_{i}_{w}"
+                terms = row_terms(('x', thursday_away, 1), ('v', [w], -1))
+                yield f"No_Thursday_away_{i}_{w}", terms, LpConstraintLE, 0
 
-    model += lpSum(v[w] for w in range(1, NUM_WEEKS)) <= 1, 
+    yield "Max_Thursday_exceptions", row_terms(('v', range(1, NUM_WEEKS), 1)), LpConstraintLE, 1
 
     for i in range(NUM_TEAMS):
         for w in range(NUM_WEEKS - 1):
-            sunday_away = [x[(i, j, w, 1)] for j in range(NUM_TEAMS) if (i, j, w, 1) in x]
-            thursday_away_next = [x[(i, j, w + 1, 0)] for j in range(NUM_TEAMS) if (i, j, w + 1, 0) in x]
+            sunday_away = away_slot.get((i, w, 1), [])
+            thursday_away_next = away_slot.get((i, w + 1, 0), [])
+            paired = [(i, w)]
 
             if sunday_away and thursday_away_next:
-                model += y[(i, w)] <= lpSum(sunday_away), f"Y_link_sunday_{i}_{w}"
-                model += y[(i, w)] <= lpSum(thursday_away_next), f"Y_link_thursday_{i}_{w}"
-                model += (
-                    y[(i, w)] >= lpSum(sunday_away) + lpSum(thursday_away_next) - 1,
-                    f"Y_link_both_{i}_{w}"
-                )
+                sunday = ('x', sunday_away, -1)
+                thursday = ('x', thursday_away_next, -1)
+                yield (f"Y_link_sunday_{i}_{w}", row_terms(('y', paired, 1), sunday),
+                       LpConstraintLE, 0)
+                yield (f"Y_link_thursday_{i}_{w}", row_terms(('y', paired, 1), thursday),
+                       LpConstraintLE, 0)
+                yield (f"Y_link_both_{i}_{w}", row_terms(('y', paired, 1), sunday, thursday),
+                       LpConstraintGE, -1)
             else:
-                model += y[(i, w)] == 0, f"Y_zero_{i}_{w}"
+                yield f"Y_zero_{i}_{w}", row_terms(('y', paired, 1)), LpConstraintEQ, 0
+
+
+def pulp_constraint(variables, terms, sense, rhs, name):
+    """A PuLP constraint from a row of schedule_rows over the model's variables."""
+    expression = LpAffineExpression(
+        (variables[family][key], coef) for (family, key), coef in terms.items()
+    )
+    return LpConstraint(expression, sense, name, rhs)
+
+
+def create_nfl_schedule_model(matchup_matrix=None, lazy=False):
+    """
+    Create the NFL schedule optimization model.
+
+    With lazy=True the Max_consec_home/away and No_consec_div rows are left out, to be
+    added back on demand by lazy_constraints.py.
+    """
+    print("Loading data...")
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    print("Creating optimization model...")
+    model = LpProblem("NFL_Schedule_Optimization",LpMinimize)
+
+    # Decision Variables
+    variables = {
+        family: {key: LpVariable(variable_name(family, key), cat=LpBinary) for key in keys}
+        for family, keys in schedule_keys(matchup_matrix).items()
+    }
+
+    print("Setting up objective function...")
+
+    model += (
+        build_objective(variables, game_emissions, avg_paired_savings),
+        "Total_CO2_Emissions"
+    )
+
+    print("Adding constraints...")
+    for name, terms, sense, rhs in schedule_rows(matchup_matrix, lazy):
+        model += pulp_constraint(variables, terms, sense, rhs, name)
 
     print(f"Model created with {len(model.constraints)} constraints")
 
-    variables = {'x': x, 'h': h, 'a': a, 'bye': bye, 'y': y}
     return model, variables, matchup_matrix
 
-def extract_schedule(variables):
-    """Extract the schedule from solved model variables."""
-    x = variables['x']
-    bye_vars = variables['bye']
-
+def solution_values(family_vars):
+    """
+    Solution values of one variable family as an array, in the family's key order. Takes
+    PuLP variables or the plain values the HiGHS and CP-SAT backends return.
+    """
+    values = list(family_vars.values())
+    if values and isinstance(values[0], LpVariable):
+        values = [var.varValue for var in values]
+    return np.array(values, dtype=float)
+
+
+def week_grid(team, opponent, is_home, week, slot):
+    """
+    Lay games out as team x week arrays of opponent (-1 if none), home flag and slot.
+    Each game is given once per side, as parallel arrays. A team with two games in a week
+    keeps the lowest opponent, then slot, away first.
+    """
+    order = np.lexsort((is_home, slot, opponent, week, team))
+    # Sorted by team and week first, so np.unique's first index per cell is the game kept
+    _, first = np.unique(team[order] * NUM_WEEKS + week[order], return_index=True)
+    kept = order[first]
+
+    opponents = np.full((NUM_TEAMS, NUM_WEEKS), -1)
+    homes = np.zeros((NUM_TEAMS, NUM_WEEKS), dtype=bool)
+    slots = np.zeros((NUM_TEAMS, NUM_WEEKS), dtype=np.int64)
+    opponents[team[kept], week[kept]] = opponent[kept]
+    homes[team[kept], week[kept]] = is_home[kept]
+    slots[team[kept], week[kept]] = slot[kept]
+    return opponents, homes, slots
+
+
+def grid_schedule(opponents, homes, slots, on_bye):
+    """The schedule dict of save_schedule_to_csv from week_grid arrays and a bye grid."""
     slot_names = {0: 'Thursday', 1: 'Sunday', 2: 'Monday'}
+
     schedule = {team: [] for team in TEAMS}
+    for i, team_name in enumerate(TEAMS):
+        for w in range(NUM_WEEKS):
+            if on_bye[i, w]:
+                game = {'week': w + 1, 'opponent': 'BYE', 'home_away': '-', 'slot': '-'}
+            elif opponents[i, w] < 0:
+                game = {'week': w + 1, 'opponent': 'ERROR', 'home_away': '-', 'slot': '-'}
+            else:
+                game = {
+                    'week': w + 1, 'opponent': TEAMS[opponents[i, w]],
+                    'home_away': 'Home' if homes[i, w] else 'Away',
+                    'slot': slot_names.get(slots[i, w], f"Slot {slots[i, w] + 1}")
+                }
+            schedule[team_name].append(game)
 
-    for w in range(NUM_WEEKS):
-        week_num = w + 1
+    return schedule
 
-        for i in range(NUM_TEAMS):
-            team_name = TEAMS[i]
 
-            if value(bye_vars[(i, w)]) > 0.5:
-                schedule[team_name].append({
-                    'week': week_num, 'opponent': 'BYE', 'home_away': '-', 'slot': '-'
-                })
-                continue
+def chosen_keys(family_vars, width):
+    """Keys of a variable family whose solution value is 1, as an array of width columns."""
+    keys = list(family_vars)
+    chosen = np.flatnonzero(solution_values(family_vars) > 0.5)
+    return np.array([keys[k] for k in chosen], dtype=np.int64).reshape(-1, width)
 
-            found_game = False
-            for j in range(NUM_TEAMS):
-                for s in range(NUM_SLOTS):
-                    if (i, j, w, s) in x and value(x[(i, j, w, s)]) > 0.5:
-                        schedule[team_name].append({
-                            'week': week_num, 'opponent': TEAMS[j],
-                            'home_away': 'Away', 'slot': slot_names[s]
-                        })
-                        found_game = True
-                        break
-                    if (j, i, w, s) in x and value(x[(j, i, w, s)]) > 0.5:
-                        schedule[team_name].append({
-                            'week': week_num, 'opponent': TEAMS[j],
-                            'home_away': 'Home', 'slot': slot_names[s]
-                        })
-                        found_game = True
-                        break
-                if found_game:
-                    break
-
-            if not found_game:
-                schedule[team_name].append({
-                    'week': week_num, 'opponent': 'ERROR', 'home_away': '-', 'slot': '-'
-                })
 
-    return schedule
+def extract_schedule(variables):
+    """
+    Extract the schedule from solved model variables.
+
+    The x and bye values are read as one array each, and only the keys of those set to 1
+    are decoded into team x week tables, instead of looking up every candidate key per
+    team and week.
+    """
+    away_team, home_team, week, slot = chosen_keys(variables['x'], 4).T
+    byes = chosen_keys(variables['bye'], 2)
+
+    # Each game as seen by its away team, then by its home team
+    opponents, homes, slots = week_grid(
+        np.concatenate([away_team, home_team]), np.concatenate([home_team, away_team]),
+        np.repeat([False, True], len(away_team)), np.concatenate([week, week]),
+        np.concatenate([slot, slot])
+    )
+    on_bye = np.zeros((NUM_TEAMS, NUM_WEEKS), dtype=bool)
+    on_bye[byes[:, 0], byes[:, 1]] = True
+
+    return grid_schedule(opponents, homes, slots, on_bye)
 
 
 def print_schedule(schedule):
@@ -481,6 +639,33 @@ def save_schedule_to_csv(schedule, filepath):
     print(f"Schedule saved to {filepath}")
 
 
+def load_schedule_from_csv(filepath):
+    """Load a schedule written by save_schedule_to_csv."""
+    df = pd.read_csv(filepath)
+
+    schedule = {team: [] for team in TEAMS}
+    for _, row in df.sort_values(['team', 'week']).iterrows():
+        schedule[row['team']].append({
+            'week': int(row['week']), 'opponent': row['opponent'],
+            'home_away': row['home_away'], 'slot': row['slot']
+        })
+
+    return schedule
+
+
+def matchup_matrix_from_schedule(schedule):
+    """Rebuild the matchup matrix implied by a complete schedule."""
+    matrix = {(i, j): 0 for i in range(NUM_TEAMS) for j in range(NUM_TEAMS)}
+
+    for team, games in schedule.items():
+        i = TEAM_IDX[team]
+        for game in games:
+            if game['opponent'] in TEAM_IDX:
+                matrix[(i, TEAM_IDX[game['opponent']])] += 1
+
+    return matrix
+
+
 def save_emissions_to_txt(total_emissions, paired_trips, filepath):
     with open(filepath, 'w') as f:
         f.write(f"{total_emissions:.2f} kg CO2\n")
@@ -542,34 +727,244 @@ def calculate_total_emissions(schedule, distances):
     print(f"Paired Sunday-Thursday trips: {paired_trips_count}")
     return total_emissions, paired_trips_count
 
-def solve_schedule(time_limit=3600, mip_gap=0.005):
-    """Solve the NFL schedule optimization problem."""
-    model, variables, _ = create_nfl_schedule_model()
+def set_initial_schedule(model, variables, warm_start, matchup_matrix):
+    """
+    Give the slot model's variables a starting schedule: the path of a schedule CSV, or
+    'heuristic' for the constructive heuristic. Returns True if a schedule was set.
+    """
+    if warm_start == 'heuristic':
+        from heuristic import heuristic_games
+        from warm_start import apply_warm_start
+        games, _ = heuristic_games(matchup_matrix)
+        if games is None:
+            return False
+        apply_warm_start(variables, games)
+    else:
+        from warm_start import set_warm_start
+        if not set_warm_start(variables, warm_start, matchup_matrix):
+            return False
+
+    print(f"Warm start objective: {value(model.objective):.2f}")
+    return True
+
+
+def solve_options(options):
+    """SOLVE_OPTIONS updated with options, rejecting names it does not have."""
+    unknown = sorted(set(options) - set(SOLVE_OPTIONS))
+    if unknown:
+        raise TypeError(f"Unknown solve options: {', '.join(unknown)}")
+    return {**SOLVE_OPTIONS, **options}
+
+
+def set_options(options):
+    """Names of the options that differ from their SOLVE_OPTIONS default."""
+    return [name for name, value in options.items() if value != SOLVE_OPTIONS[name]]
+
+
+def cbc_method(options, formulation):
+    """
+    The CBC_METHODS entry the options pick, checking that every other option set can be
+    combined with it. Only the slot formulation takes options.
+    """
+    if options['pairing'] not in ('average', 'exact'):
+        raise ValueError(f"Unknown pairing: {options['pairing']}")
+    chosen = set_options(options)
+    if chosen and formulation != 'slot':
+        raise ValueError(f"The {chosen[0]} option is only supported for formulation='slot'")
+    method = next((name for name in CBC_METHODS if name in chosen), 'default')
+    for name in chosen:
+        if name != method and name not in CBC_METHODS[method]:
+            raise ValueError(f"The {name} option cannot be combined with {method}")
+    return method
+
+
+def solve_with_cbc(time_limit, mip_gap, presolve=True, formulation='slot', matchup_matrix=None,
+                   options=None):
+    """
+    Build the PuLP model and solve it with CBC by the CBC_METHODS entry the options pick.
+    Returns (objective, variables, extract).
+    """
+    options = solve_options(options or {})
+    method = cbc_method(options, formulation)
+    warm_start, checkpoint = options['warm_start'], options['checkpoint']
+    telemetry, stagnation = options['telemetry'], options['stagnation']
+    if telemetry is not None or stagnation is not None:
+        from telemetry import check_platform
+        check_platform(stagnation)
+
+    if method == 'artifact':
+        from artifacts import model_artifact, solve_artifact, warm_start_values
+        if matchup_matrix is None:
+            matchup_matrix = load_matchup_matrix()
+        mps_path, index = model_artifact(matchup_matrix)
+        start = warm_start_values(warm_start, matchup_matrix) if warm_start is not None else None
+        print("\nSolving model...")
+        print(f"Time limit: {time_limit} seconds")
+        print(f"MIP gap: {mip_gap * 100}%")
+        objective, values = solve_artifact(mps_path, index, time_limit, mip_gap, start)
+        return objective, values, extract_schedule
+
+    if formulation == 'week':
+        from aggregated_model import create_aggregated_schedule_model, extract_aggregated_schedule
+        model, variables, _ = create_aggregated_schedule_model(matchup_matrix)
+        extract = extract_aggregated_schedule
+    elif formulation == 'slot':
+        model, variables, matchup_matrix = create_nfl_schedule_model(
+            matchup_matrix, method == 'lazy'
+        )
+        extract = extract_schedule
+    else:
+        raise ValueError(f"Unknown formulation: {formulation}")
+
+    use_warm_start = False
+    if checkpoint is not None:
+        from checkpoint import resume_from_checkpoint
+        use_warm_start = resume_from_checkpoint(model, checkpoint)
+    if warm_start is not None and not use_warm_start:
+        use_warm_start = set_initial_schedule(model, variables, warm_start, matchup_matrix)
+
+    if method == 'pairing':
+        from exact_pairing import solve_exact_pairing
+        objective = solve_exact_pairing(
+            model, variables, matchup_matrix, time_limit, mip_gap, presolve, use_warm_start
+        )
+        return objective, variables if objective is not None else None, extract
+
+    if method == 'decompose':
+        from decomposition import solve_decomposed
+        objective = solve_decomposed(model, variables, matchup_matrix, time_limit, mip_gap)
+        return objective, variables if objective is not None else None, extract
+
+    if method == 'lazy':
+        from lazy_constraints import solve_lazy
+        objective, stats = solve_lazy(
+            model, variables, time_limit, mip_gap, presolve, use_warm_start
+        )
+        print(f"Lazy rows added: {stats['rows_added']} in {stats['rounds']} rounds")
+        return objective, variables if objective is not None else None, extract
+
+    from presolve import presolve_model, restore_fixed_values
+    full_model, fixed = model, {}
+    if presolve:
+        model, fixed, _ = presolve_model(model)
 
     print("\nSolving model...")
     print(f"Time limit: {time_limit} seconds")
     print(f"MIP gap: {mip_gap * 100}%")
 
-    from pulp import PULP_CBC_CMD
-    solver = PULP_CBC_CMD(timeLimit=time_limit, gapRel=mip_gap, msg=True)
-    model.solve(solver)
-
-    print(f"\nSolution status: {LpStatus[model.status]}")
+    if telemetry is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(telemetry)), exist_ok=True)
+        open(telemetry, 'w').close()
 
-    if model.status == 1:  
-        print(f"Objective value (Total CO2 emissions): {value(model.objective):.2f} kg")
+    if method == 'checkpoint':
+        from checkpoint import solve_with_checkpoints
+        objective = solve_with_checkpoints(
+            full_model, model, variables, time_limit, mip_gap, checkpoint, use_warm_start,
+            lambda: restore_fixed_values(fixed), telemetry, stagnation
+        )
+        return objective, variables if objective is not None else None, extract
 
-        schedule = extract_schedule(variables)
+    if method in ('telemetry', 'stagnation'):
+        from telemetry import solve_with_telemetry
+        solve_with_telemetry(
+            model, telemetry, stagnation, timeLimit=time_limit, gapRel=mip_gap,
+            warmStart=use_warm_start
+        )
+    else:
+        from pulp import PULP_CBC_CMD
+        solver = PULP_CBC_CMD(timeLimit=time_limit, gapRel=mip_gap, msg=True, warmStart=use_warm_start)
+        model.solve(solver)
 
-        distances = load_all_distances()
-        total_emissions, paired_trips = calculate_total_emissions(schedule, distances)
-        print(f"Verified total emissions: {total_emissions:.2f} kg")
+    print(f"\nSolution status: {LpStatus[model.status]}")
 
-        return schedule, total_emissions, paired_trips
+    if model.status != 1:
+        return None, None, extract
+
+    if fixed:
+        restore_fixed_values(fixed)
+
+    return value(model.objective), variables, extract
+
+
+def solve_schedule(time_limit=3600, mip_gap=0.005, presolve=True, formulation='slot',
+                   matchup_matrix=None, backend='pulp', num_workers=8, improve_time=0,
+                   **options):
+    """Solve the NFL schedule optimization problem with the backend and SOLVE_OPTIONS given."""
+    options = solve_options(options)
+    if backend not in BACKEND_OPTIONS:
+        raise ValueError(f"Unknown backend: {backend}")
+    for name in set_options(options):
+        if name != 'cache' and name not in BACKEND_OPTIONS[backend]:
+            raise ValueError(f"The {name} option is not supported with backend='{backend}'")
+    if backend != 'pulp' and formulation != 'slot':
+        raise ValueError(f"The {backend} backend only supports formulation='slot'")
+
+    if options['cache']:
+        from cache import cache_key, cached_solution
+        settings = {
+            name: options[name] for name in SOLVE_OPTIONS if name not in ('telemetry', 'cache')
+        }
+        settings.update(
+            time_limit=time_limit, mip_gap=mip_gap, presolve=presolve, formulation=formulation,
+            backend=backend, num_workers=num_workers, improve_time=improve_time,
+            checkpoint=options['checkpoint'] is not None
+        )
+        key = cache_key(
+            matchup_matrix if matchup_matrix is not None else load_matchup_matrix(), settings
+        )
+        cached = cached_solution(key)
+        if cached is not None:
+            print(f"Cached solution {key[:12]}: {cached[1]:.2f} kg")
+            return cached
+
+    if backend == 'highs':
+        from highs_backend import solve_with_highs
+        objective, variables = solve_with_highs(time_limit, mip_gap, matchup_matrix)
+        extract = extract_schedule
+    elif backend == 'cpsat':
+        try:
+            from cpsat_backend import solve_with_cpsat
+        except ImportError as error:
+            raise RuntimeError(
+                "OR-Tools does not import once PuLP has loaded highspy, whose HiGHS build "
+                "clashes with its own; import cpsat_backend before model or pulp"
+            ) from error
+        objective, variables = solve_with_cpsat(time_limit, mip_gap, matchup_matrix, num_workers)
+        extract = extract_schedule
+    elif backend == 'portfolio':
+        from portfolio import race_portfolio
+        objective, variables = race_portfolio(
+            time_limit, mip_gap, matchup_matrix, options['portfolio']
+        )
+        extract = extract_schedule
     else:
+        objective, variables, extract = solve_with_cbc(
+            time_limit, mip_gap, presolve, formulation, matchup_matrix,
+            {name: options[name] for name in BACKEND_OPTIONS['pulp']}
+        )
+
+    if variables is None:
         print("No optimal solution found.")
         return None, None, None
 
+    print(f"Objective value (Total CO2 emissions): {objective:.2f} kg")
+
+    schedule = extract(variables)
+
+    if improve_time > 0:
+        from lns import improve_schedule
+        schedule = improve_schedule(schedule, improve_time, num_workers)
+
+    distances = load_all_distances()
+    total_emissions, paired_trips = calculate_total_emissions(schedule, distances)
+    print(f"Verified total emissions: {total_emissions:.2f} kg")
+
+    if options['cache']:
+        from cache import store_solution
+        store_solution(key, schedule, total_emissions, paired_trips)
+
+    return schedule, total_emissions, paired_trips
+
 
 def get_output_path(year, filename):
     """Get absolute path to output file for a specific year."""
@@ -577,9 +972,45 @@ def get_output_path(year, filename):
     return os.path.join(script_dir, f"../../output/{year}", filename)
 
 
-def run_all_years(years=None, time_limit=3600, mip_gap=0.005):
+def season_options(options, year):
+    """
+    The solve options of one season in run_all_years: the {year} placeholder of a warm
+    start path filled in (dropped if there is no such file), and checkpoint=True and
+    telemetry=True turned into the season's paths under output/<year>/.
+    """
+    options = dict(options)
+    if options['warm_start'] not in (None, 'heuristic'):
+        options['warm_start'] = options['warm_start'].format(year=year)
+        if not os.path.exists(options['warm_start']):
+            print(f"No warm start schedule at {options['warm_start']}")
+            options['warm_start'] = None
+    options['checkpoint'] = (
+        get_output_path(year, f"{year}_checkpoint") if options['checkpoint'] else None
+    )
+    options['telemetry'] = (
+        get_output_path(year, f"{year}_telemetry.jsonl") if options['telemetry'] else None
+    )
+    return options
+
+
+def run_all_years(years=None, time_limit=3600, mip_gap=0.005, presolve=True,
+                  formulation='slot', backend='pulp', num_workers=8, improve_time=0,
+                  **options):
+    """
+    Generate matchups and optimize the schedule for each year, passing options on to
+    solve_schedule. warm_start is 'heuristic' or a schedule CSV path with a {year}
+    placeholder, e.g. "actual/schedules/{year}_schedule.csv".
+    With checkpoint=True each season checkpoints to output/<year>/<year>_checkpoint.*,
+    resumes from it after a crash, and is skipped if its checkpoint already met mip_gap.
+    With telemetry=True CBC's progress is written to output/<year>/<year>_telemetry.jsonl.
+    With cache=True a season whose inputs and settings were solved before is read from
+    the solution cache instead of solved again. With artifact=True each season's model is
+    built once and reloaded from output/cache/models/ on later runs.
+    """
     from matchups import generate_matchups
 
+    options = solve_options(options)
+
     if years is None:
         years = list(range(2021, 2027))  
 
@@ -602,9 +1033,23 @@ def run_all_years(years=None, time_limit=3600, mip_gap=0.005):
 
         print(f"\nStep 2: Optimizing schedule for {year}")
         print("-" * 60)
-        schedule, total_emissions, paired_trips = solve_schedule(
-            time_limit=time_limit, mip_gap=mip_gap
-        )
+        year_options = season_options(options, year)
+        completed = None
+        if year_options['checkpoint'] is not None:
+            from checkpoint import completed_checkpoint
+            completed = completed_checkpoint(
+                year_options['checkpoint'], mip_gap, load_matchup_matrix()
+            )
+
+        if completed is not None:
+            print(f"Checkpoint already meets the {mip_gap * 100}% gap; skipping the solve")
+            schedule, total_emissions, paired_trips = completed
+        else:
+            schedule, total_emissions, paired_trips = solve_schedule(
+                time_limit=time_limit, mip_gap=mip_gap, presolve=presolve,
+                formulation=formulation, backend=backend, num_workers=num_workers,
+                improve_time=improve_time, **year_options
+            )
 
         if schedule is not None:
             schedule_path = get_output_path(year, f"{year}_schedule.csv")
@@ -0,0 +1,457 @@
+import contextlib
+import io
+import math
+import multiprocessing
+import time
+
+from pulp import PULP_CBC_CMD, LpBinary, LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+
+import model as model_module
+from model import (
+    calculate_total_emissions, create_nfl_schedule_model, extract_schedule, get_output_path,
+    load_all_distances, load_matchup_matrix, save_emissions_to_txt, save_schedule_to_csv,
+    set_initial_schedule
+)
+
+# Rounds of per-season solves: the separate solve, multiplier updates and the recovery
+COORDINATION_ROUNDS = 6
+
+# Fraction of the time limit shared by all rounds after the first; those rounds start
+# from the previous round's schedules and only move the games of teams with a priced row
+COORDINATION_TIME_SHARE = 0.25
+
+# kg CO2 added to a repeated bye's multiplier per season that repeats it, each round
+MULTIPLIER_STEP = 5000.0
+
+# Thursday road trips a team may take over the cycle beyond its even share
+THURSDAY_AWAY_SLACK = 1
+
+# Season models of the current joint solve, shared with forked workers
+_SEASONS = {}
+
+
+def thursday_away_cap(num_seasons, slack=None):
+    """Most Thursday road trips one team may take over num_seasons seasons."""
+    if slack is None:
+        slack = THURSDAY_AWAY_SLACK
+    # One Thursday game a week, so NUM_WEEKS road trips per season are shared by the league
+    return math.ceil(num_seasons * model_module.NUM_WEEKS / model_module.NUM_TEAMS) + slack
+
+
+def fairness_usage(schedule):
+    """Each team's bye week (0-based) and number of Thursday road trips in a schedule."""
+    byes, thursday_away = {}, {}
+    for team, games in schedule.items():
+        i = model_module.TEAM_IDX[team]
+        thursday_away[i] = 0
+        for game in games:
+            if game['opponent'] == 'BYE':
+                byes[i] = game['week'] - 1
+            elif game['home_away'] == 'Away' and game['slot'] == 'Thursday':
+                thursday_away[i] += 1
+    return byes, thursday_away
+
+
+def fairness_subgradient(usages, cap):
+    """
+    Violation of each fairness row over the seasons' usages: seasons in which a team has
+    its bye in the same week, less one, and a team's Thursday road trips over cap. Returns
+    ({(team, week): violation}, {team: violation}); negative values are slack.
+    """
+    bye_counts = {}
+    thursday_totals = {i: 0 for i in range(model_module.NUM_TEAMS)}
+    for byes, thursday_away in usages:
+        for i, w in byes.items():
+            bye_counts[(i, w)] = bye_counts.get((i, w), 0) + 1
+        for i, count in thursday_away.items():
+            thursday_totals[i] += count
+    return (
+        {key: count - 1 for key, count in bye_counts.items()},
+        {i: total - cap for i, total in thursday_totals.items()}
+    )
+
+
+def bye_penalty(variables, bye_prices):
+    """Multiplier terms of one season's objective for the relaxed bye rows."""
+    return lpSum(price * variables['bye'][key] for key, price in bye_prices.items() if price)
+
+
+def thursday_limits(thursday_counts, cap, year, round_index):
+    """
+    Thursday road trips each team may take in one season's next solve, given every
+    season's current counts ({year: {team: count}}). A team over the cap must shed the
+    excess from its latest seasons backwards, each giving up as many trips as it has;
+    a team under the cap may take its spare trips in one season, rotating by team and
+    round, so the seasons solved in parallel cannot together push it over.
+    """
+    years = list(thursday_counts)
+    limits = {}
+    for i in range(model_module.NUM_TEAMS):
+        current = thursday_counts[year][i]
+        total = sum(counts[i] for counts in thursday_counts.values())
+        if total > cap:
+            later = sum(thursday_counts[y][i] for y in years[years.index(year) + 1:])
+            shed = min(current, max(total - cap - later, 0))
+            limits[i] = current - shed
+        elif year == years[(i + round_index) % len(years)]:
+            limits[i] = current + cap - total
+        else:
+            limits[i] = current
+    return limits
+
+
+def solve_season(task):
+    """
+    Solve one season's model with the bye multipliers added to its objective. With
+    free_teams, every game between two other teams is fixed at the warm start, so only
+    the games of the teams with a violated row move, as in a large neighbourhood search
+    step, and the byes in blocked_byes are ruled out. With fixed_games ({(away, home,
+    week)}), every game keeps that week and only the slots are chosen. Either way each
+    team's Thursday road trips are held to its limit (see thursday_limits).
+    """
+    year, bye_prices, free_teams, blocked_byes, fixed_games, limits, time_limit, mip_gap = task
+    model, variables, objective, use_warm_start = _SEASONS[year]
+
+    model.setObjective(objective + bye_penalty(variables, bye_prices))
+    solve_model, fixed = model, {}
+    if free_teams is not None or fixed_games is not None:
+        from presolve import fix_variables, presolve_model
+        frozen = {}
+        if free_teams is not None:
+            frozen = {var: var.varValue for (i, j, _, _), var in variables['x'].items()
+                      if i not in free_teams and j not in free_teams}
+            frozen.update((variables['bye'][key], 0) for key in blocked_byes)
+        if fixed_games is not None:
+            frozen.update((var, 0) for (i, j, w, _), var in variables['x'].items()
+                          if (i, j, w) not in fixed_games)
+        solve_model = fix_variables(model, frozen, "Coordination")
+        for i, limit in limits.items():
+            solve_model += lpSum(var for (a, _, _, s), var in variables['x'].items()
+                                 if a == i and s == 0) <= limit, f"Thursday_away_limit_{i}"
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                solve_model, fixed, _ = presolve_model(solve_model)
+        except ValueError:
+            model.setObjective(objective)
+            return year, 'Infeasible', 0.0, None
+
+    start = time.perf_counter()
+    solve_model.solve(PULP_CBC_CMD(
+        timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=use_warm_start
+    ))
+    solve_time = time.perf_counter() - start
+    model.setObjective(objective)
+    if solve_model.status != 1:
+        return year, LpStatus[solve_model.status], solve_time, None
+
+    if fixed:
+        from presolve import restore_fixed_values
+        restore_fixed_values(fixed)
+    return year, LpStatus[solve_model.status], solve_time, extract_schedule(variables)
+
+
+def season_byes(bye_prices, bye_holders, free_teams, year):
+    """
+    The bye multipliers one season pays, and the byes it may not move into. Of the
+    seasons holding a repeated bye only the latest pays for it; otherwise a price would
+    move every holder away at once and the byes would collide again elsewhere. For the
+    same reason a free team may not move its bye into a week it has in another season.
+    """
+    prices = {key: price for key, price in bye_prices.items()
+              if year not in bye_holders.get(key, [])[:-1]}
+    blocked = [key for key, holders in bye_holders.items()
+               if key[0] in (free_teams or ()) and year not in holders]
+    return prices, blocked
+
+
+def distinct_byes(usages, years):
+    """
+    Bye weeks ({year: {team: week}}) giving every team a different bye week in each season,
+    found as a small assignment MIP that moves as few byes as possible and keeps the
+    number of byes in every week of every season. Returns None if there is none.
+    """
+    window = range(model_module.BYE_WEEK_START - 1, model_module.BYE_WEEK_END)
+    current = {year: byes for year, (byes, _) in zip(years, usages)}
+
+    model = LpProblem("Distinct_byes", LpMaximize)
+    b = {(year, i, w): LpVariable(f"b_{year}_{i}_{w}", cat=LpBinary)
+         for year in years for i in range(model_module.NUM_TEAMS) for w in window}
+    model += lpSum(b[(year, i, w)] for year, byes in current.items() for i, w in byes.items())
+    for i in range(model_module.NUM_TEAMS):
+        for year in years:
+            model += lpSum(b[(year, i, w)] for w in window) == 1, f"One_bye_{year}_{i}"
+        for w in window:
+            model += lpSum(b[(year, i, w)] for year in years) <= 1, f"Distinct_bye_{i}_{w}"
+    for year, byes in current.items():
+        for w in window:
+            held = sum(1 for bye_week in byes.values() if bye_week == w)
+            model += (
+                lpSum(b[(year, i, w)] for i in range(model_module.NUM_TEAMS)) == held,
+                f"Byes_in_week_{year}_{w}"
+            )
+
+    model.solve(PULP_CBC_CMD(msg=False))
+    if model.status != 1:
+        return None
+    return {
+        year: {i: w for (y, i, w), var in b.items() if y == year and var.varValue > 0.5}
+        for year in years
+    }
+
+
+def recovered_games(schedule, byes, seed=0):
+    """
+    The season's games with every team's bye moved to byes[team] by the week repair
+    search, and Thursday and Monday games reassigned; None if a rule is left broken.
+    """
+    from warm_start import games_from_schedule, repair_slots, repair_weeks, slots_valid
+
+    games = games_from_schedule(schedule)
+    _, penalty = repair_weeks(games, seed=seed, byes=byes)
+    if penalty > 0 or repair_slots(games) > 1 or not slots_valid(games):
+        return None
+    return games
+
+
+def solve_round(years, bye_prices, bye_holders, limits, free_teams, time_limit,
+                mip_gap, num_workers, fixed_games=None):
+    """Solve every season once, in parallel on forked workers. Returns {year: result}."""
+    tasks = []
+    for year in years:
+        prices, blocked = season_byes(bye_prices, bye_holders, free_teams, year)
+        season_games = fixed_games.get(year) if fixed_games is not None else None
+        tasks.append((year, prices, free_teams, blocked, season_games, limits.get(year, {}),
+                      time_limit, mip_gap))
+    if num_workers > 1:
+        with multiprocessing.get_context('fork').Pool(min(num_workers, len(tasks))) as pool:
+            results = pool.map(solve_season, tasks)
+    else:
+        results = [solve_season(task) for task in tasks]
+    return {year: (status, solve_time, schedule) for year, status, solve_time, schedule in results}
+
+
+def multi_season(years, matchup_matrices=None, time_limit=600, mip_gap=0.005, rounds=None,
+                 thursday_slack=None, num_workers=None, warm_start='heuristic'):
+    """
+    Schedule several seasons of a rotation cycle together, so that no team has its bye in
+    the same week twice and no team takes more than thursday_away_cap Thursday road trips
+    over the cycle.
+
+    The fairness rows are the only ones linking the seasons, so each round solves every
+    season's own slot model in parallel (num_workers forked processes) and coordinates
+    them between rounds. The first round is the seasons solved separately. Repeated byes
+    are then relaxed with Lagrange multipliers, moved by MULTIPLIER_STEP per repeat and
+    paid in the objective (see season_byes). Thursday road trips are shared out instead,
+    as a per-season limit for each team (see thursday_limits): pricing them only moved
+    the trips onto the opponents. These rounds start from each season's previous schedule
+    and re-solve only the games of teams with a violated row; a season whose re-solve
+    fails keeps its schedule. Once a round does not lower the violation, or at the last
+    of rounds (default COORDINATION_ROUNDS), the recovery round gives every team distinct
+    bye weeks (see distinct_byes), repairs each season's weeks around them (see
+    recovered_games) and re-solves the slots with the game weeks fixed. All rounds after
+    the first share COORDINATION_TIME_SHARE of time_limit, so the whole solve stays close
+    to the separate one's time.
+
+    Returns {'status', 'joint', 'best', 'separate', 'history', 'thursday_cap'}. status is
+    'fair' when the best round meets every fairness row, and then 'joint' holds it;
+    otherwise status is 'infeasible' and 'joint' is None. 'best' is the least unfair
+    round either way.
+    matchup_matrices maps each year to its matchups; missing years are generated.
+    warm_start ('heuristic' or a schedule CSV path with a {year} placeholder) seeds the
+    first round.
+    """
+    from warm_start import apply_warm_start, games_from_schedule
+
+    if rounds is None:
+        rounds = COORDINATION_ROUNDS
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    if matchup_matrices is None:
+        matchup_matrices = {}
+    cap = thursday_away_cap(len(years), thursday_slack)
+    coordination_time = time_limit * COORDINATION_TIME_SHARE / max(rounds - 1, 1)
+    distances = load_all_distances()
+
+    _SEASONS.clear()
+    for year in years:
+        matchup_matrix = matchup_matrices.get(year)
+        if matchup_matrix is None:
+            from matchups import generate_matchups
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_matchups(year=year)
+            matchup_matrix = load_matchup_matrix()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+        use_warm_start = False
+        if warm_start is not None:
+            season_warm_start = warm_start.format(year=year)
+            use_warm_start = set_initial_schedule(
+                model, variables, season_warm_start, matchup_matrix
+            )
+        _SEASONS[year] = (model, variables, model.objective, use_warm_start)
+
+    bye_prices, bye_holders, limits, over_cap = {}, {}, {}, set()
+    separate, best, history, wall_time, schedules, usages = None, None, [], 0, {}, []
+    try:
+        for round_index in range(rounds):
+            start = time.perf_counter()
+            recovery = round_index > 0 and (
+                round_index == rounds - 1
+                or (len(history) > 1 and history[-1]['violation'] >= history[-2]['violation'])
+            )
+            fixed_games = None
+            if round_index == 0:
+                free_teams, round_time = None, time_limit
+            elif recovery:
+                recovered = recovery_games(years, schedules, usages)
+                if recovered is None:
+                    break
+                for year, games in recovered.items():
+                    model, variables, objective, _ = _SEASONS[year]
+                    apply_warm_start(variables, games)
+                    _SEASONS[year] = (model, variables, objective, True)
+                thursday_counts = {year: thursday_counts_of(games)
+                                   for year, games in recovered.items()}
+                limits = {year: thursday_limits(thursday_counts, cap, year, round_index)
+                          for year in years}
+                fixed_games = {
+                    year: {(game['away'], game['home'], game['week']) for game in games}
+                    for year, games in recovered.items()
+                }
+                bye_prices, bye_holders, free_teams = {}, {}, None
+                round_time = coordination_time
+            else:
+                free_teams = {i for (i, _), price in bye_prices.items() if price > 0} | over_cap
+                round_time = coordination_time
+            results = solve_round(years, bye_prices, bye_holders, limits, free_teams,
+                                  round_time, mip_gap, num_workers, fixed_games)
+            elapsed = time.perf_counter() - start
+            wall_time += elapsed
+
+            failed = [year for year, (status, _, schedule) in results.items() if schedule is None]
+            if failed and round_index == 0:
+                print(f"Round 1: no schedule for {failed}")
+                break
+            if failed and recovery:
+                print(f"Recovery: no schedule within the Thursday limits for {failed}")
+                break
+            for year in failed:
+                print(f"Round {round_index + 1}: {year} kept its schedule ({results[year][0]})")
+
+            schedules = {year: schedule if schedule is not None else schedules[year]
+                         for year, (_, _, schedule) in results.items()}
+            emissions = {year: calculate_total_emissions(schedule, distances)[0]
+                         for year, schedule in schedules.items()}
+            usages = [fairness_usage(schedules[year]) for year in years]
+            bye_violation, thursday_violation = fairness_subgradient(usages, cap)
+            repeated_byes = sum(max(g, 0) for g in bye_violation.values())
+            thursday_excess = sum(max(g, 0) for g in thursday_violation.values())
+            violation = repeated_byes + thursday_excess
+            point = {
+                'round': round_index + 1, 'schedules': schedules, 'emissions': emissions,
+                'total_emissions': sum(emissions.values()), 'violation': violation,
+                'wall_time': wall_time,
+                'solve_time': sum(solve_time for _, solve_time, _ in results.values())
+            }
+            history.append(point)
+            print(f"Round {round_index + 1}{' (recovery)' if recovery else ''}: "
+                  f"{point['total_emissions']:.2f} kg, {repeated_byes} repeated byes, "
+                  f"{thursday_excess} Thursday road trips over the cap ({elapsed:.1f} s)")
+
+            if separate is None:
+                separate = point
+            if best is None or (violation, point['total_emissions']) < (
+                    best['violation'], best['total_emissions']):
+                best = point
+            if violation == 0 or recovery:
+                break
+
+            bye_holders = {}
+            for year, (byes, _) in zip(years, usages):
+                for i, w in byes.items():
+                    bye_holders.setdefault((i, w), []).append(year)
+            # A priced bye no season holds any more has violation -1, so its price decays too
+            for key in set(bye_violation) | set(bye_prices):
+                g = bye_violation.get(key, -1)
+                if g > 0 or bye_prices.get(key):
+                    bye_prices[key] = max(bye_prices.get(key, 0) + MULTIPLIER_STEP * g, 0)
+            over_cap = {i for i, g in thursday_violation.items() if g > 0}
+            thursday_counts = {year: counts for year, (_, counts) in zip(years, usages)}
+            limits = {year: thursday_limits(thursday_counts, cap, year, round_index)
+                      for year in years}
+
+            # The workers solved copies of the models, so next round starts from their schedules
+            for year, (model, variables, objective, _) in _SEASONS.items():
+                apply_warm_start(variables, games_from_schedule(schedules[year]))
+                _SEASONS[year] = (model, variables, objective, True)
+    finally:
+        _SEASONS.clear()
+
+    fair = best is not None and best['violation'] == 0
+    if best is not None:
+        print_fairness(separate, best, cap, 'Joint' if fair else 'Best')
+        if not fair:
+            print("\nNo round met every fairness row; reporting the result as infeasible")
+    return {
+        'status': 'fair' if fair else 'infeasible', 'joint': best if fair else None,
+        'best': best, 'separate': separate, 'history': history, 'thursday_cap': cap
+    }
+
+
+def thursday_counts_of(games):
+    """Thursday road trips per team in a list of games."""
+    counts = {i: 0 for i in range(model_module.NUM_TEAMS)}
+    for game in games:
+        if game['slot'] == 0:
+            counts[game['away']] += 1
+    return counts
+
+
+def recovery_games(years, schedules, usages):
+    """
+    Each season's games repaired around distinct bye weeks ({year: games}), or None if
+    there are no distinct bye weeks or a season's repair fails.
+    """
+    byes = distinct_byes(usages, years)
+    if byes is None:
+        print("Recovery: no distinct bye weeks keep every week's bye count")
+        return None
+
+    recovered = {}
+    for year in years:
+        games = recovered_games(schedules[year], byes[year])
+        if games is None:
+            print(f"Recovery: the weeks of {year} could not be repaired around its new byes")
+            return None
+        recovered[year] = games
+    return recovered
+
+
+def print_fairness(separate, joint, cap, name='Joint'):
+    """Emissions and fairness of the separate and joint schedules, season by season."""
+    print(f"\n{'Year':<6} {'Separate (kg)':>15} {name + ' (kg)':>15} {'Change':>8}")
+    for year, emissions in joint['emissions'].items():
+        before = separate['emissions'][year]
+        print(f"{year:<6} {before:>15.2f} {emissions:>15.2f} "
+              f"{(emissions - before) / before * 100:>7.2f}%")
+
+    print(f"\n{'':<10} {'Repeated byes':>14} {'Max Thursday away':>18} {'Wall time (s)':>14}")
+    for label, point in (('Separate', separate), (name, joint)):
+        usages = [fairness_usage(schedule) for schedule in point['schedules'].values()]
+        bye_violation, thursday_violation = fairness_subgradient(usages, cap)
+        repeated = sum(max(g, 0) for g in bye_violation.values())
+        most_thursday = max(g for g in thursday_violation.values()) + cap
+        print(f"{label:<10} {repeated:>14} {most_thursday:>18} {point['wall_time']:>14.1f}")
+
+
+def save_multi_season(result):
+    """Write each season's joint schedule and its emissions to model/output/<year>/."""
+    if result['joint'] is None:
+        raise ValueError("The multi-season result is infeasible; there are no joint schedules to save")
+    distances = load_all_distances()
+    for year, schedule in result['joint']['schedules'].items():
+        save_schedule_to_csv(schedule, get_output_path(year, f"{year}_joint_schedule.csv"))
+        total_emissions, paired_trips = calculate_total_emissions(schedule, distances)
+        save_emissions_to_txt(
+            total_emissions, paired_trips, get_output_path(year, f"{year}_joint_emissions.txt")
+        )
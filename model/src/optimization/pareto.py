@@ -0,0 +1,217 @@
+import multiprocessing
+import os
+
+from pulp import PULP_CBC_CMD, LpStatus, LpVariable, lpSum, value
+
+import model as model_module
+from model import (
+    calculate_total_emissions, create_nfl_schedule_model, extract_schedule, get_output_path,
+    load_all_distances, load_matchup_matrix, precompute_average_paired_savings,
+    precompute_game_emissions, save_schedule_to_csv, set_initial_schedule
+)
+
+# Right-hand side of the bound row while it should not bind
+UNBOUNDED_EMISSIONS = 1e12
+
+# Weight of total emissions in the minimum max-team-emissions anchor, so that anchor is
+# not dominated by a schedule with the same maximum and lower total emissions
+EQUITY_TIEBREAK = 1e-3
+
+# Model shared with forked sweep workers, so each point reuses the parent's build
+_SWEEP = {}
+
+
+def team_emission_expressions(model, variables, game_emissions, avg_paired_savings):
+    """
+    Each team's share of the model objective: its own trips, less its paired savings.
+
+    Every matchup is played once per venue, so a team's trips depend only on where its
+    games are played. A continuous g per (away, home) pair, linked to the sum of its x, keeps
+    the team rows short instead of repeating every x of the team.
+    """
+    by_pair = {}
+    for key in variables['x']:
+        by_pair.setdefault((key[0], key[1]), []).append(key)
+
+    terms = {i: [] for i in range(model_module.NUM_TEAMS)}
+    for (i, j), keys in by_pair.items():
+        played = LpVariable(f"g_{i}_{j}", lowBound=0, upBound=1)
+        model += played - lpSum(variables['x'][k] for k in keys) == 0, f"Venue_link_{i}_{j}"
+        terms[i].append(game_emissions.get((i, j, False), 0) * played)
+        terms[j].append(game_emissions.get((j, i, True), 0) * played)
+    for (i, w), var in variables['y'].items():
+        terms[i].append(-avg_paired_savings.get(i, 0) * var)
+    return {i: lpSum(team_terms) for i, team_terms in terms.items()}
+
+
+def add_equity_rows(model, variables, matchup_matrix):
+    """
+    Add m >= every team's emissions and the epsilon row m <= rhs, left slack for now.
+    Returns m, the epsilon row and the per-team emission expressions.
+    """
+    distances = load_all_distances()
+    game_emissions = precompute_game_emissions(distances, matchup_matrix)
+    avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+
+    max_team = LpVariable("max_team_emissions", lowBound=0)
+    expressions = team_emission_expressions(model, variables, game_emissions, avg_paired_savings)
+    for i, expression in expressions.items():
+        model += expression - max_team <= 0, f"Team_emissions_{i}"
+
+    model += max_team <= UNBOUNDED_EMISSIONS, "Max_team_emissions_bound"
+    return max_team, model.constraints["Max_team_emissions_bound"], expressions
+
+
+def set_equity_start(model, max_team, expressions):
+    """
+    Complete a schedule warm start with the g and m values it implies, so CBC is given a
+    full feasible start rather than one missing the equity variables.
+    """
+    for name, row in model.constraints.items():
+        if name.startswith("Venue_link_"):
+            played = next(var for var, coef in row.items() if coef > 0)
+            played.setInitialValue(sum(var.varValue or 0 for var, coef in row.items() if coef < 0))
+    max_team.setInitialValue(max(value(expression) for expression in expressions.values()))
+
+
+def max_team_emissions(schedule, distances):
+    """Largest single-team travel emissions, scored as calculate_total_emissions does."""
+    from lns import index_games, team_emissions, trip_costs
+    from warm_start import games_from_schedule
+
+    by_team_week = index_games(games_from_schedule(schedule))
+    costs = trip_costs(distances)
+    return max(team_emissions(t, by_team_week, costs) for t in range(model_module.NUM_TEAMS))
+
+
+def solve_point(args):
+    """Solve one epsilon point on the shared model and return its schedule."""
+    epsilon, time_limit, mip_gap = args
+    model, variables, bound = _SWEEP['model'], _SWEEP['variables'], _SWEEP['bound']
+
+    bound.changeRHS(epsilon)
+    model.solve(PULP_CBC_CMD(
+        timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=_SWEEP['warm_start']
+    ))
+    if model.status != 1:
+        return epsilon, LpStatus[model.status], None
+    return epsilon, LpStatus[model.status], extract_schedule(variables)
+
+
+def pareto_filter(points):
+    """Keep the points no other point beats on both total and max per-team emissions."""
+    front = []
+    for point in sorted(points, key=lambda p: (p['total_emissions'], p['max_team_emissions'])):
+        if not front or point['max_team_emissions'] < front[-1]['max_team_emissions'] - 1e-6:
+            front.append(point)
+    return front
+
+
+def pareto_front(matchup_matrix=None, points=20, time_limit=600, mip_gap=0.005,
+                 num_workers=None, warm_start=None):
+    """
+    Trade total CO2 against the largest single-team emissions by epsilon constraint.
+
+    The slot model is built once with a variable m bounding every team's emissions and a
+    single row m <= epsilon. Two anchor solves give the ends of the range: minimum total
+    emissions, and minimum m. The points in between only change the right-hand side of
+    that row and are solved on num_workers forked processes, all starting from the
+    minimum-m schedule, which is feasible for every epsilon. warm_start ('heuristic' or a
+    schedule CSV) seeds the anchors. The equity rows make the root LP much slower than the
+    plain model's, and CBC does not stop inside it at time_limit. Returns the Pareto set
+    as dicts with the schedule, its calculate_total_emissions values and its max per-team
+    emissions.
+    """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+
+    model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+    max_team, bound, expressions = add_equity_rows(model, variables, matchup_matrix)
+    total_objective = model.objective
+    distances = load_all_distances()
+
+    use_warm_start = False
+    if warm_start is not None:
+        use_warm_start = set_initial_schedule(model, variables, warm_start, matchup_matrix)
+        if use_warm_start:
+            set_equity_start(model, max_team, expressions)
+
+    def solve_anchor(name):
+        model.solve(PULP_CBC_CMD(
+            timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=use_warm_start
+        ))
+        print(f"{name} anchor: {LpStatus[model.status]}")
+        if model.status != 1:
+            return None, None
+        schedule = extract_schedule(variables)
+        return max(value(expression) for expression in expressions.values()), schedule
+
+    print("\nSolving the minimum-emissions anchor...")
+    high, min_total_schedule = solve_anchor("Minimum emissions")
+
+    print("Solving the minimum max-team-emissions anchor...")
+    use_warm_start = use_warm_start or min_total_schedule is not None
+    model.setObjective(max_team + EQUITY_TIEBREAK * total_objective)
+    low, fair_schedule = solve_anchor("Minimum max-team emissions")
+    model.setObjective(total_objective)
+
+    schedules = [(high, min_total_schedule), (low, fair_schedule)]
+    if high is not None and low is not None and high - low > 1e-6 * high and points > 2:
+        for var in model.variables():
+            var.setInitialValue(var.varValue)
+        step = (high - low) / (points - 1)
+        epsilons = [low + k * step for k in range(1, points - 1)]
+
+        _SWEEP.update(model=model, variables=variables, bound=bound, warm_start=True)
+        tasks = [(epsilon, time_limit, mip_gap) for epsilon in epsilons]
+        print(f"Solving {len(tasks)} epsilon points on {num_workers} workers...")
+        try:
+            if num_workers > 1:
+                with multiprocessing.get_context('fork').Pool(num_workers) as pool:
+                    results = pool.map(solve_point, tasks)
+            else:
+                results = [solve_point(task) for task in tasks]
+        finally:
+            _SWEEP.clear()
+            bound.changeRHS(UNBOUNDED_EMISSIONS)
+
+        for epsilon, status, schedule in results:
+            print(f"epsilon {epsilon:.2f}: {status}")
+            schedules.append((epsilon, schedule))
+
+    front = []
+    for epsilon, schedule in schedules:
+        if schedule is None:
+            continue
+        total_emissions, paired_trips = calculate_total_emissions(schedule, distances)
+        front.append({
+            'epsilon': epsilon,
+            'schedule': schedule,
+            'total_emissions': total_emissions,
+            'paired_trips': paired_trips,
+            'max_team_emissions': max_team_emissions(schedule, distances)
+        })
+
+    front = pareto_filter(front)
+    print(f"\n{'Total (kg)':>15} {'Max team (kg)':>15} {'Paired':>7}")
+    for point in front:
+        print(f"{point['total_emissions']:>15.2f} {point['max_team_emissions']:>15.2f} "
+              f"{point['paired_trips']:>7}")
+    return front
+
+
+def save_pareto_front(front, year):
+    """Write each Pareto schedule and a summary of the front to model/output/<year>/."""
+    summary_path = get_output_path(year, f"{year}_pareto.csv")
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    for k, point in enumerate(front):
+        save_schedule_to_csv(point['schedule'], get_output_path(year, f"{year}_pareto_{k}.csv"))
+
+    with open(summary_path, 'w') as f:
+        f.write("point,total_emissions,max_team_emissions,paired_trips\n")
+        for k, point in enumerate(front):
+            f.write(f"{k},{point['total_emissions']:.2f},{point['max_team_emissions']:.2f},"
+                    f"{point['paired_trips']}\n")
+    print(f"Pareto front saved to {summary_path}")
@@ -0,0 +1,115 @@
+import math
+import os
+import time
+
+from pulp import PULP_CBC_CMD, LpStatus, lpSum, value
+
+from model import (
+    calculate_total_emissions, create_nfl_schedule_model, extract_schedule, get_output_path,
+    load_all_distances, load_matchup_matrix, save_schedule_to_csv, set_initial_schedule
+)
+
+
+def assignment(variables):
+    """The x variables set to 1 in the current solution."""
+    return [var for var in variables['x'].values() if (var.varValue or 0) > 0.5]
+
+
+def hamming_distance(ones, other):
+    """Hamming distance between two x assignments given as their lists of x set to 1."""
+    shared = len({var.name for var in ones} & {var.name for var in other})
+    return len(ones) + len(other) - 2 * shared
+
+
+def add_no_good_cut(model, ones, min_distance, index):
+    """
+    Cut off every assignment within min_distance of ones. Every schedule sets the same
+    number of x, so a distance of d means sharing at most len(ones) - d / 2 of them.
+    """
+    model += (
+        lpSum(ones) <= len(ones) - math.ceil(min_distance / 2),
+        f"Pool_no_good_{index}"
+    )
+
+
+def solution_pool(matchup_matrix=None, k=5, within=0.02, min_distance=32, time_limit=600,
+                  mip_gap=0.005, warm_start=None):
+    """
+    Find up to k schedules whose model objective is within `within` of the best one's and
+    whose x assignments are at least min_distance apart (Hamming distance).
+
+    The slot model is built once. After the first solve a row caps the objective at
+    (1 + within) times the best, and every schedule found adds one no-good cut, so each
+    later solve only adds a row to the same model. warm_start ('heuristic' or a schedule
+    CSV) seeds the first solve; with 'heuristic' each later solve starts from a differently
+    seeded heuristic schedule, which CBC repairs towards the cuts. Returns the schedules as
+    dicts with the calculate_total_emissions values and the min_distance to the schedules
+    found before each, best first.
+    """
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+
+    model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+    distances = load_all_distances()
+    objective = model.objective
+
+    use_warm_start = False
+    if warm_start is not None:
+        use_warm_start = set_initial_schedule(model, variables, warm_start, matchup_matrix)
+
+    pool = []
+    for index in range(k):
+        if index > 0 and warm_start == 'heuristic':
+            from heuristic import heuristic_games
+            from warm_start import apply_warm_start
+            games, _ = heuristic_games(matchup_matrix, restarts=1, seed=index)
+            use_warm_start = games is not None
+            if use_warm_start:
+                apply_warm_start(variables, games)
+
+        start = time.perf_counter()
+        model.solve(PULP_CBC_CMD(
+            timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=use_warm_start
+        ))
+        print(f"Pool schedule {index + 1}: {LpStatus[model.status]} "
+              f"({time.perf_counter() - start:.1f} s)")
+        if model.status != 1:
+            break
+
+        ones = assignment(variables)
+        schedule = extract_schedule(variables)
+        total_emissions, paired_trips = calculate_total_emissions(schedule, distances)
+        pool.append({
+            'schedule': schedule,
+            'objective': value(objective),
+            'total_emissions': total_emissions,
+            'paired_trips': paired_trips,
+            'min_distance': min((hamming_distance(ones, p['ones']) for p in pool), default=0),
+            'ones': ones
+        })
+        print(f"Objective {value(objective):.2f}, verified {total_emissions:.2f} kg CO2")
+
+        if index == 0:
+            model += objective <= (1 + within) * value(objective), "Pool_objective_cap"
+        add_no_good_cut(model, ones, min_distance, index)
+        use_warm_start = False
+
+    for point in pool:
+        del point['ones']
+    pool.sort(key=lambda p: p['total_emissions'])
+    return pool
+
+
+def save_solution_pool(pool, year):
+    """Write each pool schedule and a summary of the pool to model/output/<year>/."""
+    summary_path = get_output_path(year, f"{year}_pool.csv")
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    for k, point in enumerate(pool):
+        save_schedule_to_csv(point['schedule'], get_output_path(year, f"{year}_pool_{k}.csv"))
+
+    with open(summary_path, 'w') as f:
+        f.write("schedule,total_emissions,paired_trips,objective,min_distance\n")
+        for k, point in enumerate(pool):
+            f.write(f"{k},{point['total_emissions']:.2f},{point['paired_trips']},"
+                    f"{point['objective']:.2f},{point['min_distance']}\n")
+    print(f"Solution pool saved to {summary_path}")
@@ -0,0 +1,215 @@
+import contextlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+from pulp import PULP_CBC_CMD, LpSolutionOptimal, value
+
+from model import create_nfl_schedule_model
+
+# Extra time allowed past time_limit for model build and solution read-back
+RACE_GRACE_PERIOD = 120
+
+# Seconds a stopped racer gets to exit before it is killed
+RACER_STOP_TIMEOUT = 10
+
+CBC_PORTFOLIO = [
+    {'name': 'cbc', 'backend': 'pulp', 'options': []},
+    {'name': 'cbc_seed_7', 'backend': 'pulp', 'options': ['randomCbcSeed 7']},
+    {'name': 'cbc_seed_1234', 'backend': 'pulp', 'options': ['randomCbcSeed 1234']},
+    {'name': 'cbc_root_cuts', 'backend': 'pulp', 'options': ['cuts root']},
+    {'name': 'cbc_local_search', 'backend': 'pulp',
+     'options': ['proximity on', 'Rins on', 'Dins on']},
+]
+
+
+def importable(module):
+    """
+    Whether module imports in this process. Being installed is not enough: OR-Tools and
+    highspy bundle clashing HiGHS builds, and whichever loads second fails to import.
+    """
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return False
+    return True
+
+
+def default_portfolio():
+    """CBC seeds and cut/heuristic variants, plus HiGHS and CP-SAT when they import."""
+    portfolio = list(CBC_PORTFOLIO)
+    for name, module, config in (
+        ('highs', 'highspy', {'name': 'highs', 'backend': 'highs'}),
+        ('cpsat', 'ortools.sat.python.cp_model',
+         {'name': 'cpsat', 'backend': 'cpsat', 'num_workers': 1})
+    ):
+        if importable(module):
+            portfolio.append(config)
+        elif importlib.util.find_spec(module.split('.')[0]) is not None:
+            print(f"{module} is installed but does not import here; racing without {name}")
+    return portfolio
+
+
+def race_cbc(config, time_limit, mip_gap, matchup_matrix):
+    from presolve import presolve_model, restore_fixed_values
+
+    model, variables, _ = create_nfl_schedule_model(matchup_matrix)
+    model, fixed, _ = presolve_model(model)
+    solver = PULP_CBC_CMD(
+        timeLimit=time_limit, gapRel=mip_gap, msg=False, options=config.get('options', [])
+    )
+    model.solve(solver)
+
+    if model.status != 1:
+        return None, None, False
+
+    restore_fixed_values(fixed)
+    values = {
+        family: {key: value(var) for key, var in family_vars.items()}
+        for family, family_vars in variables.items()
+    }
+    return value(model.objective), values, model.sol_status == LpSolutionOptimal
+
+
+def race_highs(config, time_limit, mip_gap, matchup_matrix):
+    import highspy
+    from highs_backend import build_sparse_model, solve_sparse_model, solution_variables
+
+    sparse, columns, _ = build_sparse_model(matchup_matrix)
+    highs = solve_sparse_model(sparse, time_limit, mip_gap, output=False)
+
+    info = highs.getInfo()
+    if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+        return None, None, False
+
+    proven = highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+    return info.objective_function_value, solution_variables(highs, columns), proven
+
+
+def race_cpsat(config, time_limit, mip_gap, matchup_matrix):
+    from ortools.sat.python import cp_model
+    from cpsat_backend import (
+        EMISSION_SCALE, create_cpsat_model, solve_cpsat_model, solution_variables
+    )
+
+    model, variables, _ = create_cpsat_model(matchup_matrix)
+    solver, status = solve_cpsat_model(
+        model, time_limit, mip_gap, config.get('num_workers', 1), log=False
+    )
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, None, False
+
+    objective = solver.ObjectiveValue() / EMISSION_SCALE
+    return objective, solution_variables(solver, variables), status == cp_model.OPTIMAL
+
+
+RACERS = {
+    'pulp': race_cbc,
+    'highs': race_highs,
+    'cpsat': race_cpsat
+}
+
+
+def run_racer(config, time_limit, mip_gap, matchup_matrix, results):
+    """Solve with one configuration and post its incumbent to the results queue."""
+    if hasattr(os, 'setsid'):
+        # Own process group, so stopping this racer also stops any CBC subprocess
+        os.setsid()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        objective, variables, proven = RACERS[config['backend']](
+            config, time_limit, mip_gap, matchup_matrix
+        )
+
+    results.put({
+        'name': config['name'],
+        'objective': objective,
+        'variables': variables,
+        'proven': proven,
+        'elapsed': time.perf_counter() - start
+    })
+
+
+def stop_racers(processes):
+    """
+    Stop the racers and their solver children. A racer that has not yet called setsid
+    has no process group of its own, so it is terminated directly; one that still has
+    not exited after RACER_STOP_TIMEOUT seconds is killed.
+    """
+    for process in processes.values():
+        if process.is_alive():
+            try:
+                if hasattr(os, 'killpg'):
+                    os.killpg(process.pid, signal.SIGTERM)
+                else:
+                    process.terminate()
+            except ProcessLookupError:
+                process.terminate()
+        process.join(RACER_STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def race_portfolio(time_limit=3600, mip_gap=0.005, matchup_matrix=None, portfolio=None):
+    """
+    Race several solver configurations on one season in separate processes.
+
+    The first racer to prove mip_gap wins and the others are stopped. Otherwise
+    every racer runs to time_limit and the best incumbent wins. Returns the winning
+    objective and its {family: {key: value}} solution, or (None, None).
+    """
+    if portfolio is None:
+        portfolio = default_portfolio()
+
+    print("\nRacing solver portfolio...")
+    print(f"Time limit: {time_limit} seconds")
+    print(f"MIP gap: {mip_gap * 100}%")
+    print(f"Racers: {', '.join(config['name'] for config in portfolio)}")
+
+    results = multiprocessing.Queue()
+    processes = {}
+    for config in portfolio:
+        process = multiprocessing.Process(
+            target=run_racer, args=(config, time_limit, mip_gap, matchup_matrix, results)
+        )
+        process.start()
+        processes[config['name']] = process
+
+    deadline = time.time() + time_limit + RACE_GRACE_PERIOD
+    finished = []
+    winner = None
+    while len(finished) < len(processes) and time.time() < deadline:
+        try:
+            result = results.get(timeout=5)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes.values()):
+                break
+            continue
+        finished.append(result)
+
+        if result['objective'] is None:
+            print(f"{result['name']}: no solution after {result['elapsed']:.1f} s")
+            continue
+        print(f"{result['name']}: {result['objective']:.2f} kg after {result['elapsed']:.1f} s"
+              f"{' (gap proven)' if result['proven'] else ''}")
+        if result['proven']:
+            winner = result
+            break
+
+    stop_racers(processes)
+
+    if winner is None:
+        incumbents = [result for result in finished if result['objective'] is not None]
+        if not incumbents:
+            return None, None
+        winner = min(incumbents, key=lambda result: result['objective'])
+
+    print(f"Portfolio winner: {winner['name']}")
+    return winner['objective'], winner['variables']
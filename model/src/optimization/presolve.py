@@ -0,0 +1,159 @@
+from pulp import LpProblem, LpAffineExpression, LpConstraint, LpConstraintEQ, LpConstraintLE
+
+TOLERANCE = 1e-9
+
+
+def activity_bounds(terms):
+    """Smallest and largest value a row's left-hand side can take under the variable bounds."""
+    low = high = 0.0
+    for var, coef in terms.items():
+        lb = var.lowBound if var.lowBound is not None else float('-inf')
+        ub = var.upBound if var.upBound is not None else float('inf')
+        if coef > 0:
+            low += coef * lb
+            high += coef * ub
+        else:
+            low += coef * ub
+            high += coef * lb
+    return low, high
+
+
+def bound_values(terms, minimize):
+    """Values that push every variable in the row to its minimizing (or maximizing) bound."""
+    values = {}
+    for var, coef in terms.items():
+        at_lower = (coef > 0) == minimize
+        values[var] = var.lowBound if at_lower else var.upBound
+    return values
+
+
+def reduce_row(terms, sense, rhs):
+    """Classify a row as 'drop', 'fix' (with the forced values), 'infeasible' or 'keep'."""
+    if len(terms) == 1 and sense == LpConstraintEQ:
+        (var, coef), = terms.items()
+        return 'fix', {var: rhs / coef}
+
+    low, high = activity_bounds(terms)
+
+    if sense != LpConstraintEQ:
+        if sense == LpConstraintLE:
+            low, high, rhs = -high, -low, -rhs
+        # Row is now "activity >= rhs" in both cases
+        if low >= rhs - TOLERANCE:
+            return 'drop', {}
+        if high < rhs - TOLERANCE:
+            return 'infeasible', {}
+        if abs(high - rhs) <= TOLERANCE:
+            return 'fix', bound_values(terms, minimize=(sense == LpConstraintLE))
+        return 'keep', {}
+
+    if low > rhs + TOLERANCE or high < rhs - TOLERANCE:
+        return 'infeasible', {}
+    if abs(low - rhs) <= TOLERANCE:
+        return 'fix', bound_values(terms, minimize=True)
+    if abs(high - rhs) <= TOLERANCE:
+        return 'fix', bound_values(terms, minimize=False)
+    return 'keep', {}
+
+
+def reduced_objective(objective, fixed):
+    """The objective with the fixed variables substituted into its constant."""
+    terms = {}
+    constant = objective.constant
+    for var, coef in objective.items():
+        if var in fixed:
+            constant += coef * fixed[var]
+        else:
+            terms[var] = coef
+    return LpAffineExpression(terms, constant=constant)
+
+
+def fix_variables(model, values, prefix):
+    """
+    Copy of model with each variable in values ({variable: value}) fixed by a singleton row
+    named prefix_<variable name>, which presolve_model turns into a fixing and removes.
+    """
+    fixed = model.copy()
+    for var, val in values.items():
+        fixed += LpConstraint(
+            LpAffineExpression({var: 1}), sense=LpConstraintEQ, rhs=val, name=f"{prefix}_{var.name}"
+        )
+    return fixed
+
+
+def presolve_model(model):
+    """
+    Remove fixed variables and redundant rows from a PuLP model.
+
+    Singleton equalities (e.g. No_bye_week_*, Y_zero_*) and rows whose activity
+    bounds force every variable to a bound are turned into fixings, which are
+    substituted into the remaining rows and the objective until nothing changes.
+    Returns the reduced problem, a {variable: value} dict of fixings and a report
+    of what was removed.
+    """
+    rows = {}
+    for name, constraint in model.constraints.items():
+        # Terms that cancel (e.g. in the Stadium_share rows) would otherwise be forced to a bound
+        terms = {var: coef for var, coef in constraint.items() if coef}
+        rows[name] = (terms, constraint.sense, -constraint.constant)
+
+    original_nonzeros = sum(len(terms) for terms, _, _ in rows.values())
+    original_variables = len(model.variables())
+    original_rows = len(rows)
+
+    fixed = {}
+    changed = True
+    while changed:
+        changed = False
+        for name in list(rows):
+            terms, sense, rhs = rows[name]
+            for var in [var for var in terms if var.name in fixed]:
+                rhs -= terms.pop(var) * fixed[var.name][1]
+
+            if not terms:
+                satisfied = {
+                    LpConstraintEQ: abs(rhs) <= TOLERANCE,
+                    LpConstraintLE: rhs >= -TOLERANCE,
+                }.get(sense, rhs <= TOLERANCE)
+                if not satisfied:
+                    raise ValueError(f"Presolve found constraint {name} infeasible")
+                del rows[name]
+                continue
+
+            action, values = reduce_row(terms, sense, rhs)
+            if action == 'infeasible':
+                raise ValueError(f"Presolve found constraint {name} infeasible")
+            if action == 'keep':
+                rows[name] = (terms, sense, rhs)
+                continue
+
+            for var, val in values.items():
+                fixed[var.name] = (var, val)
+            del rows[name]
+            changed = True
+
+    reduced = LpProblem(model.name, model.sense)
+    reduced += (
+        reduced_objective(model.objective, {var: val for var, val in fixed.values()}),
+        model.objective.name
+    )
+    for name, (terms, sense, rhs) in rows.items():
+        reduced += LpConstraint(LpAffineExpression(terms), sense=sense, rhs=rhs, name=name)
+
+    report = {
+        'variables': original_variables - len(reduced.variables()),
+        'rows': original_rows - len(rows),
+        'nonzeros': original_nonzeros - sum(len(terms) for terms, _, _ in rows.values()),
+        'fixed': len(fixed)
+    }
+
+    print(f"Presolve removed {report['variables']} variables, {report['rows']} rows "
+          f"and {report['nonzeros']} nonzeros ({report['fixed']} variables fixed)")
+
+    return reduced, {var: val for var, val in fixed.values()}, report
+
+
+def restore_fixed_values(fixed):
+    """Write presolve fixings back onto their variables so value() works after the solve."""
+    for var, val in fixed.items():
+        var.varValue = val
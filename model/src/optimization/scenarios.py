@@ -0,0 +1,150 @@
+import contextlib
+import os
+import time
+
+from pulp import PULP_CBC_CMD, LpStatus, value
+
+import model as model_module
+from model import (
+    build_objective, calculate_total_emissions, create_nfl_schedule_model, extract_schedule,
+    load_all_distances, load_matchup_matrix, precompute_average_paired_savings,
+    precompute_game_emissions, set_initial_schedule
+)
+
+# Module constants of model.py a scenario may override
+SCENARIO_PARAMETERS = ('BUS_EMISSION_RATE', 'PLANE_EMISSION_RATE', 'BUS_ONLY_THRESHOLD')
+
+
+@contextlib.contextmanager
+def scenario_rates(scenario):
+    """Override the emission constants of model.py for the duration of one scenario."""
+    unknown = [key for key in scenario if key != 'name' and key not in SCENARIO_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {unknown}")
+
+    saved = {name: getattr(model_module, name) for name in SCENARIO_PARAMETERS}
+    try:
+        for name in SCENARIO_PARAMETERS:
+            if name in scenario:
+                setattr(model_module, name, scenario[name])
+        yield
+    finally:
+        for name, rate in saved.items():
+            setattr(model_module, name, rate)
+
+
+def scenario_name(scenario):
+    if 'name' in scenario:
+        return scenario['name']
+    overrides = [f"{key}={scenario[key]}" for key in SCENARIO_PARAMETERS if key in scenario]
+    return ', '.join(overrides) or 'baseline'
+
+
+def sweep_season(scenarios, matchup_matrix=None, time_limit=600, mip_gap=0.005,
+                 presolve=True, warm_start=None):
+    """
+    Solve one season under several emission scenarios, e.g.
+    [{'BUS_EMISSION_RATE': 3.5}, {'BUS_ONLY_THRESHOLD': 700}].
+
+    The model is built, presolved and given its data once. Each scenario recomputes the
+    game emissions and average paired savings with its constants and swaps in the new
+    objective, then solves from the previous scenario's schedule (the first from
+    warm_start, a schedule CSV or 'heuristic', if given). Emissions are reported under
+    the scenario's own constants. Returns one result dict per scenario.
+    """
+    if matchup_matrix is None:
+        matchup_matrix = load_matchup_matrix()
+    model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+    distances = load_all_distances()
+
+    solve_model, fixed = model, {}
+    if presolve:
+        from presolve import presolve_model, reduced_objective, restore_fixed_values
+        solve_model, fixed, _ = presolve_model(model)
+
+    use_warm_start = False
+    if warm_start is not None:
+        use_warm_start = set_initial_schedule(model, variables, warm_start, matchup_matrix)
+
+    results = []
+    for scenario in scenarios:
+        name = scenario_name(scenario)
+        print(f"\nScenario: {name}")
+        with scenario_rates(scenario):
+            game_emissions = precompute_game_emissions(distances, matchup_matrix)
+            avg_paired_savings = precompute_average_paired_savings(distances, matchup_matrix)
+            model.setObjective(build_objective(variables, game_emissions, avg_paired_savings))
+            if fixed:
+                solve_model.setObjective(reduced_objective(model.objective, fixed))
+
+            start = time.perf_counter()
+            solve_model.solve(PULP_CBC_CMD(
+                timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=use_warm_start
+            ))
+            solve_time = time.perf_counter() - start
+            status = LpStatus[solve_model.status]
+
+            result = {'scenario': name, 'status': status, 'solve_time': solve_time,
+                      'objective': None, 'total_emissions': None, 'paired_trips': None}
+            if solve_model.status == 1:
+                if fixed:
+                    restore_fixed_values(fixed)
+                result['objective'] = value(model.objective)
+                result['total_emissions'], result['paired_trips'] = calculate_total_emissions(
+                    extract_schedule(variables), distances
+                )
+                for var in model.variables():
+                    var.setInitialValue(var.varValue)
+                use_warm_start = True
+
+        print(f"{status} in {solve_time:.1f} s")
+        results.append(result)
+
+    return results
+
+
+def print_sweep(results):
+    print(f"{'Scenario':<40} {'Emissions (kg)':>15} {'Paired':>7} {'Solve (s)':>10} Status")
+    for result in results:
+        emissions = result['total_emissions']
+        emissions = f"{emissions:.2f}" if emissions is not None else '-'
+        paired = result['paired_trips'] if result['paired_trips'] is not None else '-'
+        print(f"{result['scenario']:<40} {emissions:>15} {paired:>7} "
+              f"{result['solve_time']:>10.1f} {result['status']}")
+
+
+def sweep_scenarios(scenarios, years=None, time_limit=600, mip_gap=0.005, presolve=True,
+                    warm_start=None):
+    """
+    Run sweep_season for each year's generated matchups and print a table per season.
+    warm_start is 'heuristic' or a schedule CSV path with a {year} placeholder.
+    """
+    from matchups import generate_matchups
+
+    if years is None:
+        years = list(range(2021, 2027))
+
+    results = {}
+    for year in years:
+        print(f"\n{'='*60}")
+        print(f"Scenario sweep for the {year} NFL Season")
+        print(f"{'='*60}")
+        generate_matchups(year=year)
+
+        season_warm_start = warm_start
+        if warm_start is not None and warm_start != 'heuristic':
+            season_warm_start = warm_start.format(year=year)
+            if not os.path.exists(season_warm_start):
+                print(f"No warm start schedule at {season_warm_start}")
+                season_warm_start = None
+
+        results[year] = sweep_season(
+            scenarios, time_limit=time_limit, mip_gap=mip_gap, presolve=presolve,
+            warm_start=season_warm_start
+        )
+
+    for year, season_results in results.items():
+        print(f"\n{year}")
+        print_sweep(season_results)
+
+    return results
@@ -0,0 +1,195 @@
+import contextlib
+import io
+import time
+
+import highspy
+import numpy as np
+from pulp import PULP_CBC_CMD, LpStatus, value
+
+import model as model_module
+from model import (
+    build_objective, create_nfl_schedule_model, load_all_distances, load_schedule_from_csv,
+    matchup_matrix_from_schedule, precompute_average_paired_savings, precompute_game_emissions
+)
+
+# Families fixed at the incumbent for the LP that stands in for CBC's final node
+PATTERN_FAMILIES = ('h', 'a', 'bye')
+
+
+def pattern_lp_sensitivity(schedule):
+    """
+    Reduced costs and objective ranging of every x variable, from the LP relaxation with
+    the incumbent's home/away/bye pattern fixed. PuLP cannot read CBC's final node, so
+    fixing the pattern the branching settled stands in for it, leaving the LP free to
+    move opponents and slots. Returns {x key: dict(cost, value, reduced_cost, cost_down,
+    cost_up)}, where the optimal basis holds while the cost stays within [down, up].
+    """
+    from highs_backend import build_sparse_model, to_highs_lp
+    from warm_start import games_from_schedule, schedule_values
+
+    matchup_matrix = matchup_matrix_from_schedule(schedule)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sparse, columns, _ = build_sparse_model(matchup_matrix)
+
+    values = schedule_values(games_from_schedule(schedule))
+    for family in PATTERN_FAMILIES:
+        for key, col in columns[family].items():
+            sparse['col_lower'][col] = sparse['col_upper'][col] = values[family].get(key, 0)
+
+    lp = to_highs_lp(sparse)
+    lp.integrality_ = []
+    highs = highspy.Highs()
+    highs.setOptionValue('output_flag', False)
+    highs.passModel(lp)
+    highs.run()
+    if highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        raise RuntimeError(f"Pattern LP is {highs.modelStatusToString(highs.getModelStatus())}")
+
+    solution = highs.getSolution()
+    col_value = np.asarray(solution.col_value)
+    col_dual = np.asarray(solution.col_dual)
+    _, ranging = highs.getRanging()
+    cost_down = np.asarray(ranging.col_cost_dn.value_)
+    cost_up = np.asarray(ranging.col_cost_up.value_)
+
+    return {
+        key: {
+            'cost': sparse['cost'][col], 'value': col_value[col], 'reduced_cost': col_dual[col],
+            'cost_down': cost_down[col], 'cost_up': cost_up[col]
+        }
+        for key, col in columns['x'].items()
+    }
+
+
+def venue_margins(sensitivity, games):
+    """
+    Rank each (away, home) venue by how small a relative change in its game cost would
+    change the LP's schedule. A venue the incumbent plays can rise until its x leaves the
+    LP solution; an unplayed one must fall by its smallest reduced cost. The pattern LP is
+    degenerate, so many margins are zero; ties go to the costlier venue, whose distance
+    changes move emissions most.
+    """
+    played = {(game['away'], game['home'], game['week'], game['slot']) for game in games}
+    venues = {}
+    for key, row in sensitivity.items():
+        venue = venues.setdefault(key[:2], {'played': False, 'cost': row['cost'], 'margin': np.inf})
+        if key in played:
+            venue['played'] = True
+            venue['margin'] = max(row['cost_up'] - row['cost'], 0) if row['value'] > 0.5 else 0
+        elif not venue['played']:
+            venue['margin'] = min(venue['margin'], max(row['reduced_cost'], 0))
+
+    ranked = []
+    for (i, j), venue in venues.items():
+        relative = venue['margin'] / venue['cost'] if venue['cost'] > 0 else np.inf
+        ranked.append({'away': model_module.TEAMS[i], 'home': model_module.TEAMS[j],
+                       'played': venue['played'], 'cost': float(venue['cost']),
+                       'margin': float(venue['margin']), 'relative': float(relative)})
+    ranked.sort(key=lambda venue: (venue['relative'], -venue['cost']))
+    return ranked
+
+
+def perturb_distances(distances, team, factor, matrices=None):
+    """
+    Copy of distances with the team's row of each matrix scaled by factor: its own
+    entries and its trips to every other team, as when it moves facility or airport.
+    """
+    perturbed = {}
+    for name, matrix in distances.items():
+        if matrices is not None and name not in matrices:
+            perturbed[name] = matrix
+            continue
+        perturbed[name] = {
+            key: dist * factor if (key == team or isinstance(key, tuple) and key[0] == team)
+            else dist
+            for key, dist in matrix.items()
+        }
+    return perturbed
+
+
+def perturbation_estimate(model, variables, matchup_matrix, games, distances, team, factor,
+                          matrices=None, time_limit=60):
+    """
+    Estimate the optimal objective after scaling one team's distance row, by re-solving
+    with every x of games without that team fixed at the incumbent. The team's games can
+    then only flip venue, change slot or move into an opponent's bye week, so this is
+    an upper bound on the new optimum and a cheap stand-in for a full re-solve.
+    Returns (incumbent objective before, incumbent objective after, re-solved objective).
+    """
+    from presolve import fix_variables, presolve_model, restore_fixed_values
+    from warm_start import apply_warm_start, schedule_values
+
+    apply_warm_start(variables, games)
+    before = value(model.objective)
+
+    perturbed = perturb_distances(distances, team, factor, matrices)
+    model.setObjective(build_objective(
+        variables,
+        precompute_game_emissions(perturbed, matchup_matrix),
+        precompute_average_paired_savings(perturbed, matchup_matrix)
+    ))
+    after = value(model.objective)
+
+    values = schedule_values(games)
+    frozen = {var: values['x'].get(key, 0) for key, var in variables['x'].items()
+              if team not in key[:2]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        solve_model, fixed, _ = presolve_model(fix_variables(model, frozen, "Incumbent"))
+    solve_model.solve(PULP_CBC_CMD(timeLimit=time_limit, msg=False, warmStart=True))
+    if solve_model.status != 1:
+        raise RuntimeError(
+            f"Local re-solve for {model_module.TEAMS[team]} is {LpStatus[solve_model.status]}"
+        )
+    restore_fixed_values(fixed)
+    return before, after, value(model.objective)
+
+
+def sensitivity_report(schedule_path, factor=1.1, matrices=None, top=10, time_limit=60):
+    """
+    Sensitivity of a solved season (a save_schedule_to_csv file) to distance changes.
+    Prints the top venues by LP cost margin and, for every team, the estimated change in
+    the optimal objective if its distance row were scaled by factor. Returns both lists.
+    """
+    from warm_start import games_from_schedule
+
+    schedule = load_schedule_from_csv(schedule_path)
+    matchup_matrix = matchup_matrix_from_schedule(schedule)
+    games = games_from_schedule(schedule)
+
+    start = time.perf_counter()
+    venues = venue_margins(pattern_lp_sensitivity(schedule), games)
+    print(f"Pattern LP sensitivity ({time.perf_counter() - start:.1f} s)")
+    print(f"\n{'Away':<24} {'Home':<24} {'Played':>6} {'Cost (kg)':>12} {'Margin':>8}")
+    for venue in venues[:top]:
+        print(f"{venue['away']:<24} {venue['home']:<24} {str(venue['played']):>6} "
+              f"{venue['cost']:>12.2f} {venue['relative'] * 100:>7.2f}%")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, variables, matchup_matrix = create_nfl_schedule_model(matchup_matrix)
+    base_objective = model.objective
+    distances = load_all_distances()
+
+    estimates = []
+    for team in range(model_module.NUM_TEAMS):
+        start = time.perf_counter()
+        before, after, resolved = perturbation_estimate(
+            model, variables, matchup_matrix, games, distances, team, factor, matrices,
+            time_limit
+        )
+        model.setObjective(base_objective)
+        estimates.append({
+            'team': model_module.TEAMS[team], 'before': before, 'incumbent_after': after,
+            'resolved': resolved, 'change': resolved - before,
+            'seconds': time.perf_counter() - start
+        })
+    estimates.sort(key=lambda estimate: -abs(estimate['change']))
+
+    print(f"\nDistance row scaled by {factor}:")
+    print(f"{'Team':<24} {'Incumbent (kg)':>15} {'Re-solved (kg)':>15} {'Change (kg)':>12} "
+          f"{'Time (s)':>9}")
+    for estimate in estimates:
+        print(f"{estimate['team']:<24} {estimate['incumbent_after']:>15.2f} "
+              f"{estimate['resolved']:>15.2f} {estimate['change']:>12.2f} "
+              f"{estimate['seconds']:>9.1f}")
+
+    return venues, estimates
@@ -0,0 +1,314 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import re
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+from pulp import PULP_CBC_CMD, LpBinary, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+
+import model as model_module
+from model import DISTANCE_FILES
+
+# Stadiums are placed uniformly in this (latitude, longitude) box, roughly the lower 48
+LEAGUE_BOUNDS = ((25.0, 49.0), (-124.0, -67.0))
+
+# A team's training facility lies within FACILITY_RADIUS km of its stadium, and its
+# airport between AIRPORT_RADIUS[0] and AIRPORT_RADIUS[1] km away
+FACILITY_RADIUS = 25.0
+AIRPORT_RADIUS = (8.0, 40.0)
+
+# Road distance as a multiple of the great-circle distance
+ROAD_FACTOR = 1.25
+
+EARTH_RADIUS_KM = 6371.0
+
+# Leagues of the default scaling study, as synthetic_league keyword arguments
+SCALING_LEAGUES = [
+    {'name': '32 teams', 'num_teams': 32},
+    {'name': '34 teams', 'num_teams': 34},
+    {'name': '36 teams', 'num_teams': 36},
+    {'name': '40 teams', 'num_teams': 40},
+    {'name': '19 weeks', 'num_teams': 32, 'num_weeks': 19}
+]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between points given in degrees; works on arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def offset_points(lat, lon, min_km, max_km, rng):
+    """Points at a random bearing and a random distance in [min_km, max_km] from each point."""
+    distance = rng.uniform(min_km, max_km, len(lat)) / EARTH_RADIUS_KM
+    bearing = rng.uniform(0, 2 * np.pi, len(lat))
+    return (
+        lat + np.degrees(distance * np.cos(bearing)),
+        lon + np.degrees(distance * np.sin(bearing) / np.cos(np.radians(lat)))
+    )
+
+
+def random_geography(num_teams, rng):
+    """Random stadium, facility and airport coordinates, as (lat, lon) arrays per site."""
+    (lat_min, lat_max), (lon_min, lon_max) = LEAGUE_BOUNDS
+    stadium = (rng.uniform(lat_min, lat_max, num_teams), rng.uniform(lon_min, lon_max, num_teams))
+    return {
+        'stadium': stadium,
+        'facility': offset_points(*stadium, 0, FACILITY_RADIUS, rng),
+        'airport': offset_points(*stadium, *AIRPORT_RADIUS, rng)
+    }
+
+
+def league_distances(geography):
+    """The five load_all_distances matrices of a geography, keyed by team index."""
+    stadium, facility, airport = geography['stadium'], geography['facility'], geography['airport']
+    num_teams = len(stadium[0])
+
+    def pairwise(origin, destination):
+        return haversine_km(origin[0][:, None], origin[1][:, None],
+                            destination[0][None, :], destination[1][None, :])
+
+    def by_team(km):
+        return {i: float(km[i]) for i in range(num_teams)}
+
+    def by_pair(km):
+        return {(i, j): float(km[i, j]) for i in range(num_teams) for j in range(num_teams)}
+
+    return {
+        'facility_to_stadium': by_team(ROAD_FACTOR * haversine_km(*facility, *stadium)),
+        'facility_to_airport': by_team(ROAD_FACTOR * haversine_km(*facility, *airport)),
+        'stadium_to_airport': by_team(ROAD_FACTOR * haversine_km(*stadium, *airport)),
+        'facility_to_away_stadium': by_pair(ROAD_FACTOR * pairwise(facility, stadium)),
+        'airport_to_airport': by_pair(pairwise(airport, airport))
+    }
+
+
+def regional_divisions(geography, num_divisions):
+    """
+    Split the teams into num_divisions divisions of near-equal size by stadium longitude,
+    so divisions are regional like the NFL's. Returns {division name: [team indices]}.
+    """
+    order = np.argsort(geography['stadium'][1])
+    return {
+        f"DIV_{k + 1}": sorted(int(i) for i in teams)
+        for k, teams in enumerate(np.array_split(order, num_divisions))
+    }
+
+
+def league_matchups(num_teams, divisions, num_games, rng):
+    """
+    Random matchup matrix in which every team plays num_games games: home and away
+    against each division rival (2 in the matrix) and once against enough teams from
+    other divisions (1) to fill the season. The single games are a random regular graph,
+    found as a small assignment MIP with a random objective.
+    """
+    division_of = {i: name for name, teams in divisions.items() for i in teams}
+    single_games = {}
+    for name, teams in divisions.items():
+        needed = num_games - 2 * (len(teams) - 1)
+        if needed < 0:
+            raise ValueError(f"{len(teams)} teams in {name} need more than {num_games} games")
+        single_games.update((i, needed) for i in teams)
+
+    model = LpProblem("Synthetic_matchups", LpMinimize)
+    pairs = [(i, j) for i in range(num_teams) for j in range(i + 1, num_teams)
+             if division_of[i] != division_of[j]]
+    e = {pair: LpVariable(f"e_{pair[0]}_{pair[1]}", cat=LpBinary) for pair in pairs}
+    model += lpSum(rng.random() * var for var in e.values())
+    for i in range(num_teams):
+        model += (
+            lpSum(var for (a, b), var in e.items() if i in (a, b)) == single_games[i],
+            f"Games_{i}"
+        )
+    model.solve(PULP_CBC_CMD(msg=False))
+    if model.status != 1:
+        raise ValueError(f"No matchups with {num_games} games per team: {LpStatus[model.status]}")
+
+    matrix = {(i, j): 0 for i in range(num_teams) for j in range(num_teams)}
+    for teams in divisions.values():
+        for i in teams:
+            for j in teams:
+                if i != j:
+                    matrix[(i, j)] = 2
+    for (i, j), var in e.items():
+        if var.varValue > 0.5:
+            matrix[(i, j)] = matrix[(j, i)] = 1
+    return matrix
+
+
+def synthetic_league(name=None, num_teams=32, num_divisions=8, num_weeks=18, num_slots=3,
+                     bye_weeks=None, seed=0):
+    """
+    Random league in the shape of model.py's constants: num_teams teams in num_divisions
+    regional divisions, a num_weeks season with one bye per team (in weeks bye_weeks,
+    default 5 to num_weeks - 4, 1-based) and num_slots slots per week. Slot 0 is
+    Thursday, 1 Sunday and 2 Monday; further slots are unconstrained. Returns a dict with
+    the model constants, the matchup matrix and the distance matrices.
+    """
+    if num_teams % 2:
+        raise ValueError("A league needs an even number of teams")
+    if bye_weeks is None:
+        bye_weeks = (5, num_weeks - 4)
+
+    rng = np.random.default_rng(seed)
+    geography = random_geography(num_teams, rng)
+    divisions = regional_divisions(geography, num_divisions)
+    return {
+        'name': name or f"{num_teams} teams, {num_weeks} weeks",
+        'constants': {
+            'NUM_TEAMS': num_teams, 'NUM_WEEKS': num_weeks, 'NUM_SLOTS': num_slots,
+            'GAMES_PER_WEEK': num_teams // 2, 'BYE_WEEK_START': bye_weeks[0],
+            'BYE_WEEK_END': bye_weeks[1],
+            'TEAMS': [f"Team {i + 1:02d}" for i in range(num_teams)],
+            'STADIUM_SHARING_PAIRS': [], 'DIVISIONS': divisions
+        },
+        'matchup_matrix': league_matchups(num_teams, divisions, num_weeks - 1, rng),
+        'distances': league_distances(geography)
+    }
+
+
+def get_league_dir(name):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+    return os.path.join(script_dir, "../../output/synthetic", slug)
+
+
+def write_league(league, data_dir=None):
+    """
+    Write a league's distance matrices and matchup matrix under data_dir (default
+    output/synthetic/<name>/) in the layout of model/data/. Returns data_dir.
+    """
+    if data_dir is None:
+        data_dir = get_league_dir(league['name'])
+    teams = league['constants']['TEAMS']
+    os.makedirs(os.path.join(data_dir, "distances"), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, "matchups"), exist_ok=True)
+
+    pair_columns = {'facility_to_away_stadium': ('away_team', 'home_team'),
+                    'airport_to_airport': ('team_i', 'team_j')}
+    for key, filename in DISTANCE_FILES.items():
+        matrix = league['distances'][key]
+        if key in pair_columns:
+            rows = [{pair_columns[key][0]: teams[i], pair_columns[key][1]: teams[j],
+                     'distance_km': dist} for (i, j), dist in matrix.items()]
+        else:
+            rows = [{'team': teams[i], 'distance_km': dist} for i, dist in matrix.items()]
+        pd.DataFrame(rows).to_csv(os.path.join(data_dir, "distances", filename), index=False)
+
+    matrix = pd.DataFrame(0, index=teams, columns=teams)
+    for (i, j), games in league['matchup_matrix'].items():
+        matrix.iloc[i, j] = games
+    matrix.to_csv(os.path.join(data_dir, "matchups", "matrix_m.csv"))
+    return data_dir
+
+
+@contextlib.contextmanager
+def league_constants(league, data_dir):
+    """
+    Point model.py's league constants and DATA_DIR at a written synthetic league for the
+    duration of the block. Every builder, backend and heuristic reads them from the model
+    module at call time, so all of them follow.
+    """
+    overrides = dict(league['constants'])
+    overrides['TEAM_IDX'] = {team: i for i, team in enumerate(overrides['TEAMS'])}
+    overrides['DATA_DIR'] = data_dir
+
+    saved = {name: getattr(model_module, name) for name in overrides}
+    try:
+        for name, constant in overrides.items():
+            setattr(model_module, name, constant)
+        yield
+    finally:
+        for name, constant in saved.items():
+            setattr(model_module, name, constant)
+
+
+def run_league(settings, time_limit, mip_gap, warm_start, queue):
+    """
+    Generate, write, build and solve one league in a fresh process; report its sizes and
+    times.
+    """
+    start = time.perf_counter()
+    league = synthetic_league(**settings)
+    generate_time = time.perf_counter() - start
+    data_dir = write_league(league)
+
+    with league_constants(league, data_dir), contextlib.redirect_stdout(io.StringIO()):
+        matchup_matrix = model_module.load_matchup_matrix()
+        start = time.perf_counter()
+        model, variables, _ = model_module.create_nfl_schedule_model(matchup_matrix)
+        build_time = time.perf_counter() - start
+        python_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        solve_time, status = 0, '-'
+        if time_limit:
+            use_warm_start = warm_start and model_module.set_initial_schedule(
+                model, variables, 'heuristic', matchup_matrix
+            )
+            start = time.perf_counter()
+            model.solve(PULP_CBC_CMD(
+                timeLimit=time_limit, gapRel=mip_gap, msg=False, warmStart=use_warm_start
+            ))
+            solve_time = time.perf_counter() - start
+            status = LpStatus[model.status]
+
+    queue.put({
+        'name': league['name'],
+        'teams': league['constants']['NUM_TEAMS'],
+        'weeks': league['constants']['NUM_WEEKS'],
+        'columns': model.numVariables(),
+        'rows': model.numConstraints(),
+        'generate_time': generate_time,
+        'build_time': build_time,
+        'python_rss_mb': python_rss,
+        'solve_time': solve_time,
+        'child_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        'status': status
+    })
+
+
+def scaling_study(leagues=None, time_limit=600, mip_gap=0.005, warm_start=True):
+    """
+    Build and solve the slot model on synthetic leagues of growing size (default
+    SCALING_LEAGUES) and print model size, build time, peak memory and time to mip_gap.
+    Each league runs in its own spawned process, so peak RSS is per league and modules
+    imported during the run see the league's constants; its data is kept under
+    output/synthetic/. warm_start seeds CBC with the constructive heuristic; time_limit=0
+    only builds the models.
+    """
+    if leagues is None:
+        leagues = SCALING_LEAGUES
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for settings in leagues:
+        queue = context.Queue()
+        process = context.Process(target=run_league,
+                                  args=(settings, time_limit, mip_gap, warm_start, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0 or queue.empty():
+            print(f"{settings}: scaling process failed (exit code {process.exitcode})")
+            continue
+        results.append(queue.get())
+        print(f"{results[-1]['name']}: built in {results[-1]['build_time']:.1f} s, "
+              f"{results[-1]['status']} in {results[-1]['solve_time']:.1f} s")
+
+    print(f"\n{'League':<20} {'Teams':>5} {'Weeks':>5} {'Columns':>8} {'Rows':>7} "
+          f"{'Build (s)':>10} {'Python RSS':>11} {'Solver RSS':>11} {'Solve (s)':>10} Status")
+    for row in results:
+        print(f"{row['name']:<20} {row['teams']:>5} {row['weeks']:>5} {row['columns']:>8} "
+              f"{row['rows']:>7} {row['build_time']:>10.2f} {row['python_rss_mb']:>8.0f} MB "
+              f"{row['child_rss_mb']:>8.0f} MB {row['solve_time']:>10.1f} {row['status']}")
+
+    return results
+
+
+if __name__ == "__main__":
+    scaling_study()
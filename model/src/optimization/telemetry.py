@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import select
+import signal
+import threading
+import time
+
+from pulp import PULP_CBC_CMD
+
+# Seconds between reads of the CBC log while it solves
+POLL_INTERVAL = 0.5
+
+# CBC reports no incumbent as a best solution of 1e50
+NO_SOLUTION = 1e50
+
+NUMBER = r"(-?[\d.]+(?:e[+-]?\d+)?)"
+CONTINUOUS_LINE = re.compile(rf"Continuous objective value is {NUMBER} - ([\d.]+) seconds")
+NODE_LINE = re.compile(
+    rf"Cbc0010I After (\d+) nodes, \d+ on tree, {NUMBER} best solution, "
+    rf"best possible {NUMBER} \(([\d.]+) seconds\)"
+)
+SOLUTION_LINE = re.compile(
+    rf"Cbc00(?:04|12)I Integer solution of {NUMBER} found.* and (\d+) nodes \(([\d.]+) seconds\)"
+)
+
+# Summary CBC prints on exit, closed by the wallclock time
+RESULT_LINE = re.compile(r"Result - (.*)")
+FINAL_LINES = {
+    'incumbent': re.compile(rf"Objective value:\s+{NUMBER}"),
+    'bound': re.compile(rf"Lower bound:\s+{NUMBER}"),
+    'nodes': re.compile(r"Enumerated nodes:\s+(\d+)")
+}
+WALLCLOCK_LINE = re.compile(r"Time \(Wallclock seconds\):\s+([\d.]+)")
+
+
+def parse_final_line(line, state):
+    """
+    Update state from a line of the summary CBC prints on exit. Returns the 'final' event
+    on the wallclock line that closes it, else None. A proven optimum reports no lower
+    bound, so its bound is the incumbent; without a feasible solution there is none.
+    """
+    result = RESULT_LINE.match(line)
+    if result:
+        state['result'] = result[1]
+        return None
+    if 'result' not in state:
+        return None
+    if line.startswith('No feasible solution found'):
+        state['incumbent'] = None
+    for key, pattern in FINAL_LINES.items():
+        found = pattern.match(line)
+        if found:
+            state[key] = int(found[1]) if key == 'nodes' else float(found[1])
+    if state['result'] == 'Optimal solution found':
+        state['bound'] = state.get('incumbent')
+    wallclock = WALLCLOCK_LINE.match(line)
+    if wallclock:
+        state['elapsed'] = float(wallclock[1])
+        return 'final'
+    return None
+
+
+def parse_cbc_line(line, state):
+    """
+    Update state (incumbent, bound, nodes, elapsed) from one CBC log line. Returns a
+    telemetry record if the line reported progress or closed the exit summary, else None.
+    """
+    continuous = CONTINUOUS_LINE.search(line)
+    nodes = NODE_LINE.search(line)
+    solution = SOLUTION_LINE.search(line)
+    final = parse_final_line(line, state)
+    if final:
+        event = final
+    elif continuous:
+        state['bound'], state['elapsed'] = float(continuous[1]), float(continuous[2])
+        event = 'root'
+    elif nodes:
+        state['nodes'], state['bound'], state['elapsed'] = (
+            int(nodes[1]), float(nodes[3]), float(nodes[4])
+        )
+        if float(nodes[2]) < NO_SOLUTION:
+            state['incumbent'] = float(nodes[2])
+        event = 'nodes'
+    elif solution:
+        state['incumbent'], state['nodes'], state['elapsed'] = (
+            float(solution[1]), int(solution[2]), float(solution[3])
+        )
+        event = 'solution'
+    else:
+        return None
+
+    incumbent, bound = state.get('incumbent'), state.get('bound')
+    gap = None
+    if incumbent is not None and bound is not None:
+        gap = (incumbent - bound) / max(abs(incumbent), 1e-9)
+    return {
+        'event': event, 'elapsed': state['elapsed'], 'incumbent': incumbent, 'bound': bound,
+        'gap': gap, 'nodes': state.get('nodes', 0)
+    }
+
+
+def check_platform(stagnation):
+    """
+    Raise RuntimeError where the log cannot be streamed: the log needs a pseudo-terminal,
+    and stopping on stagnation finds CBC in /proc, as PuLP does not expose its process.
+    """
+    if not hasattr(os, 'openpty'):
+        raise RuntimeError("CBC telemetry needs a pseudo-terminal (os.openpty), which this "
+                           "platform does not provide")
+    if stagnation is not None and not os.path.isdir('/proc'):
+        raise RuntimeError("Stopping CBC on stagnation finds its process in /proc, which this "
+                           "platform does not provide; solve without stagnation")
+
+
+def cbc_pid():
+    """Process id of the CBC child of this process, read from /proc (see check_platform)."""
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        name = stat[stat.index('(') + 1:stat.rindex(')')]
+        parent = int(stat[stat.rindex(')') + 2:].split()[1])
+        if parent == os.getpid() and name.startswith('cbc'):
+            return int(pid)
+    return None
+
+
+def read_lines(master, done):
+    """Yield the lines written to a pseudo-terminal until done is set and it is drained."""
+    pending = b''
+    while True:
+        finished = done.is_set()
+        ready, _, _ = select.select([master], [], [], POLL_INTERVAL)
+        if not ready:
+            if finished:
+                break
+            continue
+        try:
+            chunk = os.read(master, 65536)
+        except OSError:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            yield line.decode(errors='replace').rstrip('\r')
+    if pending:
+        yield pending.decode(errors='replace').rstrip('\r')
+
+
+def follow_log(master, done, telemetry_path, offset, stagnation, msg, result):
+    """
+    Read the CBC log until done is set: echo it, append each progress record to
+    telemetry_path (if given) with elapsed shifted by offset, and interrupt CBC once the
+    incumbent has stagnated, setting result['stopped']. CBC stops on SIGINT as it does at
+    its time limit, keeping its incumbent.
+    """
+    state = {}
+    best, improved_at = None, None
+    out = open(telemetry_path, 'a') if telemetry_path is not None else None
+    for line in read_lines(master, done):
+        if msg:
+            print(line)
+
+        record = parse_cbc_line(line, state)
+        if record is None:
+            continue
+        record['elapsed'] += offset
+        if record['event'] == 'final':
+            record['stopped'] = result['stopped']
+        if out is not None:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+        if (stagnation is None or result['stopped'] or record['incumbent'] is None
+                or record['event'] == 'final'):
+            continue
+        min_improvement, window = stagnation
+        if best is None or record['incumbent'] < best - min_improvement * abs(best):
+            best, improved_at = record['incumbent'], time.perf_counter()
+        elif time.perf_counter() - improved_at > window:
+            pid = cbc_pid()
+            if pid is not None:
+                print(f"\nIncumbent improved less than {min_improvement * 100}% in "
+                      f"{window} s; stopping CBC")
+                os.kill(pid, signal.SIGINT)
+                result['stopped'] = True
+    if out is not None:
+        out.close()
+
+
+def solve_with_telemetry(model, telemetry_path=None, stagnation=None, offset=0, msg=True,
+                         **options):
+    """
+    Solve model with PULP_CBC_CMD(**options) while parsing its log into JSON lines at
+    telemetry_path: one record per root bound, node report and new incumbent, and a 'final'
+    one from CBC's exit summary (also saying whether stagnation stopped it), with elapsed
+    seconds, incumbent, bound, relative gap and node count. stagnation=(fraction, seconds)
+    stops CBC once the incumbent has not improved by that fraction in that many seconds
+    (checked as the log reports progress). offset is added to elapsed, so the rounds of
+    one solve share a time axis. Returns True if the stagnation rule stopped CBC.
+
+    The log goes to a pseudo-terminal rather than a file, because CBC only flushes its
+    output line by line to a terminal. Raises RuntimeError on platforms without one, or
+    without /proc when stagnation is given.
+    """
+    check_platform(stagnation)
+    master, slave = os.openpty()
+    done = threading.Event()
+    result = {'stopped': False}
+    follower = threading.Thread(
+        target=follow_log, args=(master, done, telemetry_path, offset, stagnation, msg, result)
+    )
+    follower.start()
+    try:
+        model.solve(PULP_CBC_CMD(msg=False, logPath=os.ttyname(slave), **options))
+    finally:
+        done.set()
+        follower.join()
+        os.close(slave)
+        os.close(master)
+    return result['stopped']
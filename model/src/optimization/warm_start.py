@@ -0,0 +1,449 @@
+import math
+import random
+
+import pandas as pd
+
+import model as model_module
+from model import load_schedule_from_csv
+
+SLOT_IDX = {'Thursday': 0, 'Sunday': 1, 'Monday': 2}
+
+# Week repair penalties; a team playing twice in a week or a bye outside the bye
+# window outweighs the home/away streak, division rematch and stadium rules
+CLASH_PENALTY = 10
+BYE_PENALTY = 10
+
+# Annealing schedule of the week repair: starting temperature and cooling per iteration
+REPAIR_TEMPERATURE = 2.0
+REPAIR_COOLING = 0.9995
+
+
+def load_schedule_games(filepath):
+    """
+    Read a schedule CSV as a list of games {'home', 'away', 'week', 'slot'}.
+
+    Accepts the files written by save_schedule_to_csv and the season/home_team/away_team
+    files in actual/schedules/. Teams are indices; week and slot are 0-based and None
+    where the file has no week or slot data.
+    """
+    df = pd.read_csv(filepath)
+
+    games = []
+    if 'home_team' in df.columns:
+        for _, row in df.iterrows():
+            games.append({
+                'home': model_module.TEAM_IDX[row['home_team']],
+                'away': model_module.TEAM_IDX[row['away_team']],
+                'week': None, 'slot': None
+            })
+    else:
+        games = games_from_schedule(load_schedule_from_csv(filepath))
+
+    return games
+
+
+def games_from_schedule(schedule):
+    """List the games of a schedule in the per-team layout of extract_schedule."""
+    games = []
+    for team, team_games in schedule.items():
+        for game in team_games:
+            if game['home_away'] == 'Home':
+                games.append({
+                    'home': model_module.TEAM_IDX[team], 'away': model_module.TEAM_IDX[game['opponent']],
+                    'week': int(game['week']) - 1, 'slot': SLOT_IDX.get(game['slot'])
+                })
+    return games
+
+
+def matches_matchup_matrix(games, matchup_matrix):
+    """Check that the games are exactly the season's matchups, with home-and-away for repeats."""
+    counts = {}
+    for game in games:
+        counts[(game['away'], game['home'])] = counts.get((game['away'], game['home']), 0) + 1
+
+    for i in range(model_module.NUM_TEAMS):
+        for j in range(i + 1, model_module.NUM_TEAMS):
+            matchup_value = matchup_matrix.get((i, j), 0)
+            ij, ji = counts.get((i, j), 0), counts.get((j, i), 0)
+            if ij + ji != matchup_value or (matchup_value == 2 and ij != 1):
+                return False
+
+    return True
+
+
+def team_penalty(team, team_week, home, away, blocked=(), byes=None):
+    """
+    Week-level rule violations in one team's season; blocked holds (team, week) pairs it
+    cannot host, and byes (if given) maps teams to the week they must have their bye in.
+    """
+    penalty = 0
+    home_games = []
+    away_games = []
+    previous_opponents = []
+    for w, week_games in enumerate(team_week[team]):
+        played = len(week_games)
+        if played > 1:
+            penalty += CLASH_PENALTY * (played - 1)
+        elif played == 0 and not model_module.BYE_WEEK_START - 1 <= w <= model_module.BYE_WEEK_END - 1:
+            penalty += BYE_PENALTY
+        if played and byes is not None and byes.get(team) == w:
+            penalty += BYE_PENALTY
+
+        hosted = 0
+        opponents = []
+        for g in week_games:
+            if home[g] == team:
+                hosted += 1
+                opponents.append(away[g])
+            else:
+                opponents.append(home[g])
+        home_games.append(hosted)
+        away_games.append(played - hosted)
+        if hosted and (team, w) in blocked:
+            penalty += CLASH_PENALTY
+
+        if w >= 3:
+            penalty += max(0, sum(home_games[w - 3:]) - 3) + max(0, sum(away_games[w - 3:]) - 3)
+
+        # Only division opponents meet twice, so this is the No_consec_div rule
+        for opponent in opponents:
+            if opponent in previous_opponents:
+                penalty += 1
+        previous_opponents = opponents
+
+    return penalty
+
+
+def sharing_penalty(team_week, home, pairs):
+    """
+    Weeks in which both stadium-sharing pairs have both teams at home.
+
+    One such pair a week can be split over Sunday and Monday by repair_slots; two cannot.
+    """
+    penalty = 0
+    for w in range(model_module.NUM_WEEKS):
+        both_home = sum(
+            1 for pair in pairs
+            if all(any(home[g] == team for g in team_week[team][w]) for team in pair)
+        )
+        penalty += max(0, both_home - 1)
+    return penalty
+
+
+def kempe_chain(g, target_week, week, home, away, team_week):
+    """Games connected to g through shared teams within g's week and target_week."""
+    weeks = (week[g], target_week)
+    chain = set()
+    stack = [g]
+    while stack:
+        c = stack.pop()
+        if c in chain:
+            continue
+        chain.add(c)
+        for team in (home[c], away[c]):
+            for w in weeks:
+                stack.extend(team_week[team][w])
+    return chain
+
+
+def repair_weeks(games, iterations=100000, seed=0, movable=None, blocked=(), byes=None):
+    """
+    Assign weeks to games without one, then repair the week assignment by local search.
+
+    Games without a week are inserted into a week free for both teams, swapping a Kempe
+    chain (the games linked by shared teams across two weeks) to free one when needed;
+    weeks outside the bye window are filled first. Simulated annealing then moves a game
+    of a team that breaks a week-level rule, either on its own or together with its Kempe
+    chain, which swaps weeks without creating clashes. The best assignment found is kept.
+    If movable is given, only those game indices change week; blocked (team, week) pairs
+    must not be hosted by that team, and byes ({team: week}) fixes teams' bye weeks.
+    Returns the number of games whose week changed and the remaining penalty (0 when
+    every week-level rule holds).
+    """
+    rng = random.Random(seed)
+    movable = set(range(len(games))) if movable is None else set(movable)
+    home = [game['home'] for game in games]
+    away = [game['away'] for game in games]
+    week = [game['week'] for game in games]
+    original = list(week)
+
+    team_week = [[[] for _ in range(model_module.NUM_WEEKS)] for _ in range(model_module.NUM_TEAMS)]
+    unplaced = [g for g in range(len(games)) if week[g] is None]
+    for g in range(len(games)):
+        if week[g] is not None:
+            team_week[home[g]][week[g]].append(g)
+            team_week[away[g]][week[g]].append(g)
+
+    def move(moved):
+        for c in moved:
+            old, new = week[c], moved[c]
+            for team in (home[c], away[c]):
+                team_week[team][old].remove(c)
+                team_week[team][new].append(c)
+            week[c] = new
+
+    def place(g, w):
+        week[g] = w
+        team_week[home[g]][w].append(g)
+        team_week[away[g]][w].append(g)
+
+    # Weeks outside the bye window fill first, so the week each team has free is a bye week
+    def fill_order(weeks):
+        bye_window = range(model_module.BYE_WEEK_START - 1, model_module.BYE_WEEK_END)
+        return sorted(weeks, key=lambda w: (w in bye_window, rng.random()))
+
+    rng.shuffle(unplaced)
+    for g in unplaced:
+        free_home = fill_order(w for w in range(model_module.NUM_WEEKS) if not team_week[home[g]][w])
+        free_away = fill_order(w for w in range(model_module.NUM_WEEKS) if not team_week[away[g]][w])
+        common = [w for w in free_home if w in free_away]
+        if common:
+            place(g, common[0])
+            continue
+
+        # Free a week for both teams by swapping a Kempe chain of the away team's games
+        for w_home in free_home:
+            for w_away in free_away:
+                chain = kempe_chain(team_week[away[g]][w_home][0], w_away, week, home, away, team_week)
+                if not chain <= movable:
+                    continue
+                moved = {c: w_away if week[c] == w_home else w_home for c in chain}
+                move(moved)
+                if not team_week[home[g]][w_home] and not team_week[away[g]][w_home]:
+                    place(g, w_home)
+                    break
+                move({c: w_home if w == w_away else w_away for c, w in moved.items()})
+            else:
+                continue
+            break
+        else:
+            loads = [
+                len(team_week[home[g]][w]) + len(team_week[away[g]][w])
+                for w in range(model_module.NUM_WEEKS)
+            ]
+            place(g, loads.index(min(loads)))
+
+    pairs = [
+        (model_module.TEAM_IDX[team_a], model_module.TEAM_IDX[team_b])
+        for team_a, team_b in model_module.STADIUM_SHARING_PAIRS
+    ]
+    sharing_teams = {team for pair in pairs for team in pair}
+
+    penalties = [team_penalty(t, team_week, home, away, blocked, byes) for t in range(model_module.NUM_TEAMS)]
+    shared = sharing_penalty(team_week, home, pairs)
+    total = sum(penalties) + shared
+    best_total, best_week = total, list(week)
+    temperature = REPAIR_TEMPERATURE
+
+    for _ in range(iterations):
+        if best_total == 0:
+            break
+
+        conflicted = [t for t in range(model_module.NUM_TEAMS) if penalties[t] > 0]
+        if shared > 0:
+            conflicted.extend(sharing_teams)
+        candidates = [g for w in team_week[rng.choice(conflicted)] for g in w if g in movable]
+        if not candidates:
+            continue
+        g = rng.choice(candidates)
+        target = rng.randrange(model_module.NUM_WEEKS - 1)
+        if target >= week[g]:
+            target += 1
+
+        if rng.random() < 0.5:
+            moved = {g: target}
+        else:
+            source = week[g]
+            chain = kempe_chain(g, target, week, home, away, team_week)
+            if not chain <= movable:
+                continue
+            moved = {c: target if week[c] == source else source for c in chain}
+
+        undo = {c: week[c] for c in moved}
+        teams = {team for c in moved for team in (home[c], away[c])}
+        move(moved)
+
+        new_penalties = {t: team_penalty(t, team_week, home, away, blocked, byes) for t in teams}
+        new_shared = sharing_penalty(team_week, home, pairs) if teams & sharing_teams else shared
+        delta = sum(new_penalties[t] - penalties[t] for t in teams) + new_shared - shared
+
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            for t in teams:
+                penalties[t] = new_penalties[t]
+            shared = new_shared
+            total += delta
+            if total < best_total:
+                best_total, best_week = total, list(week)
+        else:
+            move(undo)
+        temperature = max(temperature * REPAIR_COOLING, 0.05)
+
+    for game, w in zip(games, best_week):
+        game['week'] = w
+
+    changed = sum(1 for w, w_original in zip(best_week, original) if w != w_original)
+    return changed, best_total
+
+
+def slots_valid(games):
+    """Check the slot rules: one Thursday and one Monday game a week, Thursday road trips, shared stadiums."""
+    if any(game['slot'] is None for game in games):
+        return False
+
+    slot_counts = {}
+    away_slot = {}
+    home_slots = set()
+    for game in games:
+        w, s = game['week'], game['slot']
+        slot_counts[(w, s)] = slot_counts.get((w, s), 0) + 1
+        away_slot[(game['away'], w)] = s
+        home_slots.add((game['home'], w, s))
+
+    for w in range(model_module.NUM_WEEKS):
+        if slot_counts.get((w, 0), 0) != 1 or slot_counts.get((w, 2), 0) != 1:
+            return False
+
+    exceptions = sum(
+        1 for game in games
+        if game['slot'] == 0 and game['week'] > 0
+        and away_slot.get((game['away'], game['week'] - 1)) != 1
+    )
+    if exceptions > 1:
+        return False
+
+    for team_a, team_b in model_module.STADIUM_SHARING_PAIRS:
+        idx_a, idx_b = model_module.TEAM_IDX[team_a], model_module.TEAM_IDX[team_b]
+        for w in range(model_module.NUM_WEEKS):
+            for s in range(model_module.NUM_SLOTS):
+                if (idx_a, w, s) in home_slots and (idx_b, w, s) in home_slots:
+                    return False
+
+    return True
+
+
+def repair_slots(games):
+    """
+    Reassign Thursday and Monday games week by week.
+
+    Thursday goes to a game whose away team was on the road on Sunday the week before;
+    Monday prefers a game whose away team is not on the road the next week, which keeps
+    Thursday candidates free. Returns the number of Thursday games that had to use the
+    single allowed exception.
+    """
+    by_week = [[] for _ in range(model_module.NUM_WEEKS)]
+    away_game = {}
+    for game in games:
+        game['slot'] = 1
+        by_week[game['week']].append(game)
+        away_game[(game['away'], game['week'])] = game
+
+    pairs = [
+        (model_module.TEAM_IDX[team_a], model_module.TEAM_IDX[team_b])
+        for team_a, team_b in model_module.STADIUM_SHARING_PAIRS
+    ]
+
+    exceptions = 0
+    for w in range(model_module.NUM_WEEKS):
+        week_games = by_week[w]
+
+        candidates = [
+            game for game in week_games
+            if w == 0 or away_game.get((game['away'], w - 1), {}).get('slot') == 1
+        ]
+        if not candidates:
+            candidates = week_games
+            exceptions += 1
+        candidates[0]['slot'] = 0
+
+        # Teams sharing a stadium cannot both host on Sunday
+        monday = None
+        home_teams = {game['home']: game for game in week_games}
+        for team_a, team_b in pairs:
+            if team_a in home_teams and team_b in home_teams:
+                game_a, game_b = home_teams[team_a], home_teams[team_b]
+                if game_a['slot'] == 1 and game_b['slot'] == 1:
+                    monday = game_a
+                    break
+
+        if monday is None:
+            sunday_games = [game for game in week_games if game['slot'] == 1]
+            monday = min(sunday_games, key=lambda game: (game['away'], w + 1) in away_game)
+        monday['slot'] = 2
+
+    return exceptions
+
+
+def schedule_values(games):
+    """Values of the x, h, a, bye, y and v variables for a complete schedule."""
+    values = {'x': {}, 'h': {}, 'a': {}, 'bye': {}, 'y': {}, 'v': {}}
+
+    away_slot = {}
+    for game in games:
+        i, j, w, s = game['away'], game['home'], game['week'], game['slot']
+        values['x'][(i, j, w, s)] = 1
+        values['h'][(j, w)] = 1
+        values['a'][(i, w)] = 1
+        away_slot[(i, w)] = s
+
+    for i in range(model_module.NUM_TEAMS):
+        for w in range(model_module.NUM_WEEKS):
+            if (i, w) not in values['h'] and (i, w) not in values['a']:
+                values['bye'][(i, w)] = 1
+        for w in range(model_module.NUM_WEEKS - 1):
+            if away_slot.get((i, w)) == 1 and away_slot.get((i, w + 1)) == 0:
+                values['y'][(i, w)] = 1
+
+    for game in games:
+        w = game['week']
+        if game['slot'] == 0 and w > 0 and away_slot.get((game['away'], w - 1)) != 1:
+            values['v'][w] = 1
+
+    return values
+
+
+def repaired_schedule_games(filepath, matchup_matrix, seed=0):
+    """
+    Load a schedule CSV and repair its weeks and slots where needed. Returns the games,
+    or None if the schedule does not fit the season's matchups or cannot be repaired.
+    """
+    games = load_schedule_games(filepath)
+    if not matches_matchup_matrix(games, matchup_matrix):
+        print(f"Warm start {filepath} does not match the matchup matrix; solving without it")
+        return None
+
+    weeks_changed, penalty = repair_weeks(games, seed=seed)
+    if penalty > 0:
+        print(f"Could not repair the weeks of {filepath}; solving without a warm start")
+        return None
+
+    if weeks_changed or not slots_valid(games):
+        exceptions = repair_slots(games)
+        if exceptions > 1:
+            print(f"Could not repair the slots of {filepath}; solving without a warm start")
+            return None
+        print(f"Warm start repaired: {weeks_changed} games moved, slots reassigned")
+
+    return games
+
+
+def set_warm_start(variables, filepath, matchup_matrix, seed=0):
+    """
+    Load a schedule CSV, repair its weeks and slots where needed, and set it as the
+    initial value of the model variables. Returns False if the schedule does not fit
+    the season's matchups or cannot be repaired.
+    """
+    games = repaired_schedule_games(filepath, matchup_matrix, seed)
+    if games is None:
+        return False
+
+    apply_warm_start(variables, games)
+    print(f"Warm start loaded from {filepath}")
+    return True
+
+
+def apply_warm_start(variables, games):
+    """Set a complete, feasible schedule as the initial value of the model variables."""
+    values = schedule_values(games)
+    for family, family_vars in variables.items():
+        for key, var in family_vars.items():
+            var.setInitialValue(values[family].get(key, 0))
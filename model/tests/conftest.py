@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'optimization'))
+
+def pytest_configure(config):
+    # The models are built with PuLP's dict-style API, which PuLP 3 flags on every use
+    config.addinivalue_line('filterwarnings', 'ignore::DeprecationWarning:pulp')
+
+
+# Season whose saved optimized schedule the tests use as a known feasible solution
+YEAR = 2024
+
+
+@pytest.fixture(scope='session')
+def season():
+    """Matchup matrix, saved schedule and its games for YEAR."""
+    from model import get_output_path, load_schedule_from_csv, matchup_matrix_from_schedule
+    from warm_start import games_from_schedule
+
+    schedule = load_schedule_from_csv(get_output_path(YEAR, f"{YEAR}_schedule.csv"))
+    return {
+        'matchup_matrix': matchup_matrix_from_schedule(schedule),
+        'schedule': schedule,
+        'games': games_from_schedule(schedule)
+    }
+
+
+@pytest.fixture
+def slot_model(season):
+    """A freshly built slot model of the season: (model, variables)."""
+    from model import create_nfl_schedule_model
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, variables, _ = create_nfl_schedule_model(season['matchup_matrix'])
+    return model, variables
+
+
+def violated_rows(model):
+    """Names of the model's rows that the variables' current values violate."""
+    return [name for name, constraint in model.constraints.items() if not constraint.valid(1e-6)]
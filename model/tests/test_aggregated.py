@@ -0,0 +1,38 @@
+import contextlib
+import io
+
+from conftest import violated_rows
+from aggregated_model import create_aggregated_schedule_model, extract_aggregated_schedule
+from warm_start import schedule_values
+
+
+def aggregated_values(games):
+    """Values of the slot-aggregated model's variables for a complete schedule."""
+    values = schedule_values(games)
+    values.update({'g': {}, 'thu': {}, 'mon': {}, 'sa': {}, 'ta': {}, 'tg': {}, 'mg': {}})
+    for game in games:
+        i, j, w, s = game['away'], game['home'], game['week'], game['slot']
+        values['g'][(i, j, w)] = 1
+        if s == 0:
+            values['thu'].update({(i, w): 1, (j, w): 1})
+            values['tg'][(min(i, j), max(i, j), w)] = 1
+            values['ta'][(i, w)] = 1
+        elif s == 2:
+            values['mon'].update({(i, w): 1, (j, w): 1})
+            values['mg'][(min(i, j), max(i, j), w)] = 1
+        else:
+            values['sa'][(i, w)] = 1
+    return values
+
+
+def test_aggregated_model_accepts_the_saved_schedule(season):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, variables, _ = create_aggregated_schedule_model(season['matchup_matrix'])
+
+    values = aggregated_values(season['games'])
+    for family, family_vars in variables.items():
+        for key, var in family_vars.items():
+            var.setInitialValue(values[family].get(key, 0))
+
+    assert violated_rows(model) == []
+    assert extract_aggregated_schedule(variables) == season['schedule']
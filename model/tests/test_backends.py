@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import pytest
+
+from highs_backend import build_sparse_model
+from model import cbc_method, solve_options, solve_schedule
+from portfolio import default_portfolio, importable
+
+
+def test_sparse_model_matches_the_pulp_model(season, slot_model):
+    model, variables = slot_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        sparse, columns, _ = build_sparse_model(season['matchup_matrix'])
+
+    names = {col: variables[family][key].name
+             for family, family_columns in columns.items() for key, col in family_columns.items()}
+    assert sparse['row_names'] == list(model.constraints)
+
+    for row, (name, constraint) in enumerate(model.constraints.items()):
+        start, end = sparse['start'][row], sparse['start'][row + 1]
+        terms = {names[col]: coef for col, coef in
+                 zip(sparse['index'][start:end], sparse['value'][start:end])}
+        assert terms == {var.name: coef for var, coef in constraint.items() if coef}, name
+
+    objective = {var.name: coef for var, coef in model.objective.items() if coef}
+    assert {names[col]: cost for col, cost in enumerate(sparse['cost']) if cost} == objective
+
+
+def test_solve_options_pick_one_cbc_method():
+    assert cbc_method(solve_options({}), 'slot') == 'default'
+    assert cbc_method(solve_options({'warm_start': 'heuristic', 'lazy': True}), 'slot') == 'lazy'
+    assert cbc_method(solve_options({'checkpoint': 'ckpt', 'telemetry': 'log'}), 'slot') == 'checkpoint'
+
+    with pytest.raises(ValueError, match="lazy option cannot be combined with artifact"):
+        cbc_method(solve_options({'artifact': True, 'lazy': True}), 'slot')
+    with pytest.raises(ValueError, match="formulation='slot'"):
+        cbc_method(solve_options({'warm_start': 'heuristic'}), 'week')
+    with pytest.raises(ValueError, match="backend='highs'"):
+        solve_schedule(backend='highs', decompose=True)
+    with pytest.raises(TypeError, match="Unknown solve options: lazy_rows"):
+        solve_schedule(lazy_rows=True)
+
+
+def test_default_portfolio_only_races_solvers_that_import():
+    modules = {'highs': 'highspy', 'cpsat': 'ortools.sat.python.cp_model'}
+    with contextlib.redirect_stdout(io.StringIO()):
+        portfolio = default_portfolio()
+
+    assert [config['name'] for config in portfolio][:1] == ['cbc']
+    for config in portfolio:
+        if config['backend'] in modules:
+            assert importable(modules[config['backend']])
@@ -0,0 +1,23 @@
+from pulp import value
+
+from bounds import price_trips_exactly, split_week_rows
+from conftest import violated_rows
+from exact_pairing import realized_pairs
+from model import calculate_total_emissions, load_all_distances
+from warm_start import apply_warm_start
+
+
+def test_exact_trip_pricing_scores_a_schedule_as_calculate_total_emissions(season, slot_model):
+    model, variables = slot_model
+    apply_warm_start(variables, season['games'])
+    trips = set(realized_pairs(variables))
+    price_trips_exactly(model, variables, season['matchup_matrix'])
+    for key, p in variables['p'].items():
+        p.varValue = int(key in trips)
+
+    assert violated_rows(model) == []
+    emissions, _ = calculate_total_emissions(season['schedule'], load_all_distances())
+    assert abs(value(model.objective) - emissions) < 1e-6 * emissions
+
+    relaxed, blocks = split_week_rows(model, variables)
+    assert len(relaxed) + sum(len(rows) for _, rows in blocks) == len(model.constraints)
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+
+import artifacts
+import cache
+from artifacts import model_artifact, read_cbc_solution, write_mip_start
+from cache import cache_key, cached_solution, evict, store_solution
+from warm_start import schedule_values
+
+
+def test_cache_key_depends_on_matchups_and_settings(season):
+    matchup_matrix = season['matchup_matrix']
+    key = cache_key(matchup_matrix, {'time_limit': 60})
+
+    assert cache_key(dict(matchup_matrix), {'time_limit': 60}) == key
+    assert cache_key(matchup_matrix, {'time_limit': 120}) != key
+    changed = dict(matchup_matrix)
+    changed[next(pair for pair, n in matchup_matrix.items() if n)] = 0
+    assert cache_key(changed, {'time_limit': 60}) != key
+
+
+def test_cache_key_depends_on_every_module_source(season, tmp_path, monkeypatch):
+    (tmp_path / "model.py").write_text("# formulation\n")
+    source = tmp_path / "presolve.py"
+    source.write_text("# presolve v1\n")
+    monkeypatch.setattr(cache, 'SOURCE_DIR', str(tmp_path))
+    key = cache_key(season['matchup_matrix'], {'time_limit': 60})
+
+    source.write_text("# presolve v2\n")
+    assert cache_key(season['matchup_matrix'], {'time_limit': 60}) != key
+
+
+def test_solution_cache_round_trip(season, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'get_cache_dir', lambda: str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        store_solution('first', season['schedule'], 123.5, 7)
+        store_solution('second', season['schedule'], 99.0, 3)
+
+    assert cached_solution('missing') is None
+    assert cached_solution('first') == (season['schedule'], 123.5, 7)
+
+    # The hit above made 'first' the most recently used entry
+    os.utime(os.path.join(tmp_path, 'second.json'), (0, 0))
+    evict(size=1)
+    assert cached_solution('second') is None
+    assert cached_solution('first') is not None
+
+
+def test_model_artifact_round_trip(season, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, 'get_artifact_dir', lambda: str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        mps_path, index = model_artifact(season['matchup_matrix'])
+        assert model_artifact(season['matchup_matrix']) == (mps_path, index)
+    assert "Using cached model" in out.getvalue()
+    assert os.path.exists(mps_path)
+
+    # A MIP start file has the layout of a CBC solution file, so it reads back as one
+    values = schedule_values(season['games'])
+    start_path = os.path.join(tmp_path, 'start.sol')
+    write_mip_start(start_path, index, values)
+    _, _, read_values = read_cbc_solution(start_path, index)
+
+    for family in ('x', 'bye', 'h', 'a'):
+        chosen = {key for key, val in read_values[family].items() if val > 0.5}
+        assert chosen == set(values[family])
@@ -0,0 +1,24 @@
+import contextlib
+import io
+
+from checkpoint import completed_checkpoint, resume_from_checkpoint, write_checkpoint
+from model import create_nfl_schedule_model
+from warm_start import apply_warm_start
+
+
+def test_checkpoint_round_trip(season, slot_model, tmp_path):
+    model, variables = slot_model
+    apply_warm_start(variables, season['games'])
+    checkpoint = str(tmp_path / 'season')
+    write_checkpoint(checkpoint, model, variables, mip_gap=0.01, complete=True, elapsed=1.0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        resumed, _, _ = create_nfl_schedule_model(season['matchup_matrix'])
+        assert resume_from_checkpoint(resumed, checkpoint)
+    resumed_vars = resumed.variablesDict()
+    assert all(resumed_vars[var.name].varValue == var.varValue for var in model.variables())
+
+    schedule, total_emissions, _ = completed_checkpoint(checkpoint, 0.02, season['matchup_matrix'])
+    assert schedule == season['schedule'] and total_emissions > 0
+    # A checkpoint proven to a looser gap than asked for is not complete
+    assert completed_checkpoint(checkpoint, 0.005, season['matchup_matrix']) is None
@@ -0,0 +1,30 @@
+import contextlib
+import io
+
+import pytest
+
+# Some OR-Tools builds clash with the HiGHS that PuLP loads through highspy, and only
+# import if they come first; run this file on its own to check CP-SAT there
+cp_model = pytest.importorskip('ortools.sat.python.cp_model', exc_type=ImportError)
+
+from pulp import value  # noqa: E402
+
+from cpsat_backend import EMISSION_SCALE, create_cpsat_model, solve_cpsat_model  # noqa: E402
+from warm_start import apply_warm_start, schedule_values  # noqa: E402
+
+
+def test_cpsat_model_accepts_a_feasible_schedule(season, slot_model):
+    model, variables = slot_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        cpsat, cpsat_variables, _ = create_cpsat_model(season['matchup_matrix'])
+    assert len(cpsat.Proto().constraints) == len(model.constraints)
+
+    values = schedule_values(season['games'])
+    for family, family_vars in cpsat_variables.items():
+        for key, var in family_vars.items():
+            cpsat.Add(var == values[family].get(key, 0))
+    solver, status = solve_cpsat_model(cpsat, 60, 0, num_workers=1, log=False)
+    assert status == cp_model.OPTIMAL
+
+    apply_warm_start(variables, season['games'])
+    assert solver.ObjectiveValue() / EMISSION_SCALE == pytest.approx(value(model.objective), rel=1e-6)
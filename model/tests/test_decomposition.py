@@ -0,0 +1,32 @@
+import contextlib
+import io
+
+from conftest import violated_rows
+from decomposition import (
+    create_pattern_model, pattern_values, seed_pattern, solve_pattern, unmatched_week
+)
+from model import (
+    load_all_distances, precompute_average_paired_savings, precompute_game_emissions
+)
+
+
+def test_schedule_pattern_is_feasible_in_both_phases(season, slot_model):
+    model, variables = slot_model
+    matchup_matrix = season['matchup_matrix']
+    distances = load_all_distances()
+    pattern_model, pattern_variables = create_pattern_model(
+        matchup_matrix, precompute_game_emissions(distances, matchup_matrix),
+        precompute_average_paired_savings(distances, matchup_matrix)
+    )
+
+    seed_pattern(pattern_variables, season['games'])
+    assert violated_rows(pattern_model) == []
+    pattern = pattern_values(pattern_variables)
+    assert unmatched_week(matchup_matrix, pattern) is None
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        objective = solve_pattern(
+            model, variables, pattern, time_limit=60, mip_gap=0.05, games=season['games']
+        )
+    assert objective is not None
+    assert violated_rows(model) == []
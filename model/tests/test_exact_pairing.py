@@ -0,0 +1,14 @@
+from exact_pairing import candidate_pairs, realized_pairs
+from model import calculate_total_emissions, load_all_distances
+from warm_start import apply_warm_start
+
+
+def test_realized_pairs_are_the_schedules_paired_trips(season, slot_model):
+    _, variables = slot_model
+    apply_warm_start(variables, season['games'])
+
+    pairs = realized_pairs(variables)
+    _, paired_trips = calculate_total_emissions(season['schedule'], load_all_distances())
+
+    assert len(pairs) == paired_trips > 0
+    assert set(pairs) <= set(candidate_pairs(variables['x']))
@@ -0,0 +1,21 @@
+from model import extract_schedule
+from warm_start import apply_warm_start, schedule_values
+
+
+def test_extract_schedule_matches_the_saved_schedule(season, slot_model):
+    _, variables = slot_model
+    apply_warm_start(variables, season['games'])
+
+    assert extract_schedule(variables) == season['schedule']
+
+
+def test_extract_schedule_from_plain_values(season, slot_model):
+    # The HiGHS and CP-SAT backends return {family: {key: value}} instead of variables
+    _, variables = slot_model
+    values = schedule_values(season['games'])
+    plain = {
+        family: {key: values[family].get(key, 0) for key in family_vars}
+        for family, family_vars in variables.items()
+    }
+
+    assert extract_schedule(plain) == season['schedule']
@@ -0,0 +1,17 @@
+import contextlib
+import io
+
+from conftest import violated_rows
+from heuristic import heuristic_games
+from warm_start import apply_warm_start, matches_matchup_matrix
+
+
+def test_heuristic_schedule_is_feasible(season, slot_model):
+    model, variables = slot_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        games, emissions = heuristic_games(season['matchup_matrix'], restarts=1)
+
+    assert games is not None and emissions > 0
+    assert matches_matchup_matrix(games, season['matchup_matrix'])
+    apply_warm_start(variables, games)
+    assert violated_rows(model) == []
@@ -0,0 +1,24 @@
+import contextlib
+import io
+
+from lazy_constraints import lazy_row_count, violated_windows, window_name
+from model import create_nfl_schedule_model
+from warm_start import apply_warm_start
+
+
+def test_lazy_model_leaves_out_only_the_window_rows(season, slot_model):
+    model, variables = slot_model
+    with contextlib.redirect_stdout(io.StringIO()):
+        lazy_model, _, _ = create_nfl_schedule_model(season['matchup_matrix'], lazy=True)
+
+    assert len(model.constraints) - len(lazy_model.constraints) == lazy_row_count(variables)
+
+    apply_warm_start(variables, season['games'])
+    assert violated_windows(variables) == []
+
+    # Four home games in a row break Max_consec_home for the window starting in week 1
+    for w in range(4):
+        variables['h'][(0, w)].varValue = 1
+    violated = violated_windows(variables)
+    assert ('home', 0, 0) in violated
+    assert all(window_name(key) in model.constraints for key in violated)
@@ -0,0 +1,23 @@
+from conftest import violated_rows
+from heuristic import schedule_from_games
+from lns import index_games, run_lns, team_emissions, trip_costs
+from model import NUM_TEAMS, calculate_total_emissions, load_all_distances
+from warm_start import apply_warm_start, matches_matchup_matrix
+
+
+def test_lns_keeps_the_schedule_feasible_and_no_worse(season, slot_model):
+    model, variables = slot_model
+    distances = load_all_distances()
+    costs = trip_costs(distances)
+    by_team_week = index_games(season['games'])
+    start = sum(team_emissions(t, by_team_week, costs) for t in range(NUM_TEAMS))
+
+    games, total, steps = run_lns(season['games'], distances, time_limit=2)
+
+    assert steps > 0 and total <= start + 1e-6
+    assert matches_matchup_matrix(games, season['matchup_matrix'])
+    # The running total is rescored team by team; it must match a full recount
+    emissions, _ = calculate_total_emissions(schedule_from_games(games), distances)
+    assert abs(emissions - total) < 1e-6 * emissions
+    apply_warm_start(variables, games)
+    assert violated_rows(model) == []
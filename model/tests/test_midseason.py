@@ -0,0 +1,24 @@
+import contextlib
+import io
+
+import model as model_module
+from conftest import YEAR
+from midseason import reoptimize_season
+
+
+def test_reoptimize_keeps_played_weeks_and_blocked_venues(season):
+    current_week, week = 14, 16
+    # A team hosting in the blocked week, so the block has to move a game
+    team = model_module.TEAMS[next(
+        game['home'] for game in season['games'] if game['week'] == week - 1
+    )]
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, total_emissions, _ = reoptimize_season(
+            model_module.get_output_path(YEAR, f"{YEAR}_schedule.csv"), current_week,
+            blocked=[(team, week)], time_limit=60, mip_gap=0.05
+        )
+
+    assert schedule is not None and total_emissions > 0
+    for name, games in schedule.items():
+        assert games[:current_week] == season['schedule'][name][:current_week], name
+    assert schedule[team][week - 1]['home_away'] == 'Away'
@@ -0,0 +1,29 @@
+import model as model_module
+from multiseason import distinct_byes, fairness_usage, thursday_limits
+
+
+def test_distinct_byes_keep_each_week_bye_count(season):
+    # Three seasons with the same byes repeat every team's bye twice
+    years = [2023, 2024, 2025]
+    usages = [fairness_usage(season['schedule'])] * len(years)
+
+    byes = distinct_byes(usages, years)
+
+    assert byes is not None
+    for i, week in usages[0][0].items():
+        assert len({byes[year][i] for year in years}) == len(years)
+    for year in years:
+        assert sorted(byes[year].values()) == sorted(usages[0][0].values())
+
+
+def test_thursday_limits_bring_every_team_to_the_cap():
+    teams = range(model_module.NUM_TEAMS)
+    counts = {2023: {i: i % 2 for i in teams}, 2024: {i: i % 4 for i in teams},
+              2025: {i: 2 for i in teams}}
+    cap = 2
+
+    limits = {year: thursday_limits(counts, cap, year, 0) for year in counts}
+
+    for i in teams:
+        assert sum(limits[year][i] for year in counts) <= cap
+        assert all(0 <= limits[year][i] for year in counts)
@@ -0,0 +1,28 @@
+from pulp import value
+
+from conftest import violated_rows
+from pareto import add_equity_rows, pareto_filter, set_equity_start
+from warm_start import apply_warm_start
+
+
+def test_equity_rows_split_the_objective_by_team(season, slot_model):
+    model, variables = slot_model
+    max_team, _, expressions = add_equity_rows(model, variables, season['matchup_matrix'])
+    apply_warm_start(variables, season['games'])
+    set_equity_start(model, max_team, expressions)
+
+    assert violated_rows(model) == []
+    total = sum(value(expression) for expression in expressions.values())
+    assert abs(total - value(model.objective)) < 1e-6 * abs(total)
+    assert value(max_team) == max(value(expression) for expression in expressions.values())
+
+
+def test_pareto_filter_drops_dominated_points():
+    points = [
+        {'total_emissions': 100, 'max_team_emissions': 10},
+        {'total_emissions': 110, 'max_team_emissions': 8},
+        {'total_emissions': 120, 'max_team_emissions': 9},
+        {'total_emissions': 105, 'max_team_emissions': 10}
+    ]
+    front = pareto_filter(points)
+    assert [(p['total_emissions'], p['max_team_emissions']) for p in front] == [(100, 10), (110, 8)]
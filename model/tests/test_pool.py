@@ -0,0 +1,24 @@
+import contextlib
+import io
+
+from conftest import violated_rows
+from heuristic import heuristic_games
+from pool import add_no_good_cut, assignment, hamming_distance
+from warm_start import apply_warm_start
+
+
+def test_no_good_cut_removes_only_nearby_schedules(season, slot_model):
+    model, variables = slot_model
+    apply_warm_start(variables, season['games'])
+    ones = assignment(variables)
+    assert len(ones) == len(season['games'])
+    assert hamming_distance(ones, ones) == 0
+
+    add_no_good_cut(model, ones, min_distance=32, index=0)
+    assert violated_rows(model) == ['Pool_no_good_0']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        games, _ = heuristic_games(season['matchup_matrix'], restarts=1)
+    apply_warm_start(variables, games)
+    assert hamming_distance(assignment(variables), ones) >= 32
+    assert violated_rows(model) == []
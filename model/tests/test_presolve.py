@@ -0,0 +1,36 @@
+import contextlib
+import io
+
+from pulp import LpBinary, LpMinimize, LpProblem, LpVariable
+
+from conftest import violated_rows
+from presolve import presolve_model
+from warm_start import apply_warm_start
+
+
+def test_cancelled_terms_are_not_fixed():
+    x = LpVariable('x', cat=LpBinary)
+    z = LpVariable('z', cat=LpBinary)
+    model = LpProblem('cancelled', LpMinimize)
+    model += x + z
+    # z cancels but stays in the row with a coefficient of 0
+    model += x + z - z <= 0, 'Cancelled'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, fixed, _ = presolve_model(model)
+
+    assert fixed == {x: 0}
+
+
+def test_presolve_keeps_a_feasible_schedule(season, slot_model):
+    model, variables = slot_model
+    apply_warm_start(variables, season['games'])
+    assert violated_rows(model) == []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        reduced, fixed, report = presolve_model(model)
+
+    assert report['fixed'] > 0
+    assert {var.name for var, val in fixed.items() if val != var.varValue} == set()
+    assert violated_rows(reduced) == []
+    assert len(reduced.constraints) < len(model.constraints)
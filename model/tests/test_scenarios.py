@@ -0,0 +1,23 @@
+import pytest
+
+import model as model_module
+from model import load_all_distances, precompute_game_emissions
+from scenarios import scenario_name, scenario_rates
+
+
+def test_scenario_rates_override_and_restore_constants(season):
+    distances = load_all_distances()
+    baseline = precompute_game_emissions(distances, season['matchup_matrix'])
+    rate = model_module.PLANE_EMISSION_RATE
+
+    with scenario_rates({'PLANE_EMISSION_RATE': 2 * rate}):
+        assert model_module.PLANE_EMISSION_RATE == 2 * rate
+        doubled = precompute_game_emissions(distances, season['matchup_matrix'])
+    assert model_module.PLANE_EMISSION_RATE == rate
+    assert sum(doubled.values()) > sum(baseline.values())
+
+    with pytest.raises(ValueError):
+        with scenario_rates({'TRAIN_EMISSION_RATE': 1}):
+            pass
+    assert scenario_name({}) == 'baseline'
+    assert scenario_name({'BUS_ONLY_THRESHOLD': 700}) == 'BUS_ONLY_THRESHOLD=700'
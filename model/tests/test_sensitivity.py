@@ -0,0 +1,22 @@
+from model import load_all_distances
+from sensitivity import pattern_lp_sensitivity, perturbation_estimate, venue_margins
+
+
+def test_played_venues_have_margins(season):
+    sensitivity = pattern_lp_sensitivity(season['schedule'])
+    venues = venue_margins(sensitivity, season['games'])
+
+    assert sum(venue['played'] for venue in venues) == len(season['games'])
+    assert all(venue['margin'] >= 0 for venue in venues)
+    relative = [venue['relative'] for venue in venues]
+    assert relative == sorted(relative)
+
+
+def test_perturbation_estimate_is_no_worse_than_the_incumbent(season, slot_model):
+    model, variables = slot_model
+    before, after, resolved = perturbation_estimate(
+        model, variables, season['matchup_matrix'], season['games'], load_all_distances(),
+        team=0, factor=1.1, time_limit=30
+    )
+    assert after > before
+    assert resolved <= after + 1e-6 * after
@@ -0,0 +1,28 @@
+import contextlib
+import io
+
+import model as model_module
+from conftest import violated_rows
+from aggregated_model import create_aggregated_schedule_model
+from heuristic import heuristic_games
+from synthetic import league_constants, synthetic_league, write_league
+from warm_start import apply_warm_start, matches_matchup_matrix
+
+
+def test_modules_follow_a_synthetic_league(tmp_path):
+    # Modules imported before league_constants must still build the synthetic league
+    league = synthetic_league(num_teams=34, num_divisions=8, num_weeks=19, seed=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_dir = write_league(league, str(tmp_path))
+        with league_constants(league, data_dir):
+            matchup_matrix = model_module.load_matchup_matrix()
+            slot_model, variables, _ = model_module.create_nfl_schedule_model(matchup_matrix)
+            week_model, _, _ = create_aggregated_schedule_model(matchup_matrix)
+            games, _ = heuristic_games(matchup_matrix, restarts=1)
+
+            assert games is not None and matches_matchup_matrix(games, matchup_matrix)
+            apply_warm_start(variables, games)
+            assert violated_rows(slot_model) == []
+
+    assert week_model.constraints['Games_per_week_18'].constant == -34
+    assert week_model.constraints['Total_games_33'].constant == -18
@@ -0,0 +1,42 @@
+from telemetry import parse_cbc_line
+
+LOG = """Continuous objective value is 9.14499e+06 - 8.19 seconds
+Cbc0012I Integer solution of 9307860.4 found by DiveCoefficient after 0 iterations and 0 nodes (12.75 seconds)
+Cbc0010I After 0 nodes, 1 on tree, 9307860.4 best solution, best possible 9144987.5 (23.17 seconds)
+Cbc0005I Partial search - best objective 9307860.4 (best possible 9144987.5), took 10512 iterations and 7 nodes (36.18 seconds)
+
+Result - Stopped on time limit
+
+Objective value:                9307860.36041458
+Lower bound:                    9144987.475
+Gap:                            0.02
+Enumerated nodes:               7
+Total iterations:               10512
+Time (CPU seconds):             36.12
+Time (Wallclock seconds):       36.44
+
+Total time (CPU seconds):       36.16   (Wallclock seconds):       36.52
+"""
+
+
+def parse(log):
+    state = {}
+    return [record for line in log.splitlines() if (record := parse_cbc_line(line, state))]
+
+
+def test_cbc_log_ends_with_a_final_record():
+    records = parse(LOG)
+
+    assert [record['event'] for record in records] == ['root', 'solution', 'nodes', 'final']
+    final = records[-1]
+    assert (final['incumbent'], final['bound'], final['nodes'], final['elapsed']) == (
+        9307860.36041458, 9144987.475, 7, 36.44
+    )
+
+
+def test_proven_optimum_closes_the_gap():
+    final = parse("Result - Optimal solution found\n\nObjective value:  4.00000000\n"
+                  "Enumerated nodes:  0\nTime (Wallclock seconds):  0.00\n")[-1]
+
+    assert final['event'] == 'final' and final['bound'] == final['incumbent'] == 4.0
+    assert final['gap'] == 0